@@ -1,40 +1,56 @@
-from typing import Optional
-
-import boto3
-from os import path, makedirs
-from uuid import uuid4
+from os import makedirs
+from shutil import rmtree
 
 from app.cli import log
 from app.config import S3_EVE_BUCKET
+from app.migration_job import MigrationJob
+from app.utils.s3 import get_s3_resource, get_s3_bucket
 
 
 class BaseMigrationService:
-    """Base migration service."""
+    """
+    Base migration service.
+
+    S3 is only connected to on first use, through the S3 client shared by the whole process, so services are cheap to
+    create. Each thread gets its own S3 resource and bucket over that client. Worker processes connect on their own.
+    """
+
+    @property
+    def s3(self):
+        """S3 resource of the calling thread."""
+
+        return get_s3_resource()
 
-    def __init__(self):
-        self.job_id: Optional[str] = None
-        self.tag = ''
-        self.temp_inp_dir: Optional[str] = None
-        self.temp_out_dir: Optional[str] = None
+    @property
+    def bucket(self):
+        """S3 bucket of migration inputs and outputs, of the calling thread."""
 
-        # Initialize S3 bucket
-        self.s3 = boto3.resource('s3')
-        self.bucket = self.s3.Bucket(S3_EVE_BUCKET)
+        return get_s3_bucket(S3_EVE_BUCKET)
 
-    def start_job(self):
-        """Start a new migration job."""
+    def start_job(self, job: MigrationJob):
+        """
+        Start a new migration job.
 
-        self.job_id = str(uuid4())
-        self.tag = f'[{self.job_id}] '
+        :param job: Migration job.
+        """
+
+        job.status.phase = 'starting'
 
         # Create temp directories for downloaded and migrated files
-        self.temp_inp_dir = path.join('temp', 'inputs', self.job_id)
-        makedirs(self.temp_inp_dir, exist_ok=True)
+        makedirs(job.temp_inp_dir, exist_ok=True)
+        makedirs(job.temp_out_dir, exist_ok=True)
+
+        log(f'{job.tag}🚀 Migration job started.')
+
+    def clean_up(self, job: MigrationJob):
+        """
+        Delete all local downloaded files of a migration job.
 
-        self.temp_out_dir = path.join('temp', 'outputs', self.job_id)
-        makedirs(self.temp_out_dir, exist_ok=True)
+        :param job: Migration job.
+        """
 
-        log(f'{self.tag}🚀 Migration job started.')
+        rmtree(job.temp_inp_dir, ignore_errors=True)
 
-    def succeed(self):
-        log(f'{self.tag}🎉 Migration job completed successfully.')
+    def succeed(self, job: MigrationJob):
+        job.status.phase = 'done'
+        log(f'{job.tag}🎉 Migration job completed successfully.')
@@ -1,23 +1,102 @@
 import logging
+import sys
 from datetime import datetime
+from threading import Lock
+from time import monotonic
+from typing import Dict, List, Tuple
 
-from app.config import DEBUG
+from app.config import DEBUG, LOG_WARNINGS_PER_SEC
 
+LOGGER_NAME = 'eve'
 
-def get_timestamp_block():
-    return f'[{datetime.now()}]'
 
+class CLIFormatter(logging.Formatter):
+    """Formats log records as timestamped lines, with warnings and errors marked."""
 
-def log(data, level=logging.INFO):
-    if level == logging.DEBUG and DEBUG:
-        # Debug
-        print(f'{get_timestamp_block()} {data}')
-    elif level == logging.WARNING or level == logging.WARN:
-        # Warning
-        print(f'{get_timestamp_block()} 🟡 WARNING: {data}')
-    elif level == logging.ERROR or level == logging.CRITICAL:
-        # Error
-        print(f'{get_timestamp_block()} ⛔ ERROR: {data}')
-    elif level == logging.INFO:
-        # Info
-        print(f'{get_timestamp_block()} {data}')
+    LEVEL_PREFIXES = {
+        logging.WARNING: '🟡 WARNING: ',
+        logging.ERROR: '⛔ ERROR: ',
+        logging.CRITICAL: '⛔ ERROR: ',
+    }
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        suppressed = getattr(record, 'suppressed', 0)
+
+        if suppressed:
+            message += f' ({suppressed} similar warnings suppressed)'
+
+        if record.exc_info:
+            message += '\n' + self.formatException(record.exc_info)
+
+        prefix = self.LEVEL_PREFIXES.get(record.levelno, '')
+        return f'[{datetime.fromtimestamp(record.created)}] {prefix}{message}'
+
+
+class WarningRateLimiter(logging.Filter):
+    """
+    Limits the number of warnings logged per second from each place in the code.
+    Warnings over the limit are dropped and counted, and the count is reported with the next warning logged from the
+    same place.
+    """
+
+    def __init__(self, max_per_sec: int):
+        """
+        :param max_per_sec: Maximum number of warnings per second from each place, or 0 for no limit.
+        """
+
+        super().__init__()
+        self.max_per_sec = max_per_sec
+        self.lock = Lock()
+
+        # (start time, warnings logged, warnings dropped) of the current 1-second window, by file and line
+        self.windows: Dict[Tuple[str, int], List] = dict()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.WARNING or self.max_per_sec <= 0:
+            return True
+
+        key = (record.pathname, record.lineno)
+        now = monotonic()
+
+        with self.lock:
+            window = self.windows.get(key)
+
+            if window is None or now - window[0] >= 1.0:
+                record.suppressed = 0 if window is None else window[2]
+                self.windows[key] = [now, 1, 0]
+                return True
+
+            if window[1] < self.max_per_sec:
+                window[1] += 1
+                return True
+
+            window[2] += 1
+            return False
+
+
+logger = logging.getLogger(LOGGER_NAME)
+logger.setLevel(logging.DEBUG if DEBUG else logging.INFO)
+logger.propagate = False
+logger.addFilter(WarningRateLimiter(LOG_WARNINGS_PER_SEC))
+
+__handler = logging.StreamHandler(sys.stdout)
+__handler.setFormatter(CLIFormatter())
+logger.addHandler(__handler)
+
+
+def log(message, *args, level=logging.INFO, stacklevel=1):
+    """
+    Log a message, if its level is enabled.
+    Nothing is formatted unless the message is logged: like "logging.Logger.log", the message may be a %-style format
+    string, formatted with the given arguments.
+
+    :param message: Message, or format string.
+    :param args: Arguments of the format string, if any.
+    :param level: Log level.
+    :param stacklevel: Number of calls up the stack to report as the place the message was logged from, as with
+        "logging.Logger.log". Warnings are rate limited per place.
+    """
+
+    if logger.isEnabledFor(level):
+        logger.log(level, message, *args, stacklevel=stacklevel + 1)
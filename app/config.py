@@ -6,5 +6,25 @@ load_dotenv()
 __debug = environ.get('DEBUG')
 DEBUG = bool(int(__debug)) if __debug is not None else False
 
+__log_warnings_per_sec = environ.get('LOG_WARNINGS_PER_SEC')
+LOG_WARNINGS_PER_SEC = int(__log_warnings_per_sec) if __log_warnings_per_sec is not None else 10
+
+S3_ENDPOINT_URL = environ.get('S3_ENDPOINT_URL')
 S3_EVE_BUCKET = environ.get('S3_EVE_BUCKET')
 S3_THEORY_BUCKET = environ.get('S3_THEORY_BUCKET')
+
+__s3_max_pool_connections = environ.get('S3_MAX_POOL_CONNECTIONS')
+S3_MAX_POOL_CONNECTIONS = int(__s3_max_pool_connections) if __s3_max_pool_connections is not None else 64
+
+__s3_max_attempts = environ.get('S3_MAX_ATTEMPTS')
+S3_MAX_ATTEMPTS = int(__s3_max_attempts) if __s3_max_attempts is not None else 5
+
+__job_workers = environ.get('JOB_WORKERS')
+JOB_WORKERS = int(__job_workers) if __job_workers is not None else 1
+
+MYSQL_HOST = environ.get('MYSQL_HOST')
+__mysql_port = environ.get('MYSQL_PORT')
+MYSQL_PORT = int(__mysql_port) if __mysql_port is not None else 3306
+MYSQL_USER = environ.get('MYSQL_USER')
+MYSQL_PASSWORD = environ.get('MYSQL_PASSWORD')
+MYSQL_DATABASE = environ.get('MYSQL_DATABASE')
@@ -2,7 +2,7 @@ import re
 
 IDMS_RECORD_NAME_REGEX = re.compile(r'RECORD\s+NAME\.*\s+(?P<name>[a-zA-Z\d-]+)')
 IDMS_ELEM_ITEM_REGEX = re.compile(
-    r'^(?P<lvl>\d{2})\s+(?P<name>[a-zA-Z\d-]+)\s+[a-zA-Z\d-]+\s+\'?(?P<def_val>[a-zA-Z\d-]+)?\'?\s+(?P<type>[a-zA-Z\d\(\)]+)\s+\d+\s+\d+$')
+    r'^(?P<lvl>\d{2})\s+(?P<name>[a-zA-Z\d-]+)\s+(?P<usage>[a-zA-Z\d-]+)\s+\'?(?P<def_val>[a-zA-Z\d-]+)?\'?\s+(?P<type>[a-zA-Z\d\(\)]+)\s+\d+\s+\d+$')
 IDMS_ITEM_REGEX = re.compile(
     r'^(?P<lvl>\d{2})\s+(?P<name>[a-zA-Z\d-]+)\s+[a-zA-Z\d-]+\'?(?:\s+)(?P<def_val>[a-zA-Z\d-]+)?\'?(?:\s+)(?P<type>[a-zA-Z\d\(\)]+)?\s+\d+\s+\d+$')
 IDMS_NAME_SPLIT_REGEX = re.compile(r'-|:')
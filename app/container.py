@@ -1,11 +1,29 @@
-from app.idms_to_mysql_migration.service import IDMSToMySQLMigrationService
+from threading import Lock
+
+from app.config import JOB_WORKERS
+from app.job_queue import JobQueue
 
 
 class __Container:
-    """Container for dependencies."""
+    """Container for dependencies. Services are created on first use, so the app starts quickly."""
 
     def __init__(self):
-        self.idms_to_mysql_migration_service = IDMSToMySQLMigrationService()
+        self.job_queue = JobQueue(max_workers=JOB_WORKERS)
+        self.__idms_to_mysql_migration_service = None
+        self.__lock = Lock()
+
+    @property
+    def idms_to_mysql_migration_service(self):
+        """IDMS to MySQL migration service."""
+
+        with self.__lock:
+            if self.__idms_to_mysql_migration_service is None:
+                # Imported on first use, since the service's dependencies are slow to load
+                from app.idms_to_mysql_migration.service import IDMSToMySQLMigrationService
+
+                self.__idms_to_mysql_migration_service = IDMSToMySQLMigrationService()
+
+        return self.__idms_to_mysql_migration_service
 
 
 container = __Container()
@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor, Future
+from os import path
+from threading import Lock
+from time import perf_counter
+from typing import Dict, Optional
+
+
+class DownloadScheduler:
+    """
+    Concurrent S3 downloader.
+
+    Downloads are scheduled ahead of time with "prefetch" and run on a bounded thread pool, so files are fetched while
+    previously downloaded ones are being migrated. "get" waits for a download to complete.
+    """
+
+    def __init__(self, bucket, dest_dir: str, max_in_flight: int = 4):
+        """
+        :param bucket: S3 bucket to download from.
+        :param dest_dir: Local directory to download files into.
+        :param max_in_flight: Maximum number of concurrent downloads.
+        """
+
+        # Use the bucket's client, since S3 resources aren't thread-safe
+        self.client = bucket.meta.client
+        self.bucket_name = bucket.name
+        self.dest_dir = dest_dir
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_in_flight), thread_name_prefix='s3-download')
+        self.futures: Dict[str, Future] = dict()
+
+        # Stats
+        self.lock = Lock()
+        self.files_downloaded = 0
+        self.bytes_downloaded = 0
+        self.start_time: Optional[float] = None
+        self.end_time: Optional[float] = None
+
+    def prefetch(self, key: str):
+        """
+        Schedule a file to be downloaded, if not already scheduled.
+
+        :param key: Object key in S3.
+        """
+
+        if key in self.futures:
+            return
+
+        if self.start_time is None:
+            self.start_time = perf_counter()
+
+        self.futures[key] = self.executor.submit(self.__download, key)
+
+    def get(self, key: str) -> str:
+        """
+        Wait for a file to be downloaded, scheduling it first if needed.
+        Raises the download's exception if it failed (e.g. the object doesn't exist).
+
+        :param key: Object key in S3.
+        :return: Local file path.
+        """
+
+        self.prefetch(key)
+        return self.futures.pop(key).result()
+
+    def get_bytes_per_sec(self) -> float:
+        """
+        :return: Download throughput in bytes per second, measured from the first scheduled download to the last
+            completed one.
+        """
+
+        if self.start_time is None or self.end_time is None or self.end_time <= self.start_time:
+            return 0.0
+
+        return self.bytes_downloaded / (self.end_time - self.start_time)
+
+    def close(self):
+        """Cancel pending downloads and wait for in-flight ones to complete."""
+
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.futures.clear()
+
+    def __download(self, key: str) -> str:
+        local_path = path.join(self.dest_dir, path.basename(key))
+        self.client.download_file(self.bucket_name, key, local_path)
+
+        with self.lock:
+            self.files_downloaded += 1
+            self.bytes_downloaded += path.getsize(local_path)
+            self.end_time = perf_counter()
+
+        return local_path
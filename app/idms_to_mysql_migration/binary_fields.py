@@ -0,0 +1,167 @@
+from functools import partial
+from typing import Any, Callable
+
+from app.idms_to_mysql_migration.mysql_column import MySQLColumn
+
+# IDMS usages of packed decimal (COMP-3) and binary (COMP) fields. Any other usage is stored as display characters.
+PACKED_USAGES = ('COMP-3', 'PACKED-DECIMAL')
+BINARY_USAGES = ('COMP', 'COMP-4', 'COMP-5', 'BINARY')
+
+# Zones of the last byte of a signed zoned decimal field that mark it as negative
+NEGATIVE_ZONES = (0xB, 0xD)
+
+# Translation of zoned decimal bytes to ASCII digits by their digit (low) nibble, so the zone doesn't matter. Spaces
+# are kept, and bytes that aren't digits are translated to "?".
+ZONED_DIGITS = bytes(
+    0x20 if i in (0x40, 0x20) else 0x30 + (i & 0x0F) if (i & 0x0F) <= 9 else ord('?')
+    for i in range(256)
+)
+
+
+def get_storage_length(column: MySQLColumn) -> int:
+    """
+    :param column: MySQL column.
+    :return: Number of bytes the column's field takes up in a binary IDMS record.
+    """
+
+    if column.var_type == 'CHAR':
+        return column.length
+
+    if column.usage in PACKED_USAGES:
+        # Two digits per byte, plus the sign nibble
+        return column.length // 2 + 1
+
+    if column.usage in BINARY_USAGES:
+        # Halfword, fullword or doubleword, by number of digits
+        if column.length <= 4:
+            return 2
+        if column.length <= 9:
+            return 4
+        return 8
+
+    return column.length
+
+
+def decode_chars(code_page: str, convert: Callable[[str], Any], val: bytes) -> Any:
+    """
+    Convert a character field of a binary IDMS record.
+
+    :param code_page: Code page of the record's characters, e.g. "cp037".
+    :param convert: Converter of the field's characters.
+    :param val: Raw field bytes.
+    :return: Converted value.
+    """
+
+    return convert(val.decode(code_page))
+
+
+def decode_zoned(convert: Callable[[str], Any], negate: Callable[[Any], Any], val: bytes) -> Any:
+    """
+    Convert a zoned decimal (display) field of a binary IDMS record, with an optional sign in the zone of its last
+    byte.
+
+    :param convert: Converter of the field's digits.
+    :param negate: Negation of converted values.
+    :param val: Raw field bytes.
+    :return: Converted value.
+    """
+
+    # Uninitialized fields are filled with spaces or low-values
+    if val.count(0) == len(val):
+        return convert(' ' * len(val))
+
+    digits = val.translate(ZONED_DIGITS).decode('ascii')
+
+    if '?' in digits:
+        raise ValueError(f'Invalid zoned decimal field: {val.hex()}')
+
+    if (val[-1] >> 4) in NEGATIVE_ZONES and digits.strip('0'):
+        return negate(convert(digits))
+
+    return convert(digits)
+
+
+def decode_packed(length: int, convert: Callable[[str], Any], negate: Callable[[Any], Any], val: bytes) -> Any:
+    """
+    Convert a packed decimal (COMP-3) field of a binary IDMS record.
+
+    :param length: Number of digits of the field's PIC.
+    :param convert: Converter of the field's digits.
+    :param negate: Negation of converted values.
+    :param val: Raw field bytes.
+    :return: Converted value.
+    """
+
+    nibbles = val.hex()
+
+    # Digits of an even number of digits are preceded by an extra zero, and followed by the sign
+    digits = nibbles[-1 - length:-1]
+
+    if not digits.isdigit() or nibbles[-1].isdigit():
+        # Uninitialized fields are filled with spaces or low-values
+        if val.count(0x40) == len(val) or val.count(0) == len(val):
+            return convert(' ' * length)
+
+        raise ValueError(f'Invalid packed decimal field: {nibbles}')
+
+    if nibbles[-1] in 'bd' and digits.strip('0'):
+        return negate(convert(digits))
+
+    return convert(digits)
+
+
+def decode_binary(
+        length: int,
+        is_signed: bool,
+        convert: Callable[[str], Any],
+        negate: Callable[[Any], Any],
+        val: bytes
+) -> Any:
+    """
+    Convert a big-endian binary (COMP) field of a binary IDMS record.
+
+    :param length: Number of digits of the field's PIC.
+    :param is_signed: Whether the field is signed (two's complement).
+    :param convert: Converter of the field's digits.
+    :param negate: Negation of converted values.
+    :param val: Raw field bytes.
+    :return: Converted value.
+    """
+
+    number = int.from_bytes(val, 'big', signed=is_signed)
+    digits = str(abs(number)).zfill(length)
+
+    if len(digits) > length:
+        raise ValueError(f'Binary field value {number} has more than the {length} digits of its PIC')
+
+    if number < 0:
+        return negate(convert(digits))
+
+    return convert(digits)
+
+
+def get_binary_converter(
+        column: MySQLColumn,
+        code_page: str,
+        convert: Callable[[str], Any],
+        negate: Callable[[Any], Any]
+) -> Callable[[bytes], Any]:
+    """
+    Get the converter for a column's raw field bytes in binary IDMS records, which decodes the field to the same
+    characters as in text records, then converts them with the given converter.
+
+    :param column: MySQL column.
+    :param code_page: Code page of the record's characters, e.g. "cp037".
+    :param convert: Converter of the column's raw field values in text records.
+    :param negate: Negation of converted values, for negative numbers.
+    :return: Converter function.
+    """
+
+    if column.var_type == 'CHAR':
+        return partial(decode_chars, code_page, convert)
+    if column.usage in PACKED_USAGES:
+        return partial(decode_packed, column.length, convert, negate)
+    if column.usage in BINARY_USAGES:
+        return partial(decode_binary, column.length, column.is_signed, convert, negate)
+
+    return partial(decode_zoned, convert, negate)
@@ -0,0 +1,183 @@
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.idms_to_mysql_migration.mysql_column import MySQLColumn
+from app.idms_to_mysql_migration.row_decoder import RowDecoder, NUMERIC_VAR_TYPES
+
+# Whitespace lookup by byte, matching "str.strip" for ASCII
+WHITESPACE_TABLE = np.array([chr(i).isspace() for i in range(256)])
+
+ZERO = ord('0')
+QUOTE = ord("'")
+
+
+class BlockRowDecoder(RowDecoder):
+    """
+    Vectorized fixed-width IDMS row decoder, which decodes blocks of rows at once with NumPy.
+
+    A block of rows is read into a 2-D array of code points, so each field is a column slice of the array. Every
+    field's MySQL value is laid out in a fixed-width slot of an output array, together with a mask of which characters
+    are kept: leading zeroes of numbers, blank values and unescaped characters are masked out, and constants such as
+    "NULL" or the quotes of character values are masked in. The kept characters of all rows are then decoded as a
+    single string and split into rows, without any per-field Python work. Output is identical to "RowDecoder.decode".
+    """
+
+    def __init__(self, columns: List[MySQLColumn]):
+        super().__init__(columns)
+
+        # Output layout of each column: (kind, field start, field end, slot offset, integer digits), plus constant
+        # characters
+        layout: List[Tuple[str, int, int, int, int]] = list()
+        template = ['(']
+
+        for i, col in enumerate(columns):
+            if i > 0:
+                template += list(', ')
+
+            start, end, _ = self.fields[i]
+            offset = len(template)
+
+            if col.var_type in NUMERIC_VAR_TYPES:
+                # "NULL" if blank, then "0" if all zeroes, then the digits
+                layout.append(('numeric', start, end, offset, 0))
+                template += list('NULL0') + ['\0'] * col.length
+            elif col.var_type == 'DECIMAL':
+                # "0" if no integer digits, integer digits, ".", fraction digits, then "0" if no fraction digits
+                layout.append(('decimal', start, end, offset, col.length_1))
+                template += ['0'] + ['\0'] * col.length_1 + ['.'] + ['\0'] * (col.length - col.length_1) + ['0']
+            elif col.var_type == 'CHAR':
+                # Quotes around interleaved pairs of (escape character, character)
+                layout.append(('char', start, end, offset, 0))
+                template += ["'"] + ['\\', '\0'] * col.length + ["'"]
+            else:
+                layout.append(('raw', start, end, offset, 0))
+                template += ['\0'] * col.length
+
+        template += [')']
+        template = ''.join(template)
+
+        self.layout = tuple(layout)
+        self.template = np.frombuffer(template.encode('ascii'), dtype=np.uint8)
+
+    def decode_block(self, rows: List[str]) -> List[str]:
+        """
+        Decode a block of IDMS data rows to MySQL values, intended for MySQL "INSERT" statements.
+
+        :param rows: IDMS data rows.
+        :return: MySQL values of each row, as returned by "decode".
+        """
+
+        if not rows:
+            return list()
+
+        try:
+            codes = self.__to_codes(rows)
+        except UnicodeEncodeError:
+            # Fall back to decoding row by row if the block isn't ASCII
+            return [self.decode(row) for row in rows]
+
+        values = self.__decode_codes(codes, rows)
+
+        return [self.decode(row) for row in rows] if values is None else values
+
+    def decode_byte_block(self, rows: List[bytes], encoding: str) -> List[str]:
+        """
+        Decode a block of IDMS data rows read as bytes, without decoding them to text first unless the block isn't
+        ASCII.
+
+        :param rows: IDMS data rows, in an ASCII-compatible encoding.
+        :param encoding: Text encoding of the rows.
+        :return: MySQL values of each row, as returned by "decode".
+        """
+
+        if not rows:
+            return list()
+
+        codes = self.__to_codes(rows)
+        values = None if (codes >= 128).any() else self.__decode_codes(codes, rows)
+
+        return [self.decode(row.decode(encoding)) for row in rows] if values is None else values
+
+    def __to_codes(self, rows: List[Union[str, bytes]]) -> np.ndarray:
+        """
+        Read rows into a 2-D array of bytes. Rows shorter than the layout are padded with NUL bytes, which are dropped
+        from the output along with every masked out character, so fields are cut short exactly like slices of the row.
+
+        :param rows: IDMS data rows, as text or bytes.
+        :return: Array of bytes, one row per data row.
+        """
+
+        width = max(1, self.row_length)
+        return np.array(rows, dtype=f'S{width}').view(np.uint8).reshape(len(rows), width)
+
+    def __decode_codes(self, codes: np.ndarray, rows: List[Union[str, bytes]]) -> Optional[List[str]]:
+        """
+        :param codes: ASCII codes of the rows, as read by "__to_codes".
+        :param rows: IDMS data rows.
+        :return: MySQL values of each row, or None if the rows can't be decoded at once.
+        """
+
+        num_rows = len(rows)
+        width = codes.shape[1]
+
+        # NUL bytes are reserved for padding and dropped characters, so fall back if the block contains any
+        row_lengths = np.fromiter(map(len, rows), dtype=np.int64, count=num_rows)
+        if (np.count_nonzero(codes, axis=1) != np.minimum(row_lengths, width)).any():
+            return None
+
+        # Padding counts as whitespace, so blank fields have no non-whitespace characters
+        non_space = codes > 32
+        control = (codes < 32) & (codes > 0)
+        if control.any():
+            non_space |= control & ~WHITESPACE_TABLE[codes]
+
+        is_zero = codes == ZERO
+
+        out = np.empty((num_rows, len(self.template)), dtype=np.uint8)
+        out[:] = self.template
+
+        for kind, start, end, offset, length_1 in self.layout:
+            field = codes[:, start:end]
+            length = end - start
+
+            if kind == 'numeric':
+                blank = ~non_space[:, start:end].any(axis=1)
+                digits = field * ~np.logical_and.accumulate(is_zero[:, start:end], axis=1)
+                digits *= ~blank[:, None]
+
+                out[:, offset:offset + 4] *= blank[:, None]
+                out[:, offset + 4] *= ~(blank | digits.any(axis=1))
+                out[:, offset + 5:offset + 5 + length] = digits
+            elif kind == 'decimal':
+                split = start + length_1
+                left = codes[:, start:split] * ~np.logical_and.accumulate(is_zero[:, start:split], axis=1)
+                right_field = codes[:, split:end]
+                right_zero = (right_field == ZERO) | (right_field == 0)
+                right_stripped = np.logical_and.accumulate(right_zero[:, ::-1], axis=1)
+                right = right_field * ~right_stripped[:, ::-1]
+
+                out[:, offset] *= ~left.any(axis=1)
+                out[:, offset + 1:offset + 1 + length_1] = left
+                right_offset = offset + 2 + length_1
+                out[:, right_offset:right_offset + end - split] = right
+                out[:, right_offset + end - split] *= ~right.any(axis=1)
+            elif kind == 'char':
+                not_blank = non_space[:, start:end].any(axis=1)[:, None]
+
+                out[:, offset + 1:offset + 1 + 2 * length:2] *= not_blank & (field == QUOTE)
+                out[:, offset + 2:offset + 1 + 2 * length:2] = field * not_blank
+            else:
+                out[:, offset:offset + length] = field
+
+        # Drop masked out characters of all rows at once, then split them into rows
+        row_ends = np.cumsum(np.count_nonzero(out, axis=1)).tolist()
+        text = out.tobytes().translate(None, b'\0').decode('ascii')
+        values = list()
+        row_start = 0
+
+        for row_end in row_ends:
+            values.append(text[row_start:row_end])
+            row_start = row_end
+
+        return values
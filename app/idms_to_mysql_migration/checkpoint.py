@@ -0,0 +1,238 @@
+import json
+import pickle
+from os import path, makedirs, replace, fsync
+from typing import List, Optional
+
+from app.idms_to_mysql_migration.mysql_table import MySQLTable
+
+CHECKPOINT_FILENAME = 'checkpoint.jsonl'
+CHECKPOINT_TABLES_DIRNAME = 'checkpoint'
+
+
+class JobCheckpoint:
+    """
+    Durable progress of a migration job, kept in the job's output directory so a failed job can be resumed.
+
+    Records and sets are completed in listing order, so progress is a list of completed records followed by a list of
+    completed sets. Each entry holds the size of the MySQL output file once the entry was written to it, so a resumed
+    job can cut off anything written after the last completed entry and carry on from there.
+
+    The checkpoint file is a journal of JSON lines: the options, followed by a line per completed entry. Entries are
+    appended as they're completed, and only records are synced to disk, so checkpoints cost the same however many
+    entries came before. The journal is only rewritten, atomically, when a resumed job forgets entries.
+    """
+
+    def __init__(self, out_dir: str, options: dict):
+        """
+        :param out_dir: Output directory of the job.
+        :param options: Request options that affect the migrated output. A checkpoint written with other options is
+            discarded when loaded.
+        """
+
+        self.out_dir = out_dir
+        self.checkpoint_path = path.join(out_dir, CHECKPOINT_FILENAME)
+        self.tables_dir = path.join(out_dir, CHECKPOINT_TABLES_DIRNAME)
+        self.options = options
+        self.records: List[dict] = list()
+        self.sets: List[dict] = list()
+
+        makedirs(self.tables_dir, exist_ok=True)
+
+    def load(self, sql_size: int) -> bool:
+        """
+        Load the checkpoint of a previous run of the job, if any.
+
+        :param sql_size: Size of the MySQL output file of the previous run. Entries past it are dropped, since entries
+            that weren't synced may outlive output that wasn't either.
+        :return: Whether a checkpoint written with the same options was found.
+        """
+
+        if not path.exists(self.checkpoint_path):
+            return False
+
+        with open(self.checkpoint_path) as checkpoint_file:
+            lines = checkpoint_file.read().splitlines()
+
+        entries = list()
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # The last line may have been cut off by a crash
+                break
+
+        if not entries or entries[0].get('options') != self.options:
+            return False
+
+        for entry in entries[1:]:
+            if entry['sql_end'] > sql_size:
+                break
+
+            if entry['type'] == 'record':
+                self.records.append(entry)
+            else:
+                self.sets.append(entry)
+
+        return True
+
+    def get_record(self, i: int, record_key: str, content_key: str) -> Optional[dict]:
+        """
+        :param i: Index of the record in listing order.
+        :param record_key: Record key, e.g. the IDMS schema key in S3.
+        :param content_key: Content key of the record's inputs.
+        :return: Completed record at the given index, or None if it wasn't completed or its inputs have changed.
+        """
+
+        if i >= len(self.records):
+            return None
+
+        record = self.records[i]
+
+        if record['key'] != record_key or record['content_key'] != content_key:
+            return None
+
+        return record
+
+    def get_set(self, i: int, set_key: str, content_key: str) -> Optional[dict]:
+        """
+        :param i: Index of the set in listing order.
+        :param set_key: IDMS set key in S3.
+        :param content_key: Content key of the set.
+        :return: Completed set at the given index, or None if it wasn't completed or has changed.
+        """
+
+        if i >= len(self.sets):
+            return None
+
+        set_entry = self.sets[i]
+
+        if set_entry['key'] != set_key or set_entry['content_key'] != content_key:
+            return None
+
+        return set_entry
+
+    def load_table(self, i: int) -> MySQLTable:
+        """
+        :param i: Index of a completed record.
+        :return: MySQL table object of the record.
+        """
+
+        with open(self.__get_table_path(i), 'rb') as table_file:
+            return pickle.load(table_file)
+
+    def truncate(self, records_done: int, sets_done: int = 0):
+        """
+        Forget completed records and sets past the given counts, e.g. ones whose inputs have changed since.
+
+        :param records_done: Number of completed records to keep.
+        :param sets_done: Number of completed sets to keep.
+        """
+
+        if records_done < len(self.records):
+            sets_done = 0
+
+        self.records = self.records[:records_done]
+        self.sets = self.sets[:sets_done]
+
+    def get_sql_end(self) -> int:
+        """
+        :return: Size of the MySQL output file at the last completed entry.
+        """
+
+        if self.sets:
+            return self.sets[-1]['sql_end']
+        if self.records:
+            return self.records[-1]['sql_end']
+
+        return 0
+
+    def add_record(
+            self,
+            record_key: str,
+            content_key: str,
+            mysql_table: MySQLTable,
+            rows_written: int,
+            sql_end: int,
+            copybook_paths: List[str]
+    ):
+        """
+        Record a completed IDMS record.
+
+        :param record_key: Record key.
+        :param content_key: Content key of the record's inputs.
+        :param mysql_table: MySQL table object.
+        :param rows_written: Number of rows written.
+        :param sql_end: Size of the MySQL output file once the record was written to it.
+        :param copybook_paths: COBOL copybook output file paths.
+        """
+
+        with open(self.__get_table_path(len(self.records)), 'wb') as table_file:
+            pickle.dump(mysql_table, table_file)
+            table_file.flush()
+            fsync(table_file.fileno())
+
+        record = {
+            'type': 'record',
+            'key': record_key,
+            'content_key': content_key,
+            'rows_written': rows_written,
+            'sql_end': sql_end,
+            'copybooks': [path.basename(p) for p in copybook_paths],
+        }
+        self.records.append(record)
+        self.__append(record, should_sync=True)
+
+    def add_set(self, set_key: str, content_key: str, sql_end: int):
+        """
+        Record a completed IDMS set. Sets aren't synced to disk, so a crash may lose the sets since the last record.
+
+        :param set_key: IDMS set key in S3.
+        :param content_key: Content key of the set.
+        :param sql_end: Size of the MySQL output file once the set was written to it.
+        """
+
+        set_entry = {
+            'type': 'set',
+            'key': set_key,
+            'content_key': content_key,
+            'sql_end': sql_end,
+        }
+        self.sets.append(set_entry)
+        self.__append(set_entry)
+
+    def save(self):
+        """Rewrite the checkpoint file atomically with the current entries, and sync it to disk."""
+
+        temp_checkpoint_path = f'{self.checkpoint_path}.tmp'
+
+        with open(temp_checkpoint_path, 'w') as checkpoint_file:
+            for entry in [{'options': self.options}] + self.records + self.sets:
+                checkpoint_file.write(json.dumps(entry) + '\n')
+
+            checkpoint_file.flush()
+            fsync(checkpoint_file.fileno())
+
+        replace(temp_checkpoint_path, self.checkpoint_path)
+
+    def __append(self, entry: dict, should_sync: bool = False):
+        """
+        Append an entry to the checkpoint file.
+
+        :param entry: Completed record or set.
+        :param should_sync: Whether to sync the checkpoint file to disk.
+        """
+
+        with open(self.checkpoint_path, 'a') as checkpoint_file:
+            checkpoint_file.write(json.dumps(entry) + '\n')
+
+            if should_sync:
+                checkpoint_file.flush()
+                fsync(checkpoint_file.fileno())
+
+    def __get_table_path(self, i: int) -> str:
+        """
+        :param i: Index of a completed record.
+        :return: Path of the record's pickled MySQL table object.
+        """
+
+        return path.join(self.tables_dir, f'{i:05d}.pickle')
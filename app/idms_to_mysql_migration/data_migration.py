@@ -0,0 +1,529 @@
+import logging
+import mmap
+from functools import partial
+from os import path
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
+
+from app.cli import log
+from app.metrics import JobMetrics
+from app.idms_to_mysql_migration.block_decoder import BlockRowDecoder
+from app.idms_to_mysql_migration.external_sort import ExternalSorter, DEFAULT_SORT_BUFFER_SIZE
+from app.idms_to_mysql_migration.insert_writer import InsertWriter
+from app.idms_to_mysql_migration.mysql_loader import TableLoader
+from app.idms_to_mysql_migration.mysql_table import MySQLTable
+from app.idms_to_mysql_migration.parquet_writer import ParquetTableWriter
+from app.idms_to_mysql_migration.row_decoder import RowDecoder
+from app.idms_to_mysql_migration.tsv_writer import TSVWriter
+
+# Block size used when searching backwards for the start of a line
+LINE_SEARCH_BLOCK_SIZE = 64 * 1024
+
+# Number of duplicate primary keys reported as samples in the warning about duplicates
+DUPLICATE_KEY_SAMPLES = 5
+
+# Number of binary records read from a data file at once
+RECORD_READ_BLOCK_RECORDS = 1024
+
+# Size of the windows of memory-mapped data files split into lines at once
+MAPPED_WINDOW_SIZE = 4 * 1024 * 1024
+
+# All ASCII characters, to tell whether an encoding is ASCII-compatible
+ASCII_CHARS = ''.join(map(chr, range(128)))
+
+
+def migrate_data_lines(
+        lines: Iterable[Union[str, bytes]],
+        mysql_table: MySQLTable,
+        insert_writer: Union[InsertWriter, TSVWriter, ParquetTableWriter, TableLoader],
+        last_primary_key: Optional[Union[str, bytes]] = None,
+        decode_block_rows: int = 0,
+        metrics: Optional[JobMetrics] = None,
+        code_page: Optional[str] = None,
+        encoding: Optional[str] = None,
+        sort_dir: Optional[str] = None,
+        sort_buffer_size: int = DEFAULT_SORT_BUFFER_SIZE
+) -> Optional[Union[str, bytes]]:
+    """
+    Migrate IDMS data lines to rows for an existing MySQL table.
+
+    :param lines: IDMS data lines, as text or as bytes if an encoding is given, or binary records if a code page is
+        given.
+    :param mysql_table: MySQL table object.
+    :param insert_writer: Writer for the "INSERT" statements, or loader of the rows into MySQL.
+    :param last_primary_key: Primary key of the line preceding the given lines, if any.
+    :param decode_block_rows: Number of rows to decode at once, or 0 to decode row by row. Blocks of "INSERT"
+        statement rows are decoded with the vectorized decoder.
+    :param metrics: Job metrics to record decoding and writing time and skipped duplicates to, if any. Decoding and
+        writing are only timed separately when rows are decoded in blocks.
+    :param code_page: Code page of binary records, e.g. "cp037", or None for text lines.
+    :param encoding: ASCII-compatible encoding of lines read as bytes, or None if they're read as text.
+    :param sort_dir: Local directory for spilled runs to sort lines by primary key with, dropping every duplicate
+        primary key rather than only adjacent ones, or None to keep lines in order.
+    :param sort_buffer_size: Maximum total size of the lines sorted in memory at once, if lines are sorted.
+    :return: Primary key of the last line.
+    """
+
+    row_decoder = mysql_table.get_row_decoder(insert_writer.row_decoder_class, code_page)
+    block: List[Union[str, bytes]] = list()
+
+    # Skipped duplicates are reported once at the end, with a few samples, rather than one warning each
+    duplicate_count = 0
+    duplicate_samples: List[str] = list()
+
+    # The vectorized decoder only decodes text lines
+    if decode_block_rows > 0 and insert_writer.row_decoder_class is RowDecoder and code_page is None:
+        row_decoder = mysql_table.get_row_decoder(BlockRowDecoder)
+
+    if encoding is not None and not isinstance(row_decoder, BlockRowDecoder):
+        # Only the vectorized decoder decodes bytes, so lines are decoded to text for the others
+        lines = decode_lines(lines, encoding)
+
+        if isinstance(last_primary_key, bytes):
+            last_primary_key = last_primary_key.decode(encoding)
+
+        encoding = None
+
+    # Binary records have no "UNLOAD" lines
+    unload_prefix = None if code_page is not None else 'UNLOAD ' if encoding is None else b'UNLOAD '
+    sorter = None
+
+    if sort_dir is not None:
+        sorter = ExternalSorter(
+            sort_dir,
+            partial(get_sort_key, code_page, encoding),
+            buffer_size=sort_buffer_size,
+            max_samples=DUPLICATE_KEY_SAMPLES
+        )
+        lines = sorter.sort(line for line in lines if unload_prefix is None or not line.startswith(unload_prefix))
+
+    for line in lines:
+        # Skip "UNLOAD" line
+        if unload_prefix is not None and line.startswith(unload_prefix):
+            continue
+
+        primary_key = line[:9]
+
+        # Primary keys are 9 characters, which are only the first 9 bytes if they're ASCII
+        if encoding is not None and not primary_key.isascii():
+            primary_key = line.decode(encoding)[:9]
+
+        # Skip if primary key already exists
+        if primary_key == last_primary_key:
+            duplicate_count += 1
+
+            if len(duplicate_samples) < DUPLICATE_KEY_SAMPLES:
+                duplicate_samples.append(
+                    primary_key.decode(code_page or encoding) if isinstance(primary_key, bytes) else primary_key
+                )
+
+            continue
+
+        last_primary_key = primary_key
+
+        if decode_block_rows > 0:
+            # Collect rows into blocks to parse at once
+            block.append(line)
+
+            if len(block) >= decode_block_rows:
+                write_block(row_decoder, block, insert_writer, mysql_table.name, metrics, encoding)
+                block = list()
+
+            continue
+
+        # Parse row and write it to output file
+        insert_writer.write_row(row_decoder.decode(line))
+
+    if block:
+        write_block(row_decoder, block, insert_writer, mysql_table.name, metrics, encoding)
+
+    if sorter is not None:
+        duplicate_count += sorter.duplicate_count
+        duplicate_samples = sorter.duplicate_samples + duplicate_samples
+
+        if metrics is not None and sorter.runs_spilled > 0:
+            metrics.count('sort_runs_spilled', sorter.runs_spilled, mysql_table.name)
+            metrics.count('sort_bytes_spilled', sorter.bytes_spilled, mysql_table.name)
+
+    if duplicate_count > 0:
+        log(
+            'Skipped %d rows with duplicate primary keys for table "%s", such as: %s.',
+            duplicate_count,
+            mysql_table.name,
+            ', '.join(f'"{k}"' for k in duplicate_samples),
+            level=logging.WARNING
+        )
+
+        if metrics is not None:
+            metrics.count('duplicates_skipped', duplicate_count, mysql_table.name)
+            metrics.count('warnings', table=mysql_table.name)
+
+    return last_primary_key
+
+
+def get_sort_key(code_page: Optional[str], encoding: Optional[str], line: Union[str, bytes]) -> str:
+    """
+    :param code_page: Code page of binary records, or None for text lines.
+    :param encoding: Encoding of lines read as bytes, or None if they're read as text.
+    :param line: IDMS data line, or binary record.
+    :return: Primary key of the line as text, to sort lines by.
+    """
+
+    if code_page is not None:
+        return line[:9].decode(code_page)
+
+    if encoding is None:
+        return line[:9]
+
+    primary_key = line[:9]
+
+    # Primary keys are 9 characters, which are only the first 9 bytes if they're ASCII
+    if primary_key.isascii():
+        return primary_key.decode('ascii')
+
+    return line.decode(encoding)[:9]
+
+
+def decode_lines(lines: Iterable[bytes], encoding: str) -> Iterator[str]:
+    """
+    :param lines: IDMS data lines, as bytes.
+    :param encoding: Text encoding.
+    :return: Lines, decoded to text.
+    """
+
+    for line in lines:
+        yield line.decode(encoding)
+
+
+def write_block(
+        row_decoder: RowDecoder,
+        block: List[Union[str, bytes]],
+        insert_writer: InsertWriter,
+        table_name: str,
+        metrics: Optional[JobMetrics] = None,
+        encoding: Optional[str] = None
+):
+    """
+    Parse a block of IDMS data lines at once and write the rows.
+
+    :param row_decoder: Row decoder of the MySQL table.
+    :param block: IDMS data lines.
+    :param insert_writer: Writer for the "INSERT" statements.
+    :param table_name: MySQL table name, for metrics.
+    :param metrics: Job metrics to record decoding and writing time to, if any.
+    :param encoding: Encoding of lines read as bytes, which are decoded by the vectorized decoder, or None for text.
+    """
+
+    if metrics is None:
+        for values in decode_block(row_decoder, block, encoding):
+            insert_writer.write_row(values)
+
+        return
+
+    with metrics.time('row_decode', table_name):
+        rows = decode_block(row_decoder, block, encoding)
+
+    with metrics.time('output_write', table_name):
+        for values in rows:
+            insert_writer.write_row(values)
+
+
+def decode_block(row_decoder: RowDecoder, block: List[Union[str, bytes]], encoding: Optional[str] = None) -> List:
+    """
+    :param row_decoder: Row decoder of the MySQL table.
+    :param block: IDMS data lines.
+    :param encoding: Encoding of lines read as bytes, which are decoded by the vectorized decoder, or None for text.
+    :return: Decoded values of each line.
+    """
+
+    if encoding is None:
+        return row_decoder.decode_block(block)
+
+    return row_decoder.decode_byte_block(block, encoding)
+
+
+def is_ascii_compatible(encoding: str) -> bool:
+    """
+    :param encoding: Text encoding.
+    :return: Whether ASCII characters are encoded as themselves, so lines and primary keys can be found in bytes.
+    """
+
+    try:
+        return ASCII_CHARS.encode(encoding) == ASCII_CHARS.encode('ascii')
+    except (LookupError, UnicodeEncodeError):
+        return False
+
+
+def get_chunk_ranges(file_path: str, chunk_size: int, record_length: int = 0) -> List[Tuple[int, int]]:
+    """
+    Split a data file into byte ranges of roughly the given size, cut at line boundaries, or at record boundaries of
+    binary records.
+
+    :param file_path: IDMS data file path.
+    :param chunk_size: Target chunk size in bytes.
+    :param record_length: Length of binary records in bytes, or 0 for text lines.
+    :return: List of (start, end) byte offsets.
+    """
+
+    file_size = path.getsize(file_path)
+    ranges = list()
+
+    if record_length > 0:
+        chunk_size = max(1, chunk_size // record_length) * record_length
+
+        for start in range(0, file_size, chunk_size):
+            ranges.append((start, min(start + chunk_size, file_size)))
+
+        return ranges
+
+    with open(file_path, 'rb') as file:
+        start = 0
+
+        while start < file_size:
+            end = start + chunk_size
+
+            if end >= file_size:
+                end = file_size
+            else:
+                # Move end to the end of the line it falls in
+                file.seek(end - 1)
+                file.readline()
+                end = file.tell()
+
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def read_mapped_lines(file: BinaryIO, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Read the lines of a byte range of a data file as bytes, without decoding them, through a memory map of the file.
+    Lines are split in large windows at once, and their line breaks are translated like text mode does, so the
+    encoding must be ASCII-compatible.
+
+    :param file: IDMS data file, opened as binary.
+    :param start: Start offset, at the start of a line.
+    :param end: End offset, at the end of a line, or None for the end of the file.
+    :return: Lines, including their line break.
+    """
+
+    file_size = path.getsize(file.name)
+    end = file_size if end is None else min(end, file_size)
+
+    # Empty files can't be mapped
+    if end <= start:
+        return
+
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        pos = start
+
+        while pos < end:
+            window_end = min(end, pos + MAPPED_WINDOW_SIZE)
+
+            if window_end < end:
+                # Cut the window after its last line break, or after the first one past it for very long lines
+                line_break = mapped.rfind(b'\n', pos, window_end)
+
+                if line_break == -1:
+                    line_break = mapped.find(b'\n', window_end, end)
+
+                window_end = end if line_break == -1 else line_break + 1
+
+            window = mapped[pos:window_end]
+            pos = window_end
+
+            if b'\r' in window:
+                window = window.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+            yield from window.splitlines(keepends=True)
+
+
+def read_records(file: BinaryIO, record_length: int, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Read the fixed-length binary records of a byte range of a data file.
+    A trailing partial record is skipped, with a warning.
+
+    :param file: IDMS data file, opened as binary.
+    :param record_length: Record length in bytes.
+    :param start: Start offset, at the start of a record.
+    :param end: End offset, at the end of a record, or None for the end of the file.
+    :return: Records.
+    """
+
+    # Streamed files can't seek, and are always read from the start
+    if start > 0:
+        file.seek(start)
+
+    pos = start
+    block_size = record_length * RECORD_READ_BLOCK_RECORDS
+
+    while end is None or pos < end:
+        block = file.read(block_size if end is None else min(block_size, end - pos))
+
+        if not block:
+            break
+
+        pos += len(block)
+        full_length = len(block) - len(block) % record_length
+
+        for i in range(0, full_length, record_length):
+            yield block[i:i + record_length]
+
+        # Reads of buffered files only come up short at the end of the file
+        if full_length < len(block):
+            log(
+                'Skipped a partial record of %d bytes at the end of a data file with %d-byte records.',
+                len(block) - full_length,
+                record_length,
+                level=logging.WARNING
+            )
+            break
+
+
+def find_line_start(file: BinaryIO, line_end: int) -> int:
+    """
+    Find the start offset of the line ending at the given offset.
+
+    :param file: File, opened as binary.
+    :param line_end: Offset just past the end of the line.
+    :return: Start offset of the line.
+    """
+
+    # Skip the line's own line break
+    search_end = line_end - 1
+
+    while search_end > 0:
+        block_start = max(0, search_end - LINE_SEARCH_BLOCK_SIZE)
+        file.seek(block_start)
+        block = file.read(search_end - block_start)
+        i = block.rfind(b'\n')
+
+        if i != -1:
+            return block_start + i + 1
+
+        search_end = block_start
+
+    return 0
+
+
+def get_previous_primary_key(file: BinaryIO, offset: int, encoding: str) -> Optional[str]:
+    """
+    Get the primary key of the last data line before the given offset, skipping "UNLOAD" lines.
+
+    :param file: IDMS data file, opened as binary.
+    :param offset: Offset at the start of a line.
+    :param encoding: Text encoding.
+    :return: Primary key, or None if there is no data line before the offset.
+    """
+
+    line_end = offset
+
+    while line_end > 0:
+        line_start = find_line_start(file, line_end)
+        file.seek(line_start)
+        line = file.read(line_end - line_start).decode(encoding)
+
+        if not line.startswith('UNLOAD '):
+            return line[:9]
+
+        line_end = line_start
+
+    return None
+
+
+def migrate_data_chunk(
+        file_path: str,
+        start: int,
+        end: int,
+        encoding: str,
+        mysql_table: MySQLTable,
+        fragment_path: str,
+        insert_batch_rows: int = 0,
+        insert_batch_bytes: int = 0,
+        sink: str = 'file',
+        decode_block_rows: int = 0,
+        code_page: Optional[str] = None,
+        record_length: int = 0
+) -> Tuple[int, JobMetrics]:
+    """
+    Migrate a byte range of an IDMS data file to its own MySQL output file.
+    Intended to be called from a worker process of the parallel migration pool.
+
+    :param file_path: IDMS data file path.
+    :param start: Start offset, at the start of a line.
+    :param end: End offset, at the end of a line.
+    :param encoding: Text encoding.
+    :param mysql_table: MySQL table object.
+    :param fragment_path: Output file path for the chunk's "INSERT" statements, tab-separated data or Parquet data.
+    :param insert_batch_rows: Maximum number of rows per "INSERT" statement (or Parquet record batch), or 0 for no
+        limit (or the default).
+    :param insert_batch_bytes: Maximum size of each "INSERT" statement in bytes, or 0 for no limit.
+    :param sink: Output mode, either "file" for "INSERT" statements, "tsv" for tab-separated data or "parquet" for
+        Parquet data.
+    :param decode_block_rows: Number of rows to decode at once, or 0 to decode row by row.
+    :param code_page: Code page of binary records, or None for text lines.
+    :param record_length: Length of binary records in bytes.
+    :return: Tuple of:
+        - Number of rows written.
+        - Metrics of the chunk, to be merged into the job's.
+    """
+
+    metrics = JobMetrics()
+    fragment_file = None
+
+    if sink == 'parquet':
+        insert_writer = ParquetTableWriter(fragment_path, mysql_table, batch_rows=insert_batch_rows)
+    else:
+        fragment_file = open(fragment_path, 'w')
+
+        if sink == 'tsv':
+            insert_writer = TSVWriter(fragment_file)
+        else:
+            insert_writer = InsertWriter(
+                fragment_file,
+                mysql_table,
+                max_rows=insert_batch_rows,
+                max_bytes=insert_batch_bytes
+            )
+
+    with open(file_path, 'rb') as data_file:
+        # Continue duplicate detection from the end of the previous chunk
+        if code_page is None:
+            last_primary_key = get_previous_primary_key(data_file, start, encoding)
+            lines = read_mapped_lines(data_file, start, end)
+            line_encoding = encoding
+
+            # Lines are read as bytes, so are their primary keys, unless they aren't ASCII
+            if last_primary_key is not None and last_primary_key.isascii():
+                last_primary_key = last_primary_key.encode(encoding)
+        else:
+            last_primary_key = None
+            line_encoding = None
+
+            if start > 0:
+                data_file.seek(start - record_length)
+                last_primary_key = data_file.read(record_length)[:9]
+
+            lines = read_records(data_file, record_length, start, end)
+
+        with metrics.time('data_convert', mysql_table.name):
+            migrate_data_lines(
+                lines,
+                mysql_table,
+                insert_writer,
+                last_primary_key,
+                decode_block_rows,
+                metrics,
+                code_page,
+                line_encoding
+            )
+
+            with metrics.time('output_write', mysql_table.name):
+                insert_writer.close()
+
+    if fragment_file is not None:
+        fragment_file.close()
+
+    metrics.count('rows_written', insert_writer.rows_written, mysql_table.name)
+
+    return insert_writer.rows_written, metrics
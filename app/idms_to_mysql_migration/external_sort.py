@@ -0,0 +1,163 @@
+import heapq
+import pickle
+from itertools import islice
+from os import makedirs
+from tempfile import TemporaryFile
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Union
+
+# Number of lines pickled together in run files
+RUN_BATCH_LINES = 4096
+
+# Maximum number of runs merged at once. More runs are merged into fewer, larger runs first.
+MERGE_FAN_IN = 64
+
+# Default maximum total size of the lines of a run sorted in memory
+DEFAULT_SORT_BUFFER_SIZE = 64 * 1024 * 1024
+
+
+class ExternalSorter:
+    """
+    Bounded-memory external merge sort of IDMS data lines by primary key, which also drops lines with duplicate
+    primary keys.
+
+    Lines are collected into runs of up to the buffer size, which are each sorted in memory and spilled to a temporary
+    file in the spill directory. The runs are then merged into a single stream of sorted lines. Sorting is stable, so
+    of the lines with the same primary key, the first one in the input is kept. Inputs that fit in a single run are
+    sorted in memory, without spilling.
+    """
+
+    def __init__(
+            self,
+            spill_dir: str,
+            get_key: Callable[[Union[str, bytes]], str],
+            buffer_size: int = DEFAULT_SORT_BUFFER_SIZE,
+            max_samples: int = 0
+    ):
+        """
+        :param spill_dir: Local directory for the temporary files of spilled runs.
+        :param get_key: Function to get the primary key of a line.
+        :param buffer_size: Maximum total size of the lines of a run, in characters or bytes. Memory used by the lines
+            is somewhat larger.
+        :param max_samples: Number of duplicate primary keys to keep as samples.
+        """
+
+        self.spill_dir = spill_dir
+        self.get_key = get_key
+        self.buffer_size = max(1, buffer_size)
+        self.max_samples = max_samples
+
+        # Stats
+        self.duplicate_count = 0
+        self.duplicate_samples: List[str] = list()
+        self.runs_spilled = 0
+        self.bytes_spilled = 0
+
+    def sort(self, lines: Iterable[Union[str, bytes]]) -> Iterator[Union[str, bytes]]:
+        """
+        Sort lines by primary key, without duplicate primary keys.
+
+        :param lines: IDMS data lines.
+        :return: Sorted lines.
+        """
+
+        runs: List[BinaryIO] = list()
+        merged_runs: List[BinaryIO] = list()
+
+        try:
+            run = list()
+            run_size = 0
+
+            for line in lines:
+                run.append(line)
+                run_size += len(line)
+
+                if run_size >= self.buffer_size:
+                    runs.append(self.__spill(self.__sort_run(run)))
+                    run = list()
+                    run_size = 0
+
+            if not runs:
+                yield from self.__sort_run(run)
+                return
+
+            if run:
+                runs.append(self.__spill(self.__sort_run(run)))
+
+            del run
+
+            # Merge groups of runs in input order, so merges stay stable
+            while len(runs) > MERGE_FAN_IN:
+                merged_runs = list()
+
+                for i in range(0, len(runs), MERGE_FAN_IN):
+                    group = runs[i:i + MERGE_FAN_IN]
+                    merged_runs.append(self.__spill(self.__merge(group)))
+
+                    for run_file in group:
+                        run_file.close()
+
+                runs = merged_runs
+
+            yield from self.__merge(runs)
+        finally:
+            # Runs of a merge pass that didn't finish are in both lists, and closing a run file twice is harmless
+            for run_file in runs + merged_runs:
+                run_file.close()
+
+    def __sort_run(self, run: List[Union[str, bytes]]) -> Iterator[Union[str, bytes]]:
+        run.sort(key=self.get_key)
+        return self.__drop_duplicates(run)
+
+    def __merge(self, runs: List[BinaryIO]) -> Iterator[Union[str, bytes]]:
+        # Lines with the same primary key are merged in the order of their runs
+        return self.__drop_duplicates(heapq.merge(*[self.__read_run(run_file) for run_file in runs], key=self.get_key))
+
+    def __drop_duplicates(self, lines: Iterable[Union[str, bytes]]) -> Iterator[Union[str, bytes]]:
+        last_key = None
+
+        for line in lines:
+            key = self.get_key(line)
+
+            if key == last_key:
+                self.duplicate_count += 1
+
+                if len(self.duplicate_samples) < self.max_samples:
+                    self.duplicate_samples.append(key)
+
+                continue
+
+            last_key = key
+            yield line
+
+    def __spill(self, lines: Iterator[Union[str, bytes]]) -> BinaryIO:
+        makedirs(self.spill_dir, exist_ok=True)
+
+        # Deleted as soon as it's closed
+        run_file = TemporaryFile(dir=self.spill_dir)
+
+        try:
+            while True:
+                batch = list(islice(lines, RUN_BATCH_LINES))
+
+                if not batch:
+                    break
+
+                pickle.dump(batch, run_file, protocol=pickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            run_file.close()
+            raise
+
+        self.runs_spilled += 1
+        self.bytes_spilled += run_file.tell()
+        run_file.seek(0)
+
+        return run_file
+
+    def __read_run(self, run_file: BinaryIO) -> Iterator[Union[str, bytes]]:
+        while True:
+            try:
+                batch = pickle.load(run_file)
+            except EOFError:
+                return
+
+            yield from batch
@@ -0,0 +1,88 @@
+from typing import TextIO
+
+from app.idms_to_mysql_migration.mysql_table import MySQLTable
+from app.idms_to_mysql_migration.row_decoder import RowDecoder
+
+
+def get_size(text: str) -> int:
+    """
+    :param text: Text.
+    :return: Size of the text in bytes, once encoded as UTF-8.
+    """
+
+    # ASCII characters are a single byte each, so most values don't need encoding
+    return len(text) if text.isascii() else len(text.encode('utf-8'))
+
+
+class InsertWriter:
+    """
+    Streaming writer for MySQL "INSERT" statements.
+
+    Rows are written to the output file as soon as they are parsed. A new "INSERT" statement is started whenever the
+    current one reaches the configured row or byte limit, which keeps memory usage flat and statements below MySQL's
+    "max_allowed_packet".
+    """
+
+    row_decoder_class = RowDecoder
+
+    def __init__(self, out_file: TextIO, mysql_table: MySQLTable, max_rows: int = 0, max_bytes: int = 0):
+        """
+        :param out_file: Output file.
+        :param mysql_table: MySQL table the rows belong to.
+        :param max_rows: Maximum number of rows per statement, or 0 for no limit.
+        :param max_bytes: Maximum size of each statement in UTF-8 encoded bytes, or 0 for no limit. A statement only
+            exceeds this limit if it consists of a single row that does.
+        """
+
+        self.out_file = out_file
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.rows_written = 0
+        self.statements_written = 0
+
+        # Get joined columns list
+        joined_columns = ',\n'.join(map(lambda c: f'\t{c}', mysql_table.get_column_names()))
+        self.header = f'\nINSERT INTO {mysql_table.name}(\n{joined_columns}\n) VALUES\n'
+        self.header_bytes = get_size(self.header)
+
+        # Current statement
+        self.stmt_rows = 0
+        self.stmt_bytes = 0
+
+    def write_row(self, values: str):
+        """
+        Write a single row of MySQL values.
+
+        :param values: MySQL values, as returned by "MySQLTable.parse_idms_row".
+        """
+
+        values_bytes = get_size(values) if self.max_bytes else 0
+
+        if self.stmt_rows > 0:
+            if (self.max_rows and self.stmt_rows >= self.max_rows) or \
+                    (self.max_bytes and self.stmt_bytes + values_bytes + 4 > self.max_bytes):
+                self.__end_statement()
+            else:
+                self.out_file.write(',\n')
+                self.stmt_bytes += 2
+
+        if self.stmt_rows == 0:
+            self.out_file.write(self.header)
+            self.stmt_bytes = self.header_bytes
+
+        self.out_file.write(values)
+        self.stmt_rows += 1
+        self.stmt_bytes += values_bytes
+        self.rows_written += 1
+
+    def close(self):
+        """End the current statement, if any."""
+
+        if self.stmt_rows > 0:
+            self.__end_statement()
+
+    def __end_statement(self):
+        self.out_file.write(';\n')
+        self.stmt_rows = 0
+        self.stmt_bytes = 0
+        self.statements_written += 1
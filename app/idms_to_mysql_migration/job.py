@@ -0,0 +1,259 @@
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha256
+from os import path, cpu_count
+from typing import Optional, List, Dict, TextIO
+
+from app.download_scheduler import DownloadScheduler
+from app.job_queue import MigrationJobStatus
+from app.upload_scheduler import UploadScheduler, GrowingFileUpload, DEFAULT_PART_SIZE
+from app.idms_to_mysql_migration.checkpoint import JobCheckpoint
+from app.idms_to_mysql_migration.external_sort import DEFAULT_SORT_BUFFER_SIZE
+from app.idms_to_mysql_migration.mysql_loader import MySQLLoader
+from app.idms_to_mysql_migration.mysql_table import MySQLTable
+from app.idms_to_mysql_migration.record_cache import RecordCache
+from app.migration_job import MigrationJob
+from app.utils.compression import COMPRESSION_SUFFIXES, add_compression_suffix
+
+MYSQL_OUT_FILENAME = 'idms_migration.sql'
+
+
+class IDMSToMySQLMigrationJob(MigrationJob):
+    """State of a single IDMS to MySQL migration job, including its request data."""
+
+    def __init__(self, data: dict, status: Optional[MigrationJobStatus] = None):
+        """
+        :param data: Request data.
+        :param status: Status of the queued job, if any.
+        """
+
+        super().__init__(status)
+
+        # Resume a previous job from its checkpoint, in its output directory
+        resume_key = 'resume'
+        self.resume_job_id = data[resume_key] if resume_key in data.keys() else None
+
+        if self.resume_job_id is not None:
+            if self.resume_job_id in ('', '.', '..') or path.basename(self.resume_job_id) != self.resume_job_id:
+                raise Exception(f'Invalid job ID "{self.resume_job_id}" to resume.')
+
+            self.temp_out_dir = path.join('temp', 'outputs', self.resume_job_id)
+
+            if not path.isdir(self.temp_out_dir):
+                raise Exception(f'No outputs found for job "{self.resume_job_id}" to resume.')
+
+        self.mysql_out_file_path = path.join(self.temp_out_dir, MYSQL_OUT_FILENAME)
+        self.mysql_out_file: Optional[TextIO] = None
+        self.mysql_tables: Dict[str, MySQLTable] = dict()
+        self.cobol_out_file: Optional[TextIO] = None
+        self.cobol_out_file_paths: List[str] = list()
+
+        # Sizes and ETags of listed S3 objects, by key
+        self.object_sizes: Dict[str, int] = dict()
+        self.object_etags: Dict[str, str] = dict()
+
+        # Downloads, uploads and worker processes
+        self.downloads: Optional[DownloadScheduler] = None
+        self.uploads: Optional[UploadScheduler] = None
+        self.sql_upload: Optional[GrowingFileUpload] = None
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+
+        # S3 paths of uploaded copybooks and data files
+        self.s3_copybook_paths: List[str] = list()
+        self.s3_data_paths: List[str] = list()
+
+        # Direct loader into the target MySQL database, for the "mysql" sink
+        self.mysql_loader: Optional[MySQLLoader] = None
+
+        # Cache of migrated records kept across jobs, for incremental migrations
+        self.record_cache: Optional[RecordCache] = None
+
+        # Durable progress of the job, for resuming it if it fails
+        self.checkpoint: Optional[JobCheckpoint] = None
+
+        # Parse request data
+        base_path = data['base_path']
+        self.base_path = base_path
+        self.s3_schemas_path = f"inputs/{base_path}/schemas"
+        self.s3_data_path = f"inputs/{base_path}/data"
+        self.s3_sets_path = f"inputs/{base_path}/sets"
+        self.s3_out_dir = f"outputs/{base_path}"
+        self.s3_out_path = f"{self.s3_out_dir}/{MYSQL_OUT_FILENAME}"
+        self.s3_cobol_copybook_out_path = f'inputs/{data["cobol_copybook_out_path"]}'
+
+        # Named by a hash of the base path, which may contain "/" and "..", so the cache stays under "temp/cache"
+        self.cache_dir = path.join('temp', 'cache', sha256(base_path.encode()).hexdigest())
+
+        should_upload_to_s3_key = 'upload_to_s3'
+        self.should_upload_to_s3 = data[should_upload_to_s3_key] if should_upload_to_s3_key in data.keys() else True
+
+        schemas_suffix_key = 'schemas_suffix'
+        self.schemas_suffix = data[schemas_suffix_key] if schemas_suffix_key in data.keys() else '_SCHEMA.txt'
+
+        data_suffix_key = 'data_suffix'
+        self.data_suffix = data[data_suffix_key] if data_suffix_key in data.keys() else '_DATA.txt'
+
+        set_suffix_key = 'set_suffix'
+        self.set_suffix = data[set_suffix_key] if set_suffix_key in data.keys() else '.txt'
+
+        should_migrate_fks_key = 'migrate_fks'
+        self.should_migrate_fks = data[should_migrate_fks_key] if should_migrate_fks_key in data.keys() else False
+
+        cobol_copybook_ext_key = 'cobol_copybook_ext'
+        self.cobol_copybook_ext = data[cobol_copybook_ext_key] if cobol_copybook_ext_key in data.keys() else ''
+
+        encoding_key = 'encoding'
+        self.encoding = data[encoding_key] if encoding_key in data.keys() else 'utf-8'
+
+        # Data files are either text lines, or fixed-length binary records of raw IDMS unloads
+        record_format_key = 'record_format'
+        self.record_format = data[record_format_key] if record_format_key in data.keys() else 'text'
+
+        if self.record_format not in ('text', 'binary'):
+            raise Exception(f'Invalid record format "{self.record_format}"; expected "text" or "binary".')
+
+        code_page_key = 'code_page'
+        self.code_page = data[code_page_key] if code_page_key in data.keys() else 'cp037'
+
+        record_length_key = 'record_length'
+        self.record_length = data[record_length_key] if record_length_key in data.keys() else 0
+
+        insert_batch_rows_key = 'insert_batch_rows'
+        self.insert_batch_rows = data[insert_batch_rows_key] if insert_batch_rows_key in data.keys() else 0
+
+        insert_batch_bytes_key = 'insert_batch_bytes'
+        self.insert_batch_bytes = data[insert_batch_bytes_key] if insert_batch_bytes_key in data.keys() else 0
+
+        parallel_key = 'parallel'
+        self.should_run_parallel = data[parallel_key] if parallel_key in data.keys() else False
+
+        workers_key = 'workers'
+        self.workers = data[workers_key] if workers_key in data.keys() else cpu_count()
+
+        max_downloads_key = 'max_downloads'
+        self.max_downloads = data[max_downloads_key] if max_downloads_key in data.keys() else 4
+
+        max_uploads_key = 'max_uploads'
+        self.max_uploads = data[max_uploads_key] if max_uploads_key in data.keys() else 8
+
+        upload_part_size_key = 'upload_part_size'
+        self.upload_part_size = data[upload_part_size_key] if upload_part_size_key in data.keys() else DEFAULT_PART_SIZE
+
+        upload_concurrency_key = 'upload_concurrency'
+        self.upload_concurrency = data[upload_concurrency_key] if upload_concurrency_key in data.keys() else 4
+
+        # The MySQL output file and copybooks can be compressed as they're uploaded to S3, under keys with the
+        # compression's suffix
+        output_compression_key = 'output_compression'
+        self.output_compression = data[output_compression_key] if output_compression_key in data.keys() else None
+
+        if self.output_compression is not None and self.output_compression not in COMPRESSION_SUFFIXES:
+            raise Exception(f'Invalid output compression "{self.output_compression}"; expected "gzip" or "zstd".')
+
+        self.s3_out_path = add_compression_suffix(self.s3_out_path, self.output_compression)
+
+        prefetch_key = 'prefetch'
+        self.prefetch = data[prefetch_key] if prefetch_key in data.keys() else 2
+
+        stream_data_key = 'stream_data'
+        self.should_stream_data = data[stream_data_key] if stream_data_key in data.keys() else False
+
+        data_chunk_size_key = 'data_chunk_size'
+        self.data_chunk_size = data[data_chunk_size_key] if data_chunk_size_key in data.keys() else 0
+
+        # Data files can be sorted by primary key, which also drops every duplicate primary key
+        sort_data_key = 'sort_data'
+        self.should_sort_data = data[sort_data_key] if sort_data_key in data.keys() else False
+
+        sort_buffer_size_key = 'sort_buffer_size'
+        self.sort_buffer_size = \
+            data[sort_buffer_size_key] if sort_buffer_size_key in data.keys() else DEFAULT_SORT_BUFFER_SIZE
+
+        sink_key = 'sink'
+        self.sink = data[sink_key] if sink_key in data.keys() else 'file'
+
+        decode_block_rows_key = 'decode_block_rows'
+        self.decode_block_rows = data[decode_block_rows_key] if decode_block_rows_key in data.keys() else 2048
+
+        mysql_loaders_key = 'mysql_loaders'
+        self.mysql_loaders = data[mysql_loaders_key] if mysql_loaders_key in data.keys() else 4
+
+        incremental_key = 'incremental'
+        self.should_run_incremental = data[incremental_key] if incremental_key in data.keys() else False
+
+    def add_mysql_table(self, mysql_table: MySQLTable):
+        """
+        Register a migrated MySQL table by name. If a table of the same name was already registered, it's kept.
+
+        :param mysql_table: MySQL table object.
+        """
+
+        self.mysql_tables.setdefault(mysql_table.name, mysql_table)
+
+    def get_output_options(self) -> dict:
+        """
+        :return: Request options that affect the migrated output of a record.
+        """
+
+        return {
+            'sink': self.sink,
+            'encoding': self.encoding,
+            'record_format': self.record_format,
+            'code_page': self.code_page,
+            'record_length': self.record_length,
+            'schemas_suffix': self.schemas_suffix,
+            'data_suffix': self.data_suffix,
+            'insert_batch_rows': self.insert_batch_rows,
+            'insert_batch_bytes': self.insert_batch_bytes,
+            'data_chunk_size': self.data_chunk_size,
+            'sort_data': self.should_sort_data,
+        }
+
+    def get_checkpoint_options(self) -> dict:
+        """
+        :return: Request options that affect the migrated output of the job as a whole.
+        """
+
+        return {
+            **self.get_output_options(),
+            'base_path': self.base_path,
+            'set_suffix': self.set_suffix,
+            'migrate_fks': self.should_migrate_fks,
+        }
+
+    def get_binary_code_page(self) -> Optional[str]:
+        """
+        :return: Code page of the binary records of data files, or None if data files are text.
+        """
+
+        return self.code_page if self.record_format == 'binary' else None
+
+    def get_sort_dir(self) -> Optional[str]:
+        """
+        :return: Local directory for the spilled runs of sorted data files, or None if data files aren't sorted.
+        """
+
+        return path.join(self.temp_inp_dir, 'sort') if self.should_sort_data else None
+
+    def get_data_out_file_path(self, table_name: str) -> str:
+        """
+        :param table_name: MySQL table name.
+        :return: Local path of the table's data file, for the "tsv" and "parquet" sinks. The sink is the extension.
+        """
+
+        return path.join(self.temp_out_dir, f'{table_name}.{self.sink}')
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+
+        # Open files, transfers, worker processes and MySQL connections stay with the process that created them
+        state['mysql_out_file'] = None
+        state['cobol_out_file'] = None
+        state['downloads'] = None
+        state['uploads'] = None
+        state['sql_upload'] = None
+        state['process_pool'] = None
+        state['mysql_loader'] = None
+        state['record_cache'] = None
+        state['checkpoint'] = None
+
+        return state
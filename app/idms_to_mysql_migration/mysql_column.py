@@ -9,6 +9,8 @@ class MySQLColumn:
             length_1: int = None,
             length_2: int = None,
             default_value=None,
+            usage: str = 'DISPLAY',
+            is_signed: bool = False,
     ):
         self.name = name
         self.var_type = var_type
@@ -16,3 +18,7 @@ class MySQLColumn:
         self.length_1 = length_1
         self.length_2 = length_2
         self.default_value = default_value
+
+        # Storage of the field in binary IDMS records, e.g. "DISPLAY" or "COMP-3", and whether its PIC is signed
+        self.usage = usage
+        self.is_signed = is_signed
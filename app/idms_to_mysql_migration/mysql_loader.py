@@ -0,0 +1,248 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future
+from queue import Queue, Empty, Full
+from typing import List, Optional
+
+from mysql.connector.pooling import MySQLConnectionPool, CNX_POOL_MAXSIZE
+
+from app.cli import log
+from app.idms_to_mysql_migration.mysql_table import MySQLTable
+from app.idms_to_mysql_migration.row_decoder import ParamRowDecoder
+
+# Seconds to wait for room in a table's batch queue before checking whether its loader failed
+QUEUE_PUT_TIMEOUT = 1.0
+
+
+class TableLoader:
+    """
+    Loader of rows into a single MySQL table.
+
+    Rows are collected into batches, which are queued and inserted by a dedicated loader thread with multi-row prepared
+    "INSERT" statements, so decoding the next rows overlaps with inserting the previous ones. Has the same interface as
+    "InsertWriter", so it can be used in its place.
+    """
+
+    row_decoder_class = ParamRowDecoder
+
+    def __init__(self, mysql_table: MySQLTable, batch_rows: int, max_queued_batches: int = 4):
+        """
+        :param mysql_table: MySQL table the rows belong to.
+        :param batch_rows: Number of rows per "INSERT" statement.
+        :param max_queued_batches: Maximum number of batches waiting to be inserted.
+        """
+
+        self.table_name = mysql_table.name
+        self.batch_rows = max(1, batch_rows)
+        self.rows_written = 0
+        self.batch: List[tuple] = list()
+        self.batches: Queue = Queue(maxsize=max(1, max_queued_batches))
+        self.future: Optional[Future] = None
+
+        column_names = mysql_table.get_column_names()
+        joined_columns = ', '.join(column_names)
+        placeholders = ', '.join(['%s'] * len(column_names))
+        self.sql = f'INSERT INTO {mysql_table.name} ({joined_columns}) VALUES ({placeholders})'
+
+    def write_row(self, values: tuple):
+        """
+        Write a single row of MySQL query parameters.
+
+        :param values: MySQL query parameters, as returned by "ParamRowDecoder.decode".
+        """
+
+        self.batch.append(values)
+        self.rows_written += 1
+
+        if len(self.batch) >= self.batch_rows:
+            self.__put(self.batch)
+            self.batch = list()
+
+    def close(self):
+        """Queue the last batch, if any, and signal the loader thread that no more rows follow."""
+
+        if self.batch:
+            self.__put(self.batch)
+            self.batch = list()
+
+        self.__put(None)
+
+    def abort(self):
+        """Drop the batches that weren't inserted yet, and signal the loader thread to stop after the current one."""
+
+        self.batch = list()
+
+        while True:
+            try:
+                self.batches.get_nowait()
+            except Empty:
+                break
+
+        self.batches.put_nowait(None)
+
+    def __put(self, batch: Optional[List[tuple]]):
+        """
+        Queue a batch for the loader thread, or None to end the load.
+        Raises the loader thread's exception if it failed, rather than waiting for room in the queue forever.
+
+        :param batch: Batch of rows.
+        """
+
+        while True:
+            try:
+                self.batches.put(batch, timeout=QUEUE_PUT_TIMEOUT)
+                return
+            except Full:
+                if self.future is not None and self.future.done():
+                    self.future.result()
+                    raise Exception(f'Loader for table "{self.table_name}" stopped unexpectedly.')
+
+
+class MySQLLoader:
+    """
+    Direct loader of migrated schemas and data into a target MySQL database.
+
+    DDL is executed as soon as it's migrated. Each table's data is loaded by its own thread with its own pooled
+    connection, so several tables load in parallel. Statements that depend on the loaded data, such as foreign key
+    constraints, are deferred until all data has been loaded.
+    """
+
+    connection_pool_class = MySQLConnectionPool
+
+    def __init__(
+            self,
+            host: str,
+            port: int,
+            user: str,
+            password: str,
+            database: str,
+            max_loaders: int = 4,
+            batch_rows: int = 1000
+    ):
+        """
+        :param host: MySQL host.
+        :param port: MySQL port.
+        :param user: MySQL user.
+        :param password: MySQL password.
+        :param database: Target MySQL database.
+        :param max_loaders: Maximum number of tables loaded at once.
+        :param batch_rows: Number of rows per "INSERT" statement.
+        """
+
+        max_loaders = max(1, min(max_loaders, CNX_POOL_MAXSIZE - 1))
+
+        # One connection per loader thread, plus one for DDL
+        self.pool = self.connection_pool_class(
+            pool_name=f'eve-loader-{id(self)}',
+            pool_size=max_loaders + 1,
+            host=host,
+            port=port,
+            user=user,
+            password=password,
+            database=database,
+            autocommit=False
+        )
+        self.executor = ThreadPoolExecutor(max_workers=max_loaders, thread_name_prefix='mysql-loader')
+        self.batch_rows = batch_rows
+        self.table_loaders: List[TableLoader] = list()
+        self.deferred_statements: List[str] = list()
+
+    def execute(self, sql: str):
+        """
+        Execute a single statement immediately.
+
+        :param sql: SQL statement.
+        """
+
+        connection = self.pool.get_connection()
+
+        try:
+            cursor = connection.cursor()
+            cursor.execute(sql.strip().rstrip(';'))
+            cursor.close()
+            connection.commit()
+        finally:
+            connection.close()
+
+    def defer(self, sql: str):
+        """
+        Execute a single statement once all data has been loaded.
+
+        :param sql: SQL statement.
+        """
+
+        self.deferred_statements.append(sql)
+
+    def start_table(self, mysql_table: MySQLTable) -> TableLoader:
+        """
+        Start loading rows into a MySQL table, which must already exist.
+
+        :param mysql_table: MySQL table object.
+        :return: Table loader to write the rows to. Must be closed once all rows are written.
+        """
+
+        table_loader = TableLoader(mysql_table, self.batch_rows)
+        table_loader.future = self.executor.submit(self.__load, table_loader)
+        self.table_loaders.append(table_loader)
+
+        return table_loader
+
+    def finish(self) -> int:
+        """
+        Wait for all tables to be loaded, then execute deferred statements.
+        Raises the exception of the first load that failed, if any.
+
+        :return: Number of rows loaded.
+        """
+
+        rows_loaded = 0
+
+        for table_loader in self.table_loaders:
+            table_loader.future.result()
+            rows_loaded += table_loader.rows_written
+
+        self.executor.shutdown()
+
+        for sql in self.deferred_statements:
+            self.execute(sql)
+
+        return rows_loaded
+
+    def close(self):
+        """
+        Stop loading and close all pooled connections. Batches that weren't inserted yet are dropped, and loader threads
+        stop once their current batch is inserted.
+        """
+
+        for table_loader in self.table_loaders:
+            table_loader.abort()
+
+        self.table_loaders = list()
+        self.executor.shutdown(cancel_futures=True)
+
+        # Connection pools have no public way to close their connections
+        self.pool._remove_connections()
+
+    def __load(self, table_loader: TableLoader):
+        """
+        Insert queued batches of a table until the end of its load.
+
+        :param table_loader: Table loader.
+        """
+
+        connection = self.pool.get_connection()
+
+        try:
+            cursor = connection.cursor()
+            batch = table_loader.batches.get()
+
+            while batch is not None:
+                cursor.executemany(table_loader.sql, batch)
+                connection.commit()
+                batch = table_loader.batches.get()
+
+            cursor.close()
+        except Exception as e:
+            log(f'Failed to load data into MySQL table "{table_loader.table_name}": {e}', level=logging.ERROR)
+            raise
+        finally:
+            connection.close()
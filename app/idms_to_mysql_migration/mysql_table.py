@@ -1,6 +1,7 @@
-from typing import List
+from typing import Dict, List, Optional, Set, Tuple, Type
 
 from app.idms_to_mysql_migration.mysql_column import MySQLColumn
+from app.idms_to_mysql_migration.row_decoder import RowDecoder
 
 
 class MySQLTable:
@@ -9,9 +10,15 @@ class MySQLTable:
     def __init__(self, name: str, columns: List[MySQLColumn] = None):
         self.name = name
         self.columns: List[MySQLColumn] = list() if columns is None else columns.copy()
+        self.column_names: Set[str] = set(map(lambda c: c.name, self.columns))
+        self.__row_decoders: Dict[Tuple[Type[RowDecoder], Optional[str]], RowDecoder] = dict()
 
     def add_column(self, column: MySQLColumn):
         self.columns.append(column)
+        self.column_names.add(column.name)
+
+        # Invalidate compiled row decoders
+        self.__row_decoders = dict()
 
     def get_column_names(self) -> List[str]:
         """
@@ -22,59 +29,36 @@ class MySQLTable:
 
         return list(map(lambda c: c.name, self.columns))
 
-    def parse_idms_row(self, row: str) -> str:
+    def get_row_decoder(
+            self,
+            decoder_class: Type[RowDecoder] = RowDecoder,
+            code_page: Optional[str] = None
+    ) -> RowDecoder:
         """
-        Parse a single IDMS data row to MySQL values, intended for MySQL "INSERT" statements.
+        Get a row decoder for this table, compiling it from the current columns if needed.
 
-        :param row: IDMS data row.
-        :return: MySQL values.
+        :param decoder_class: Row decoder class, which determines the output format.
+        :param code_page: Code page of binary records, or None for text rows.
+        :return: Row decoder.
         """
 
-        vals = list()
-        remaining_row = row
-
-        for col in self.columns:
-            val = remaining_row[:col.length]
-
-            if col.var_type in ['NUMERIC', 'BIGINT', 'INT']:
-                # Migrate empty values for numeric types to "NULL"
-                if len(val.strip()) == 0:
-                    val = 'NULL'
-
-                # Remove leading zeroes
-                val = val.lstrip('0')
-                if len(val) == 0:
-                    val = '0'
-
-            if col.var_type == 'DECIMAL':
-                # Add decimal point to value
-                left = val[:col.length_1].lstrip("0")
-
-                if left == '':
-                    left = '0'
+        key = (decoder_class, code_page)
 
-                right = val[col.length_1:].rstrip("0")
+        if key not in self.__row_decoders:
+            self.__row_decoders[key] = decoder_class(self.columns) if code_page is None else \
+                decoder_class(self.columns, code_page)
 
-                if right == '':
-                    right = '0'
+        return self.__row_decoders[key]
 
-                val = f'{left}.{right}'
-
-            if col.var_type == 'CHAR':
-                # If "CHAR" type, simplify value as empty string
-                if len(val.strip()) == 0:
-                    val = ''
-
-                # Escape single quotes
-                val = val.replace("'", r"\'")
-
-            quote = "'" if col.var_type == 'CHAR' else ''
-            vals.append(f'{quote}{val}{quote}')
+    def parse_idms_row(self, row: str) -> str:
+        """
+        Parse a single IDMS data row to MySQL values, intended for MySQL "INSERT" statements.
 
-            remaining_row = remaining_row[col.length:]
+        :param row: IDMS data row.
+        :return: MySQL values.
+        """
 
-        joined_vals = ', '.join(vals)
-        return f'({joined_vals})'
+        return self.get_row_decoder().decode(row)
 
     def has_column(self, name: str) -> bool:
         """
@@ -82,4 +66,4 @@ class MySQLTable:
         :return: Whether this table has a column of the given name.
         """
 
-        return name in self.get_column_names()
+        return name in self.column_names
@@ -0,0 +1,41 @@
+from typing import List, Optional, Tuple
+
+from app.idms_to_mysql_migration.mysql_table import MySQLTable
+from app.metrics import JobMetrics
+
+# Migration service and job copies for the current worker process
+_service = None
+_job = None
+
+
+def init_worker(service, job):
+    """
+    Initialize a worker process of the parallel migration pool.
+
+    :param service: Migration service.
+    :param job: Migration job to copy state and request data from.
+    """
+
+    global _service, _job
+    _service = service
+    _job = job
+
+
+def migrate_record(
+        schema_key: str,
+        fragment_path: str
+) -> Tuple[MySQLTable, List[str], Optional[str], int, JobMetrics]:
+    """
+    Migrate a single IDMS record (schema and data) inside a worker process.
+
+    :param schema_key: IDMS schema key in S3.
+    :param fragment_path: Output file path for the record's MySQL statements.
+    :return: Tuple of:
+        - MySQL table object.
+        - COBOL copybook output file paths.
+        - Local path of the IDMS data file if it should be split into chunks by the caller, otherwise None.
+        - Number of rows written.
+        - Metrics of the record, to be merged into the job's.
+    """
+
+    return _service.migrate_record_fragment(_job, schema_key, fragment_path)
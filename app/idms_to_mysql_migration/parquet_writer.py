@@ -0,0 +1,128 @@
+from typing import List
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.idms_to_mysql_migration.mysql_column import MySQLColumn
+from app.idms_to_mysql_migration.mysql_table import MySQLTable
+from app.idms_to_mysql_migration.row_decoder import ArrowRowDecoder, NUMERIC_VAR_TYPES
+
+# Default number of rows per Arrow record batch
+PARQUET_BATCH_ROWS = 64 * 1024
+
+# Maximum number of digits of the Arrow types used for numeric columns
+ARROW_INT64_MAX_DIGITS = 18
+ARROW_DECIMAL128_MAX_PRECISION = 38
+
+
+def get_arrow_type(column: MySQLColumn) -> pa.DataType:
+    """
+    Get the Arrow type for a MySQL column.
+
+    :param column: MySQL column.
+    :return: Arrow type.
+    """
+
+    if column.var_type in NUMERIC_VAR_TYPES:
+        # Numbers too wide for a 64-bit integer are kept exact as decimals
+        if column.length > ARROW_INT64_MAX_DIGITS:
+            return get_arrow_decimal_type(column.length, 0)
+
+        return pa.int64()
+    if column.var_type == 'DECIMAL':
+        return get_arrow_decimal_type(column.length_1 + column.length_2, column.length_2)
+
+    return pa.string()
+
+
+def get_arrow_decimal_type(precision: int, scale: int) -> pa.DataType:
+    """
+    :param precision: Total number of digits.
+    :param scale: Number of digits after the decimal point.
+    :return: Arrow decimal type wide enough for the given precision.
+    """
+
+    if precision > ARROW_DECIMAL128_MAX_PRECISION:
+        return pa.decimal256(precision, scale)
+
+    return pa.decimal128(precision, scale)
+
+
+def get_arrow_schema(mysql_table: MySQLTable) -> pa.Schema:
+    """
+    :param mysql_table: MySQL table.
+    :return: Arrow schema with a field per column of the table.
+    """
+
+    return pa.schema([pa.field(column.name, get_arrow_type(column)) for column in mysql_table.columns])
+
+
+class ParquetTableWriter:
+    """
+    Streaming writer for Parquet data files, one per MySQL table.
+
+    Rows are collected into Arrow record batches, typed from the table's columns, and each batch is written to the
+    Parquet file as soon as it's full, which keeps memory usage bounded. Has the same interface as "InsertWriter", so
+    it can be used in its place.
+    """
+
+    row_decoder_class = ArrowRowDecoder
+
+    def __init__(self, out_file_path: str, mysql_table: MySQLTable, batch_rows: int = 0):
+        """
+        :param out_file_path: Output Parquet file path.
+        :param mysql_table: MySQL table the rows belong to.
+        :param batch_rows: Number of rows per record batch, or 0 for the default.
+        """
+
+        self.schema = get_arrow_schema(mysql_table)
+        self.writer = pq.ParquetWriter(out_file_path, self.schema)
+        self.batch_rows = batch_rows or PARQUET_BATCH_ROWS
+        self.batch: List[tuple] = list()
+        self.rows_written = 0
+
+    def write_row(self, values: tuple):
+        """
+        Write a single row.
+
+        :param values: Typed values, as returned by "ArrowRowDecoder.decode".
+        """
+
+        self.batch.append(values)
+        self.rows_written += 1
+
+        if len(self.batch) >= self.batch_rows:
+            self.__write_batch()
+
+    def write_file(self, file_path: str):
+        """
+        Append all rows of another Parquet file with the same schema, such as one written for a chunk of the table.
+
+        :param file_path: Parquet file path.
+        """
+
+        self.__write_batch()
+
+        parquet_file = pq.ParquetFile(file_path)
+
+        for record_batch in parquet_file.iter_batches(batch_size=self.batch_rows):
+            self.writer.write_batch(record_batch)
+
+        self.rows_written += parquet_file.metadata.num_rows
+
+    def close(self):
+        """Write the last record batch, if any, and close the Parquet file."""
+
+        self.__write_batch()
+        self.writer.close()
+
+    def __write_batch(self):
+        """Write collected rows to the Parquet file as a record batch, column by column."""
+
+        if not self.batch:
+            return
+
+        columns = zip(*self.batch)
+        arrays = [pa.array(values, type=field.type) for values, field in zip(columns, self.schema)]
+        self.writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self.batch = list()
@@ -0,0 +1,57 @@
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from app.constants.idms import IDMS_STD_PIC_W_LEN_REGEX, IDMS_SIGNED_INT_PIC_W_LEN_REGEX, \
+    IDMS_DECIMAL_PIC_W_LEN_REGEX, IDMS_DECIMAL_PIC_W_FIRST_LEN_REGEX
+from app.idms_to_mysql_migration.constants import IDMS_TO_MYSQL_TYPE_MAP
+
+
+@lru_cache(maxsize=None)
+def parse_idms_pic(idms_pic: str) -> Tuple[str, int, str, Optional[int], Optional[int]]:
+    """
+    Parse an IDMS PIC to a MySQL type.
+    Formats are tried in order until one matches, and results are cached per PIC, since schemas repeat the same few
+    PICs across many items.
+
+    :param idms_pic: IDMS PIC, e.g. "X(10)".
+    :return: Tuple of:
+        - MySQL type.
+        - Field length.
+        - MySQL type length, e.g. "(10)". Intended for use inside of a "CREATE TABLE" statement.
+        - Number of digits before the decimal point, for decimals.
+        - Number of digits after the decimal point, for decimals.
+    """
+
+    # PIC in format "X(1)"
+    match = IDMS_STD_PIC_W_LEN_REGEX.match(idms_pic)
+    if match is not None:
+        var_type = IDMS_TO_MYSQL_TYPE_MAP[match.group('type')]
+        var_len = int(match.group('len'))
+        var_len_str = '' if var_type == 'NUMERIC' else f'({var_len})'
+        return var_type, var_len, var_len_str, None, None
+
+    # PIC in format "S9(1)"
+    match = IDMS_SIGNED_INT_PIC_W_LEN_REGEX.match(idms_pic)
+    if match is not None:
+        var_len = int(match.group('len').lstrip('0'))
+        return 'BIGINT', var_len, f'({var_len})', None, None
+
+    # PIC in format "S9(1)V9(1)"
+    match = IDMS_DECIMAL_PIC_W_LEN_REGEX.match(idms_pic)
+    if match is not None:
+        len_1 = int(match.group('len_1').lstrip('0'))
+        len_2 = int(match.group('len_2').lstrip('0'))
+        return 'DECIMAL', len_1 + len_2, f'({len_1},{len_2})', len_1, len_2
+
+    # PIC in format "S9(1)V99"
+    match = IDMS_DECIMAL_PIC_W_FIRST_LEN_REGEX.match(idms_pic)
+    if match is not None:
+        len_1 = int(match.group('len_1').lstrip('0'))
+        len_2 = len(match.group('len_2'))
+        return 'DECIMAL', len_1 + len_2, f'({len_1},{len_2})', len_1, len_2
+
+    # PIC in format "XX"
+    var_type = IDMS_TO_MYSQL_TYPE_MAP[idms_pic[0]]
+    var_len = len(idms_pic)
+    var_len_str = '' if var_type == 'NUMERIC' else f'({var_len})'
+    return var_type, var_len, var_len_str, None, None
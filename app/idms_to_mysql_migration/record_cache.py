@@ -0,0 +1,251 @@
+import fcntl
+import json
+import pickle
+from contextlib import contextmanager
+from hashlib import sha1
+from os import path, makedirs, replace, stat
+from shutil import copyfile, copyfileobj, rmtree
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
+from uuid import uuid4
+
+from app.idms_to_mysql_migration.mysql_table import MySQLTable
+
+MANIFEST_FILENAME = 'manifest.json'
+LOCK_FILENAME = 'cache.lock'
+SQL_FILENAME = 'fragment.sql'
+TABLE_FILENAME = 'table.pickle'
+
+# Size of blocks copied from the MySQL output file
+COPY_BLOCK_SIZE = 1024 * 1024
+
+
+class RecordCache:
+    """
+    Local cache of migrated IDMS records, kept across jobs.
+
+    Each record's output (its MySQL statements, COBOL copybook, data files and table object) is stored under the
+    record's key, together with a content key of the inputs it was migrated from. A record whose content key is
+    unchanged can then be restored from the cache instead of being migrated again. The manifest of cached records is
+    rewritten atomically after every change, so it's always consistent with the cached files.
+
+    Jobs on the same inputs share a cache directory, so every operation holds an exclusive lock on the directory, and
+    reloads the manifest if another job changed it.
+    """
+
+    def __init__(self, cache_dir: str):
+        """
+        :param cache_dir: Local cache directory.
+        """
+
+        self.cache_dir = cache_dir
+        self.manifest_path = path.join(cache_dir, MANIFEST_FILENAME)
+        self.lock_path = path.join(cache_dir, LOCK_FILENAME)
+        self.records: Dict[str, dict] = dict()
+
+        # Modification time and size of the manifest when it was last loaded
+        self.manifest_stamp: Optional[Tuple[int, int]] = None
+
+        makedirs(cache_dir, exist_ok=True)
+
+        with self.__lock():
+            self.__load()
+
+    def get(self, record_key: str, content_key: str) -> Optional[dict]:
+        """
+        :param record_key: Record key, e.g. the IDMS schema key in S3.
+        :param content_key: Content key of the record's inputs.
+        :return: Cached record, or None if the record isn't cached or its inputs have changed.
+        """
+
+        with self.__lock():
+            self.__load()
+            return self.__get(record_key, content_key)
+
+    def restore(
+            self,
+            record_key: str,
+            content_key: str,
+            sql_out_file: TextIO,
+            out_dir: str
+    ) -> Tuple[MySQLTable, List[str], int]:
+        """
+        Restore a cached record's output.
+
+        :param record_key: Record key.
+        :param content_key: Content key of the record's inputs, which the cached output must still match.
+        :param sql_out_file: MySQL output file to append the record's statements to.
+        :param out_dir: Directory to copy the record's copybooks and data files to.
+        :return: Tuple of:
+            - MySQL table object.
+            - COBOL copybook output file paths.
+            - Number of rows written.
+        """
+
+        with self.__lock():
+            self.__load()
+            record = self.__get(record_key, content_key)
+
+            if record is None:
+                raise Exception(f'Cached output of "{record_key}" was replaced by another job.')
+
+            record_dir = self.__get_record_dir(record_key)
+
+            with open(path.join(record_dir, SQL_FILENAME)) as sql_file:
+                copyfileobj(sql_file, sql_out_file)
+
+            copybook_paths = list()
+            for filename in record['copybooks'] + record['data_files']:
+                out_path = path.join(out_dir, filename)
+                copyfile(path.join(record_dir, filename), out_path)
+
+                if filename in record['copybooks']:
+                    copybook_paths.append(out_path)
+
+            with open(path.join(record_dir, TABLE_FILENAME), 'rb') as table_file:
+                mysql_table = pickle.load(table_file)
+
+        return mysql_table, copybook_paths, record['rows_written']
+
+    def put(
+            self,
+            record_key: str,
+            content_key: str,
+            mysql_table: MySQLTable,
+            rows_written: int,
+            sql_path: str,
+            sql_start: int,
+            sql_end: int,
+            copybook_paths: List[str],
+            data_paths: List[str]
+    ):
+        """
+        Cache a migrated record's output, replacing any previously cached output of the record.
+
+        :param record_key: Record key.
+        :param content_key: Content key of the record's inputs.
+        :param mysql_table: MySQL table object.
+        :param rows_written: Number of rows written.
+        :param sql_path: MySQL output file path.
+        :param sql_start: Offset of the record's first statement in the MySQL output file.
+        :param sql_end: Offset just past the record's last statement in the MySQL output file.
+        :param copybook_paths: COBOL copybook output file paths.
+        :param data_paths: Data output file paths, e.g. for the "tsv" sink.
+        """
+
+        with self.__lock():
+            self.__load()
+
+            record_dir = self.__get_record_dir(record_key)
+            rmtree(record_dir, ignore_errors=True)
+            makedirs(record_dir)
+
+            # Copy the record's statements out of the MySQL output file
+            with open(sql_path, 'rb') as sql_file, open(path.join(record_dir, SQL_FILENAME), 'wb') as fragment_file:
+                sql_file.seek(sql_start)
+                remaining = sql_end - sql_start
+
+                while remaining > 0:
+                    block = sql_file.read(min(remaining, COPY_BLOCK_SIZE))
+
+                    if not block:
+                        break
+
+                    fragment_file.write(block)
+                    remaining -= len(block)
+
+            for file_path in copybook_paths + data_paths:
+                copyfile(file_path, path.join(record_dir, path.basename(file_path)))
+
+            with open(path.join(record_dir, TABLE_FILENAME), 'wb') as table_file:
+                pickle.dump(mysql_table, table_file)
+
+            self.records[record_key] = {
+                'content_key': content_key,
+                'rows_written': rows_written,
+                'copybooks': [path.basename(p) for p in copybook_paths],
+                'data_files': [path.basename(p) for p in data_paths],
+            }
+            self.__save()
+
+    def prune(self, record_keys: Iterable[str]):
+        """
+        Forget cached records other than the given ones, e.g. records whose inputs no longer exist.
+
+        :param record_keys: Keys of the records to keep.
+        """
+
+        record_keys = set(record_keys)
+
+        with self.__lock():
+            self.__load()
+
+            for record_key in [k for k in self.records.keys() if k not in record_keys]:
+                rmtree(self.__get_record_dir(record_key), ignore_errors=True)
+                del self.records[record_key]
+
+            self.__save()
+
+    @contextmanager
+    def __lock(self):
+        """Hold an exclusive lock on the cache directory, across threads and processes."""
+
+        # Locks are held per open file, so each holder opens the lock file itself
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __load(self):
+        """Load the manifest of cached records, unless it's unchanged since it was last loaded. Requires the lock."""
+
+        if not path.exists(self.manifest_path):
+            return
+
+        manifest_stat = stat(self.manifest_path)
+        manifest_stamp = (manifest_stat.st_mtime_ns, manifest_stat.st_size)
+
+        if manifest_stamp == self.manifest_stamp:
+            return
+
+        with open(self.manifest_path) as manifest_file:
+            self.records = json.load(manifest_file)['records']
+
+        self.manifest_stamp = manifest_stamp
+
+    def __save(self):
+        """Write the manifest of cached records, atomically. Requires the lock."""
+
+        temp_manifest_path = f'{self.manifest_path}.{uuid4().hex}.tmp'
+
+        with open(temp_manifest_path, 'w') as manifest_file:
+            json.dump({'records': self.records}, manifest_file)
+
+        replace(temp_manifest_path, self.manifest_path)
+
+        manifest_stat = stat(self.manifest_path)
+        self.manifest_stamp = (manifest_stat.st_mtime_ns, manifest_stat.st_size)
+
+    def __get(self, record_key: str, content_key: str) -> Optional[dict]:
+        """
+        :param record_key: Record key.
+        :param content_key: Content key of the record's inputs.
+        :return: Cached record, or None if the record isn't cached or its inputs have changed. Requires the lock.
+        """
+
+        record = self.records.get(record_key)
+
+        if record is None or record['content_key'] != content_key:
+            return None
+
+        return record
+
+    def __get_record_dir(self, record_key: str) -> str:
+        """
+        :param record_key: Record key.
+        :return: Local directory of the record's cached output.
+        """
+
+        return path.join(self.cache_dir, 'records', sha1(record_key.encode()).hexdigest())
@@ -0,0 +1,371 @@
+from decimal import Decimal
+from functools import partial
+from typing import Any, Callable, List, Optional, Tuple
+
+from app.idms_to_mysql_migration.binary_fields import get_binary_converter, get_storage_length
+from app.idms_to_mysql_migration.mysql_column import MySQLColumn
+
+NUMERIC_VAR_TYPES = ('NUMERIC', 'BIGINT', 'INT')
+
+
+def numeric_to_sql(val: str) -> str:
+    """
+    Convert a fixed-width numeric field to a MySQL value.
+
+    :param val: Raw field value.
+    :return: MySQL value.
+    """
+
+    # Migrate empty values for numeric types to "NULL"
+    if not val.strip():
+        return 'NULL'
+
+    # Remove leading zeroes
+    return val.lstrip('0') or '0'
+
+
+def decimal_to_sql(length_1: int, val: str) -> str:
+    """
+    Convert a fixed-width decimal field with an implied decimal point to a MySQL value.
+
+    :param length_1: Number of digits before the decimal point.
+    :param val: Raw field value.
+    :return: MySQL value.
+    """
+
+    # Add decimal point to value
+    left = val[:length_1].lstrip('0') or '0'
+    right = val[length_1:].rstrip('0') or '0'
+    return f'{left}.{right}'
+
+
+def char_to_sql(val: str) -> str:
+    """
+    Convert a fixed-width character field to a quoted MySQL value.
+
+    :param val: Raw field value.
+    :return: MySQL value.
+    """
+
+    # If "CHAR" type, simplify value as empty string
+    if not val.strip():
+        return "''"
+
+    # Escape single quotes
+    return "'" + val.replace("'", r"\'") + "'"
+
+
+def raw_to_sql(val: str) -> str:
+    """
+    Pass through a fixed-width field of any other type as-is.
+
+    :param val: Raw field value.
+    :return: MySQL value.
+    """
+
+    return val
+
+
+def get_sql_converter(column: MySQLColumn) -> Callable[[str], str]:
+    """
+    Get the converter for a column's raw field values to MySQL values.
+
+    :param column: MySQL column.
+    :return: Converter function.
+    """
+
+    if column.var_type in NUMERIC_VAR_TYPES:
+        return numeric_to_sql
+    if column.var_type == 'DECIMAL':
+        return partial(decimal_to_sql, column.length_1)
+    if column.var_type == 'CHAR':
+        return char_to_sql
+
+    return raw_to_sql
+
+
+def numeric_to_param(val: str) -> Optional[str]:
+    """
+    Convert a fixed-width numeric field to a MySQL query parameter.
+
+    :param val: Raw field value.
+    :return: Query parameter, or None for "NULL".
+    """
+
+    if not val.strip():
+        return None
+
+    return val.lstrip('0') or '0'
+
+
+def char_to_param(val: str) -> str:
+    """
+    Convert a fixed-width character field to a MySQL query parameter.
+
+    :param val: Raw field value.
+    :return: Query parameter.
+    """
+
+    if not val.strip():
+        return ''
+
+    return val
+
+
+def get_param_converter(column: MySQLColumn) -> Callable[[str], Optional[str]]:
+    """
+    Get the converter for a column's raw field values to MySQL query parameters.
+
+    :param column: MySQL column.
+    :return: Converter function.
+    """
+
+    if column.var_type in NUMERIC_VAR_TYPES:
+        return numeric_to_param
+    if column.var_type == 'DECIMAL':
+        return partial(decimal_to_sql, column.length_1)
+    if column.var_type == 'CHAR':
+        return char_to_param
+
+    return raw_to_sql
+
+
+def numeric_to_arrow(val: str) -> Optional[int]:
+    """
+    Convert a fixed-width numeric field to an Arrow integer value.
+
+    :param val: Raw field value.
+    :return: Integer value, or None for "NULL".
+    """
+
+    if not val.strip():
+        return None
+
+    return int(val)
+
+
+def decimal_to_arrow(length_1: int, val: str) -> Optional[Decimal]:
+    """
+    Convert a fixed-width decimal field with an implied decimal point to an Arrow decimal value.
+
+    :param length_1: Number of digits before the decimal point.
+    :param val: Raw field value.
+    :return: Decimal value, or None for "NULL".
+    """
+
+    if not val.strip():
+        return None
+
+    return Decimal(decimal_to_sql(length_1, val))
+
+
+def get_arrow_converter(column: MySQLColumn) -> Callable[[str], Any]:
+    """
+    Get the converter for a column's raw field values to Arrow values.
+
+    :param column: MySQL column.
+    :return: Converter function.
+    """
+
+    if column.var_type in NUMERIC_VAR_TYPES:
+        return numeric_to_arrow
+    if column.var_type == 'DECIMAL':
+        return partial(decimal_to_arrow, column.length_1)
+    if column.var_type == 'CHAR':
+        return char_to_param
+
+    return raw_to_sql
+
+
+def escape_tsv(val: str) -> str:
+    """
+    Escape a value for a tab-separated data file, as read by MySQL "LOAD DATA" with its default escape character.
+
+    :param val: Value.
+    :return: Escaped value.
+    """
+
+    if '\\' in val:
+        val = val.replace('\\', '\\\\')
+    if '\t' in val:
+        val = val.replace('\t', '\\t')
+    if '\n' in val:
+        val = val.replace('\n', '\\n')
+
+    return val
+
+
+def numeric_to_tsv(val: str) -> str:
+    """
+    Convert a fixed-width numeric field to a tab-separated data file value.
+
+    :param val: Raw field value.
+    :return: Data file value, or "\\N" for "NULL".
+    """
+
+    if not val.strip():
+        return '\\N'
+
+    return val.lstrip('0') or '0'
+
+
+def char_to_tsv(val: str) -> str:
+    """
+    Convert a fixed-width character field to a tab-separated data file value.
+
+    :param val: Raw field value.
+    :return: Data file value.
+    """
+
+    if not val.strip():
+        return ''
+
+    return escape_tsv(val)
+
+
+def get_tsv_converter(column: MySQLColumn) -> Callable[[str], str]:
+    """
+    Get the converter for a column's raw field values to tab-separated data file values.
+
+    :param column: MySQL column.
+    :return: Converter function.
+    """
+
+    if column.var_type in NUMERIC_VAR_TYPES:
+        return numeric_to_tsv
+    if column.var_type == 'DECIMAL':
+        return partial(decimal_to_sql, column.length_1)
+    if column.var_type == 'CHAR':
+        return char_to_tsv
+
+    return escape_tsv
+
+
+class RowDecoder:
+    """
+    Fixed-width IDMS row decoder, compiled once per MySQL table.
+
+    Field offsets and per-column converters are resolved up front so decoding a row is a single pass of slices over
+    the original row, without re-slicing the remainder of the row for each column.
+
+    Given a code page, rows are binary records rather than text: fields are laid out by their storage length, and each
+    field's bytes are decoded to the characters it would have in a text row before being converted the same way.
+    """
+
+    def __init__(self, columns: List[MySQLColumn], code_page: Optional[str] = None):
+        """
+        :param columns: MySQL columns, in the order of their fields in a row.
+        :param code_page: Code page of binary records, e.g. "cp037", or None for text rows.
+        """
+
+        fields: List[Tuple[int, int, Callable[[Any], Any]]] = list()
+        offset = 0
+
+        for col in columns:
+            if code_page is None:
+                length = col.length
+                convert = self.get_converter(col)
+            else:
+                length = get_storage_length(col)
+                convert = get_binary_converter(col, code_page, self.get_converter(col), self.negate)
+
+            fields.append((offset, offset + length, convert))
+            offset += length
+
+        self.fields = tuple(fields)
+        self.row_length = offset
+
+    @staticmethod
+    def get_converter(column: MySQLColumn) -> Callable[[str], Any]:
+        """
+        Get the converter for a column's raw field values.
+
+        :param column: MySQL column.
+        :return: Converter function.
+        """
+
+        return get_sql_converter(column)
+
+    @staticmethod
+    def negate(value: Any) -> Any:
+        """
+        Negate a converted numeric value, for negative numbers of binary records.
+
+        :param value: Converted value.
+        :return: Negated value.
+        """
+
+        return '-' + value
+
+    def decode(self, row: str) -> str:
+        """
+        Decode a single IDMS data row to MySQL values, intended for MySQL "INSERT" statements.
+
+        :param row: IDMS data row.
+        :return: MySQL values.
+        """
+
+        return '(' + ', '.join([convert(row[start:end]) for start, end, convert in self.fields]) + ')'
+
+    def decode_block(self, rows: List[str]) -> List[Any]:
+        """
+        Decode a block of IDMS data rows, row by row.
+
+        :param rows: IDMS data rows.
+        :return: Decoded values of each row, as returned by "decode".
+        """
+
+        decode = self.decode
+        return [decode(row) for row in rows]
+
+
+class ParamRowDecoder(RowDecoder):
+    """Fixed-width IDMS row decoder to MySQL query parameters, intended for prepared "INSERT" statements."""
+
+    @staticmethod
+    def get_converter(column: MySQLColumn) -> Callable[[str], Optional[str]]:
+        return get_param_converter(column)
+
+    @staticmethod
+    def negate(value: Optional[str]) -> Optional[str]:
+        return None if value is None else '-' + value
+
+    def decode(self, row: str) -> tuple:
+        """
+        Decode a single IDMS data row to MySQL query parameters.
+
+        :param row: IDMS data row.
+        :return: Query parameters, one per column.
+        """
+
+        return tuple([convert(row[start:end]) for start, end, convert in self.fields])
+
+
+class TSVRowDecoder(RowDecoder):
+    """Fixed-width IDMS row decoder to lines of tab-separated data files, intended for MySQL "LOAD DATA" statements."""
+
+    @staticmethod
+    def get_converter(column: MySQLColumn) -> Callable[[str], str]:
+        return get_tsv_converter(column)
+
+    def decode(self, row: str) -> str:
+        """
+        Decode a single IDMS data row to a line of a tab-separated data file.
+
+        :param row: IDMS data row.
+        :return: Data file line, including the line break.
+        """
+
+        return '\t'.join([convert(row[start:end]) for start, end, convert in self.fields]) + '\n'
+
+
+class ArrowRowDecoder(ParamRowDecoder):
+    """Fixed-width IDMS row decoder to typed Python values, intended for Arrow record batches."""
+
+    @staticmethod
+    def get_converter(column: MySQLColumn) -> Callable[[str], Any]:
+        return get_arrow_converter(column)
+
+    @staticmethod
+    def negate(value: Any) -> Any:
+        return None if value is None else -value
@@ -1,197 +1,1116 @@
+import json
 import logging
 import re
-from flask import request
-from os import path
-from typing import Optional, List, Tuple
+from io import TextIOBase
+from concurrent.futures import ProcessPoolExecutor, Future, as_completed
+from multiprocessing import get_context
+from os import path, makedirs, remove, fsync
+from shutil import copyfileobj, rmtree
+from hashlib import sha256
+from time import perf_counter
+from typing import Optional, List, Tuple, TextIO, BinaryIO, Union
 
 from app.base_migration_service import BaseMigrationService
-from app.config import S3_EVE_BUCKET, S3_THEORY_BUCKET
+from app.config import S3_EVE_BUCKET, S3_THEORY_BUCKET, MYSQL_HOST, MYSQL_PORT, MYSQL_USER, MYSQL_PASSWORD, \
+    MYSQL_DATABASE
 from app.cli import log
-from app.constants.idms import IDMS_ELEM_ITEM_REGEX, IDMS_RECORD_NAME_REGEX, IDMS_STD_PIC_W_LEN_REGEX, \
-    IDMS_SET_HEADER_REGEX, \
-    IDMS_SET_OWNER_REGEX, IDMS_SET_MEMBER_REGEX, IDMS_SET_MEMBER_KEY_REGEX, IDMS_ITEM_REGEX, \
-    IDMS_DECIMAL_PIC_W_LEN_REGEX, IDMS_SIGNED_INT_PIC_W_LEN_REGEX, IDMS_DECIMAL_PIC_W_FIRST_LEN_REGEX
+from app.download_scheduler import DownloadScheduler
+from app.upload_scheduler import UploadScheduler, GrowingFileUpload
+from app.job_queue import MigrationJobStatus
+from app.metrics import JobMetrics
+from app.constants.idms import IDMS_ELEM_ITEM_REGEX, IDMS_RECORD_NAME_REGEX, IDMS_SET_HEADER_REGEX, \
+    IDMS_SET_OWNER_REGEX, IDMS_SET_MEMBER_REGEX, IDMS_SET_MEMBER_KEY_REGEX, IDMS_ITEM_REGEX
 from app.idms_to_mysql_migration.mysql_column import MySQLColumn
-from app.idms_to_mysql_migration.constants import IDMS_TO_MYSQL_TYPE_MAP, MYSQL_ID_COLUMN
+from app.idms_to_mysql_migration.constants import MYSQL_ID_COLUMN
+from app.idms_to_mysql_migration.checkpoint import JobCheckpoint
+from app.idms_to_mysql_migration.data_migration import migrate_data_lines, get_chunk_ranges, migrate_data_chunk, \
+    read_records, read_mapped_lines, is_ascii_compatible
+from app.idms_to_mysql_migration.insert_writer import InsertWriter
+from app.idms_to_mysql_migration.job import IDMSToMySQLMigrationJob
+from app.idms_to_mysql_migration.mysql_loader import MySQLLoader
 from app.idms_to_mysql_migration.mysql_table import MySQLTable
+from app.idms_to_mysql_migration.parallel import init_worker, migrate_record
+from app.idms_to_mysql_migration.parquet_writer import ParquetTableWriter
+from app.idms_to_mysql_migration.pic_parser import parse_idms_pic
+from app.idms_to_mysql_migration.record_cache import RecordCache
+from app.idms_to_mysql_migration.row_decoder import RowDecoder
+from app.idms_to_mysql_migration.tsv_writer import TSVWriter
 from app.utils.idms import IDMSUtils
+from app.utils.compression import get_compression, strip_compression_suffix, add_compression_suffix, open_input, \
+    open_decompressed
+from app.utils.s3 import open_s3_binary
+
+# Directory of the MySQL output fragments of records and data chunks, in the job's output directory
+FRAGMENTS_DIRNAME = 'fragments'
 
 
 class IDMSToMySQLMigrationService(BaseMigrationService):
-    def __init__(self):
-        super().__init__()
-        self.mysql_out_file = None
-        self.mysql_tables: List[MySQLTable] = list()
-        self.cobol_out_file = None
-        self.cobol_out_file_paths: List[str] = list()
-
-        # Request data
-        self.s3_schemas_path = ''
-        self.s3_data_path = ''
-        self.s3_sets_path = ''
-        self.s3_out_path = ''
-        self.should_upload_to_s3 = True
-        self.schemas_suffix = ''
-        self.data_suffix = ''
-        self.set_suffix = ''
-        self.should_migrate_fks = False
-        self.cobol_copybook_ext = ''
-        self.encoding = ''
-
-    def migrate(self) -> dict:
+    def migrate(self, data: dict, status: Optional[MigrationJobStatus] = None) -> dict:
         """
         Migrate all IDMS records (tables) to new MySQL tables.
         Includes schemas and data.
 
+        :param data: Request data.
+        :param status: Status of the queued job to run and report progress to, if any.
         :return: Output file path in S3.
         """
 
-        self.start_job()
+        job = IDMSToMySQLMigrationJob(data, status)
+        self.start_job(job)
 
-        # Reinitialize state
-        self.mysql_out_file = None
-        self.mysql_tables = list()
-        self.cobol_out_file = None
-        self.cobol_out_file_paths = list()
+        try:
+            return self.__run_job(job)
+        except Exception:
+            self.__abort_uploads(job)
+            raise
+        finally:
+            self.__tear_down(job)
 
-        # Create and open output files
-        mysql_out_filename = 'idms_migration.sql'
-        mysql_out_file_path = path.join(self.temp_out_dir, mysql_out_filename)
-        self.mysql_out_file = open(mysql_out_file_path, 'a')
+    def __run_job(self, job: IDMSToMySQLMigrationJob) -> dict:
+        """
+        Run a started migration job.
 
-        # Parse request data
-        data = request.json
-        base_path = data['base_path']
-        self.s3_schemas_path = f"inputs/{base_path}/schemas"
-        self.s3_data_path = f"inputs/{base_path}/data"
-        self.s3_sets_path = f"inputs/{base_path}/sets"
-        self.s3_out_path = f"outputs/{base_path}/{mysql_out_filename}"
-        s3_cobol_copybook_out_path = f'inputs/{data["cobol_copybook_out_path"]}'
+        :param job: Migration job.
+        :return: Output file paths in S3, and metrics of the job.
+        """
 
-        should_upload_to_s3_key = 'upload_to_s3'
-        self.should_upload_to_s3 = data[should_upload_to_s3_key] if should_upload_to_s3_key in data.keys() else True
+        job_start = perf_counter()
+        job.downloads = DownloadScheduler(self.bucket, job.temp_inp_dir, max_in_flight=job.max_downloads)
 
-        schemas_suffix_key = 'schemas_suffix'
-        self.schemas_suffix = data[schemas_suffix_key] if schemas_suffix_key in data.keys() else '_SCHEMA.txt'
+        if job.should_upload_to_s3:
+            # Outputs are uploaded as soon as each record is done, while the rest of the job is running
+            job.uploads = UploadScheduler(
+                self.bucket.meta.client,
+                max_in_flight=job.max_uploads,
+                part_size=job.upload_part_size,
+                part_concurrency=job.upload_concurrency
+            )
 
-        data_suffix_key = 'data_suffix'
-        self.data_suffix = data[data_suffix_key] if data_suffix_key in data.keys() else '_DATA.txt'
+        if job.sink == 'mysql':
+            # Rows are loaded in parallel per table by the MySQL loader, so worker processes aren't used
+            if job.should_run_parallel or job.data_chunk_size:
+                self.__log_issue(
+                    job,
+                    f'{job.tag}Parallel migration and data chunks are not supported by the "mysql" sink; ignoring.',
+                    level=logging.WARNING
+                )
+                job.should_run_parallel = False
+                job.data_chunk_size = 0
+
+            job.mysql_loader = MySQLLoader(
+                host=MYSQL_HOST,
+                port=MYSQL_PORT,
+                user=MYSQL_USER,
+                password=MYSQL_PASSWORD,
+                database=MYSQL_DATABASE,
+                max_loaders=job.mysql_loaders,
+                batch_rows=job.insert_batch_rows or 1000
+            )
 
-        set_suffix_key = 'set_suffix'
-        self.set_suffix = data[set_suffix_key] if set_suffix_key in data.keys() else '.txt'
+        if job.should_run_incremental:
+            if job.sink == 'mysql':
+                self.__log_issue(
+                    job,
+                    f'{job.tag}Incremental migration is not supported by the "mysql" sink; ignoring.',
+                    level=logging.WARNING
+                )
+            else:
+                job.record_cache = RecordCache(job.cache_dir)
+
+        if job.sink == 'mysql':
+            # Loads into the target database can't be rolled back to a checkpoint, so the job starts over
+            if job.resume_job_id is not None:
+                self.__log_issue(
+                    job,
+                    f'{job.tag}Resuming jobs is not supported by the "mysql" sink; starting over.',
+                    level=logging.WARNING
+                )
+        else:
+            job.checkpoint = JobCheckpoint(job.temp_out_dir, job.get_checkpoint_options())
 
-        should_migrate_fks_key = 'migrate_fks'
-        self.should_migrate_fks = data[should_migrate_fks_key] if should_migrate_fks_key in data.keys() else False
+            sql_size = path.getsize(job.mysql_out_file_path) if path.exists(job.mysql_out_file_path) else 0
 
-        cobol_copybook_ext_key = 'cobol_copybook_ext'
-        self.cobol_copybook_ext = data[cobol_copybook_ext_key] if cobol_copybook_ext_key in data.keys() else ''
+            if job.resume_job_id is not None and not job.checkpoint.load(sql_size):
+                self.__log_issue(
+                    job,
+                    f'{job.tag}No checkpoint of job "{job.resume_job_id}" found with the same options; starting over.',
+                    level=logging.WARNING
+                )
+
+        # List IDMS schemas and data in S3
+        job.status.phase = 'listing'
+        listing_start = perf_counter()
+        schema_keys = list()
+        for schema_obj in self.bucket.objects.filter(Prefix=job.s3_schemas_path):
+            if path.basename(schema_obj.key).strip() == '':
+                continue
 
-        encoding_key = 'encoding'
-        self.encoding = data[encoding_key] if encoding_key in data.keys() else 'utf-8'
+            schema_keys.append(schema_obj.key)
+            job.object_sizes[schema_obj.key] = schema_obj.size
+            job.object_etags[schema_obj.key] = schema_obj.e_tag
 
-        # List IDMS schemas in S3
-        schema_objects = self.bucket.objects.filter(Prefix=self.s3_schemas_path)
-        for schema_obj in schema_objects:
-            # Download IDMS schema from S3
-            schema_filename = path.basename(schema_obj.key)
+        for data_obj in self.bucket.objects.filter(Prefix=job.s3_data_path):
+            job.object_sizes[data_obj.key] = data_obj.size
+            job.object_etags[data_obj.key] = data_obj.e_tag
 
-            if schema_filename.strip() == '':
+        set_keys = list()
+        for set_obj in self.bucket.objects.filter(Prefix=job.s3_sets_path):
+            if path.basename(set_obj.key).strip() == '':
                 continue
 
-            log(f'{self.tag}Downloading {schema_obj.key}...', level=logging.DEBUG)
-            local_schema_path = path.join(self.temp_inp_dir, schema_filename)
-            self.bucket.download_file(schema_obj.key, local_schema_path)
-
-            # Create COBOL copybook output file
-            schema_name = schema_filename.replace(self.schemas_suffix, "")
-            cobol_out_filename = f'{schema_name}.txt'
-            cobol_out_file_path = path.join(self.temp_out_dir, cobol_out_filename)
-            self.cobol_out_file_paths.append(cobol_out_file_path)
-            self.cobol_out_file = open(cobol_out_file_path, 'a')
-
-            # Write main group item to copybook file
-            self.cobol_out_file.write(f'{" " * 7}01 {schema_name}.\n')
-
-            # Migrate IDMS schema file to a new MySQL table
-            log(f'{self.tag}Migrating schema from {schema_obj.key}...', level=logging.DEBUG)
-            mysql_table = self.__migrate_schema(local_schema_path)
-
-            # Close COBOL copybook output file
-            self.cobol_out_file.close()
-
-            # Download IDMS data from S3
-            data_filename = schema_filename.replace(self.schemas_suffix, self.data_suffix, 1)
-            data_key = f'{self.s3_data_path}/{data_filename}'
-            local_data_path = path.join(self.temp_inp_dir, data_filename)
-            has_data = False
-            log(f'{self.tag}Downloading {data_key}...', level=logging.DEBUG)
-            try:
-                self.bucket.download_file(data_key, local_data_path)
-                has_data = True
-            except:
-                log(f'No data found for IDMS schema "{schema_obj.key}".', level=logging.WARNING)
+            set_keys.append(set_obj.key)
+            job.object_sizes[set_obj.key] = set_obj.size
+            job.object_etags[set_obj.key] = set_obj.e_tag
+
+        job.metrics.add_time('listing', perf_counter() - listing_start)
+        job.status.tables_total = len(schema_keys)
+
+        if job.should_run_parallel or job.data_chunk_size:
+            # Worker processes are spawned rather than forked so they get their own S3 connections, made on first use.
+            # They're started once inputs are listed, so the job they get knows every input key
+            job.process_pool = ProcessPoolExecutor(
+                max_workers=job.workers,
+                mp_context=get_context('spawn'),
+                initializer=init_worker,
+                initargs=(self, job)
+            )
 
-            if has_data:
-                # Migrate IDMS data file to rows for the newly-created MySQL table
-                log(f'{self.tag}Migrating data from {data_key}...', level=logging.DEBUG)
-                self.__migrate_data(local_data_path, mysql_table)
+        # Restore progress of the resumed job, then cut off output written after its last checkpoint
+        records_done, sets_done = self.__restore_checkpoint(job, schema_keys, set_keys)
+        sql_end = 0 if job.checkpoint is None else job.checkpoint.get_sql_end()
 
-            # TODO: Delete all local downloaded files from "temp/inputs"
+        if path.exists(job.mysql_out_file_path):
+            with open(job.mysql_out_file_path, 'r+') as mysql_out_file:
+                mysql_out_file.truncate(sql_end)
 
-        # List IDMS sets in S3
-        set_objects = self.bucket.objects.filter(Prefix=self.s3_sets_path)
-        for set_obj in set_objects:
-            # Download IDMS set from S3
-            set_filename = path.basename(set_obj.key)
+        # Fragments of records that weren't merged are migrated again
+        rmtree(path.join(job.temp_out_dir, FRAGMENTS_DIRNAME), ignore_errors=True)
+
+        # Open MySQL output file
+        job.mysql_out_file = open(job.mysql_out_file_path, 'a')
+
+        if job.uploads is not None:
+            # Upload the MySQL output file in parts as it's written
+            job.sql_upload = GrowingFileUpload(
+                job.uploads,
+                job.mysql_out_file_path,
+                self.bucket.name,
+                job.s3_out_path,
+                compression=job.output_compression
+            )
+            self.__upload_sql_parts(job)
+
+        job.status.phase = 'migrating_records'
+
+        # Migrate IDMS records (schemas and data) to MySQL tables
+        if job.should_run_parallel:
+            self.__migrate_records_parallel(job, schema_keys[records_done:])
+        else:
+            remaining_schema_keys = schema_keys[records_done:]
+
+            for i, schema_key in enumerate(remaining_schema_keys):
+                # Download the next few records while this one is being migrated, unless they're cached
+                for next_schema_key in remaining_schema_keys[i:i + 1 + job.prefetch]:
+                    if self.__get_cached_record(job, next_schema_key) is not None:
+                        continue
+
+                    job.downloads.prefetch(next_schema_key)
+
+                    if not job.should_stream_data:
+                        job.downloads.prefetch(self.__get_data_key(job, next_schema_key))
+
+                if self.__get_cached_record(job, schema_key) is not None:
+                    mysql_table, cobol_out_file_paths, rows_written = self.__restore_cached_record(job, schema_key)
+                else:
+                    sql_start = self.__get_mysql_out_file_size(job)
+                    start_rows_written = job.status.rows_written
+                    cobol_out_file_count = len(job.cobol_out_file_paths)
+
+                    mysql_table, _ = self.__migrate_record(job, schema_key)
+                    rows_written = job.status.rows_written - start_rows_written
+                    cobol_out_file_paths = job.cobol_out_file_paths[cobol_out_file_count:]
+
+                    self.__cache_record(job, schema_key, mysql_table, rows_written, sql_start, cobol_out_file_paths)
+
+                self.__checkpoint_record(job, schema_key, mysql_table, rows_written, cobol_out_file_paths)
+                self.__record_done(job, schema_key, mysql_table, cobol_out_file_paths)
 
-            if set_filename.strip() == '':
+        # Forget cached records that no longer exist
+        if job.record_cache is not None:
+            job.record_cache.prune(schema_keys)
+
+        # Migrate IDMS sets
+        job.status.phase = 'migrating_sets'
+        for i, set_key in enumerate(set_keys):
+            # Skip sets completed before the job was resumed
+            if i < sets_done:
                 continue
 
-            local_set_path = path.join(self.temp_inp_dir, set_filename)
-            log(f'{self.tag}Downloading {set_obj.key}...', level=logging.DEBUG)
-            self.bucket.download_file(set_obj.key, local_set_path)
+            # Download IDMS set from S3
+            for next_set_key in set_keys[i:i + 1 + job.prefetch]:
+                job.downloads.prefetch(next_set_key)
+
+            log('%sDownloading %s...', job.tag, set_key, level=logging.DEBUG)
+            with job.metrics.time('download'):
+                local_set_path = job.downloads.get(set_key)
 
             # Migrate IDMS set to MySQL foreign key constraints or view
-            log(f'{self.tag}Migrating set from {set_obj.key}...', level=logging.DEBUG)
-            self.__migrate_set(local_set_path)
+            log('%sMigrating set from %s...', job.tag, set_key, level=logging.DEBUG)
+            with job.metrics.time('set_migrate'):
+                self.__migrate_set(job, local_set_path)
+
+            remove(local_set_path)
+            job.status.bytes_processed += job.object_sizes.get(set_key, 0)
+            job.metrics.count('sets')
+            job.metrics.count('bytes_read', job.object_sizes.get(set_key, 0))
+
+            if job.checkpoint is not None:
+                with job.metrics.time('checkpoint'):
+                    # Sets are cheap to redo, so the MySQL output file is only synced for records
+                    job.checkpoint.add_set(
+                        set_key,
+                        job.object_etags.get(set_key),
+                        self.__get_mysql_out_file_size(job)
+                    )
+
+            self.__upload_sql_parts(job)
 
-        self.mysql_out_file.close()
+        job.downloads.close()
+
+        if job.mysql_loader is not None:
+            # Wait for data to be loaded, then apply foreign keys and views
+            job.status.phase = 'loading'
+            log('%sWaiting for MySQL loads to complete...', job.tag, level=logging.DEBUG)
+            with job.metrics.time('loading'):
+                job.mysql_loader.finish()
+            job.mysql_loader.close()
+            job.mysql_loader = None
+
+        if job.process_pool is not None:
+            job.process_pool.shutdown()
+            job.process_pool = None
+
+        log(
+            f'{job.tag}Downloaded {job.downloads.files_downloaded} files '
+            f'({job.downloads.bytes_downloaded / 1e6:.1f} MB) at {job.downloads.get_bytes_per_sec() / 1e6:.1f} MB/s.'
+        )
+        job.metrics.count('files_downloaded', job.downloads.files_downloaded)
+        job.metrics.count('bytes_downloaded', job.downloads.bytes_downloaded)
 
-        s3_copybooks_paths = list()
+        job.mysql_out_file.close()
 
-        if self.should_upload_to_s3:
-            # Upload MySQL output file to S3
-            log(f'{self.tag}Uploading output files to S3...', level=logging.DEBUG)
-            self.bucket.upload_file(mysql_out_file_path, self.s3_out_path)
+        # Output files: the MySQL output file, copybooks, and data files of the "tsv" and "parquet" sinks
+        out_file_paths = [job.mysql_out_file_path] + job.cobol_out_file_paths
+        if job.sink in ('tsv', 'parquet'):
+            out_file_paths += [job.get_data_out_file_path(t.name) for t in job.mysql_tables.values()]
 
-            # Upload COBOL copybooks to S3
-            theory_bucket = self.s3.Bucket(S3_THEORY_BUCKET)
-            for copybook_path in self.cobol_out_file_paths:
-                s3_copybook_path = f'{s3_cobol_copybook_out_path}/{path.basename(copybook_path)}'
-                s3_copybooks_paths.append(s3_copybook_path)
-                theory_bucket.upload_file(copybook_path, s3_copybook_path)
+        job.metrics.count('bytes_written', sum(path.getsize(p) for p in out_file_paths if path.exists(p)))
 
-        self.succeed()
+        if job.uploads is not None:
+            # Wait for the remaining uploads, then upload the rest of the MySQL output file
+            job.status.phase = 'uploading'
+            log('%sWaiting for uploads to S3 to complete...', job.tag, level=logging.DEBUG)
+            with job.metrics.time('upload'):
+                job.uploads.wait()
+                job.sql_upload.finish()
+            job.uploads.close()
+
+            log(
+                f'{job.tag}Uploaded {job.uploads.files_uploaded} files '
+                f'({job.uploads.bytes_uploaded / 1e6:.1f} MB) at {job.uploads.get_bytes_per_sec() / 1e6:.1f} MB/s.'
+            )
+            job.metrics.count('files_uploaded', job.uploads.files_uploaded)
+            job.metrics.count('bytes_uploaded', job.uploads.bytes_uploaded)
+
+        job.metrics.add_time('total', perf_counter() - job_start)
+        self.succeed(job)
 
         return {
             'eve_bucket': S3_EVE_BUCKET,
             'theory_bucket': S3_THEORY_BUCKET,
-            'sql_file_path': self.s3_out_path,
-            'copybook_paths': s3_copybooks_paths,
+            'sql_file_path': job.s3_out_path,
+            'copybook_paths': job.s3_copybook_paths,
+            'data_file_paths': job.s3_data_paths,
+            'metrics': job.metrics.to_dict(),
         }
 
-    def __migrate_schema(self, file_path: str) -> MySQLTable:
+    def migrate_record_fragment(
+            self,
+            job: IDMSToMySQLMigrationJob,
+            schema_key: str,
+            fragment_path: str
+    ) -> Tuple[MySQLTable, List[str], Optional[str], int, JobMetrics]:
+        """
+        Migrate a single IDMS record (schema and data) to its own MySQL output file.
+        Intended to be called from a worker process of the parallel migration pool.
+
+        :param job: Migration job.
+        :param schema_key: IDMS schema key in S3.
+        :param fragment_path: Output file path for the record's MySQL statements.
+        :return: Tuple of:
+            - MySQL table object.
+            - COBOL copybook output file paths.
+            - Local path of the IDMS data file if it should be split into chunks by the caller, otherwise None.
+            - Number of rows written.
+            - Metrics of the record, to be merged into the job's.
+        """
+
+        job.mysql_out_file = open(fragment_path, 'w')
+        job.status.rows_written = 0
+        job.metrics = JobMetrics()
+        job.mysql_tables = dict()
+        job.cobol_out_file_paths = list()
+
+        # Download schema and data concurrently
+        job.downloads = DownloadScheduler(self.bucket, job.temp_inp_dir, max_in_flight=2)
+        job.downloads.prefetch(schema_key)
+
+        if not job.should_stream_data:
+            job.downloads.prefetch(self.__get_data_key(job, schema_key))
+
+        try:
+            mysql_table, chunked_data_path = self.__migrate_record(job, schema_key, should_defer_chunks=True)
+        finally:
+            job.downloads.close()
+            job.mysql_out_file.close()
+
+            if job.cobol_out_file is not None:
+                job.cobol_out_file.close()
+
+        log(
+            f'{job.tag}Downloaded {job.downloads.bytes_downloaded / 1e6:.1f} MB for {schema_key} at '
+            f'{job.downloads.get_bytes_per_sec() / 1e6:.1f} MB/s.',
+            level=logging.DEBUG
+        )
+        job.metrics.count('files_downloaded', job.downloads.files_downloaded)
+        job.metrics.count('bytes_downloaded', job.downloads.bytes_downloaded)
+
+        return mysql_table, job.cobol_out_file_paths, chunked_data_path, job.status.rows_written, job.metrics
+
+    def __migrate_records_parallel(self, job: IDMSToMySQLMigrationJob, schema_keys: List[str]):
+        """
+        Migrate IDMS records across the pool of worker processes.
+        Each record is written to its own MySQL output fragment, which is merged into the MySQL output file in the
+        order the schemas were listed, as soon as the record and all records before it are done.
+
+        :param job: Migration job.
+        :param schema_keys: IDMS schema keys in S3.
+        """
+
+        fragments_dir = self.__get_fragments_dir(job)
+        fragment_paths = list()
+        futures = dict()
+
+        # Cached records are restored rather than migrated
+        cached_records = [self.__get_cached_record(job, schema_key) for schema_key in schema_keys]
+
+        log('%sMigrating %s records across %s workers...', job.tag, len(schema_keys), job.workers, level=logging.DEBUG)
+
+        for i, schema_key in enumerate(schema_keys):
+            if cached_records[i] is not None:
+                fragment_paths.append(None)
+                continue
+
+            schema_name = self.__get_schema_name(job, schema_key)
+            fragment_path = path.join(fragments_dir, f'{i:05d}_{schema_name}.sql')
+            fragment_paths.append(fragment_path)
+            futures[job.process_pool.submit(migrate_record, schema_key, fragment_path)] = i
+
+        # Split large data files into chunks as soon as their records are done, and merge records in listing order as
+        # soon as they and all records before them are done, so output is deterministic and checkpointed as it grows
+        results = [None] * len(schema_keys)
+        data_chunks = [list() for _ in schema_keys]
+        chunked_data_paths = [None] * len(schema_keys)
+        completed_futures = as_completed(futures)
+
+        for i, schema_key in enumerate(schema_keys):
+            if cached_records[i] is not None:
+                mysql_table, cobol_out_file_paths, rows_written = self.__restore_cached_record(job, schema_key)
+                self.__checkpoint_record(job, schema_key, mysql_table, rows_written, cobol_out_file_paths)
+                self.__record_done(job, schema_key, mysql_table, cobol_out_file_paths)
+                continue
+
+            while results[i] is None:
+                future = next(completed_futures)
+                j = futures[future]
+
+                try:
+                    mysql_table, cobol_out_file_paths, chunked_data_path, rows_written, metrics = future.result()
+                except Exception as e:
+                    # Raised once the records before it are merged
+                    results[j] = e
+                    continue
+
+                results[j] = (mysql_table, cobol_out_file_paths, rows_written)
+                job.status.rows_written += rows_written
+                job.metrics.merge(metrics)
+
+                if chunked_data_path is not None:
+                    data_chunks[j] = self.__submit_data_chunks(job, chunked_data_path, mysql_table)
+                    chunked_data_paths[j] = chunked_data_path
+
+            if isinstance(results[i], Exception):
+                raise results[i]
+
+            mysql_table, cobol_out_file_paths, rows_written = results[i]
+            sql_start = self.__get_mysql_out_file_size(job)
+            job.add_mysql_table(mysql_table)
+            job.cobol_out_file_paths.extend(cobol_out_file_paths)
+
+            # Merge fragments into MySQL output file
+            with job.metrics.time('merge', mysql_table.name):
+                self.__merge_fragment(job, fragment_paths[i])
+
+            remove(fragment_paths[i])
+
+            if chunked_data_paths[i] is not None:
+                chunks_start_rows_written = job.status.rows_written
+                self.__merge_data_chunks(job, data_chunks[i], chunked_data_paths[i], mysql_table)
+                rows_written += job.status.rows_written - chunks_start_rows_written
+
+            self.__cache_record(job, schema_key, mysql_table, rows_written, sql_start, cobol_out_file_paths)
+            self.__checkpoint_record(job, schema_key, mysql_table, rows_written, cobol_out_file_paths)
+            self.__record_done(job, schema_key, mysql_table, cobol_out_file_paths)
+
+    def __record_done(
+            self,
+            job: IDMSToMySQLMigrationJob,
+            schema_key: str,
+            mysql_table: MySQLTable,
+            cobol_out_file_paths: List[str]
+    ):
+        """
+        Report a migrated IDMS record to the job status and metrics, and start uploading its output.
+
+        :param job: Migration job.
+        :param schema_key: IDMS schema key in S3.
+        :param mysql_table: MySQL table object.
+        :param cobol_out_file_paths: COBOL copybook output file paths of the record.
+        """
+
+        record_bytes = job.object_sizes.get(schema_key, 0)
+        record_bytes += job.object_sizes.get(self.__get_data_key(job, schema_key), 0)
+
+        job.status.tables_done += 1
+        job.status.bytes_processed += record_bytes
+        job.metrics.count('tables')
+        job.metrics.count('bytes_read', record_bytes)
+
+        if job.uploads is None:
+            return
+
+        # Upload COBOL copybooks to S3
+        for copybook_path in cobol_out_file_paths:
+            s3_copybook_path = f'{job.s3_cobol_copybook_out_path}/{path.basename(copybook_path)}'
+            s3_copybook_path = add_compression_suffix(s3_copybook_path, job.output_compression)
+            job.s3_copybook_paths.append(s3_copybook_path)
+            job.uploads.upload_file(copybook_path, S3_THEORY_BUCKET, s3_copybook_path, job.output_compression)
+
+        # Upload tab-separated or Parquet data file to S3, next to the MySQL output file
+        data_path = job.get_data_out_file_path(mysql_table.name)
+        if job.sink in ('tsv', 'parquet') and path.exists(data_path):
+            s3_data_path = f'{job.s3_out_dir}/{path.basename(data_path)}'
+
+            if s3_data_path not in job.s3_data_paths:
+                job.s3_data_paths.append(s3_data_path)
+
+            job.uploads.upload_file(data_path, self.bucket.name, s3_data_path)
+
+        self.__upload_sql_parts(job)
+
+    def __upload_sql_parts(self, job: IDMSToMySQLMigrationJob):
+        """
+        Start uploading the parts of the MySQL output file written so far, if it's uploaded to S3.
+
+        :param job: Migration job.
+        """
+
+        # The MySQL output file is only opened once progress of a resumed job has been restored
+        if job.sql_upload is None:
+            return
+
+        job.mysql_out_file.flush()
+        job.sql_upload.upload_parts()
+
+    def __tear_down(self, job: IDMSToMySQLMigrationJob):
+        """
+        Stop the workers and close the files of a finished migration job, whether it succeeded or failed, then delete
+        its local downloaded files.
+
+        :param job: Migration job.
+        """
+
+        if job.mysql_loader is not None:
+            job.mysql_loader.close()
+            job.mysql_loader = None
+
+        if job.process_pool is not None:
+            job.process_pool.shutdown(cancel_futures=True)
+            job.process_pool = None
+
+        if job.downloads is not None:
+            job.downloads.close()
+
+        if job.uploads is not None:
+            job.uploads.close()
+
+        for file in (job.mysql_out_file, job.cobol_out_file):
+            if file is not None:
+                file.close()
+
+        self.clean_up(job)
+
+    def __abort_uploads(self, job: IDMSToMySQLMigrationJob):
+        """
+        Cancel the pending uploads of a failed migration job, and abort its multipart upload of the MySQL output file.
+
+        :param job: Migration job.
+        """
+
+        if job.uploads is None:
+            return
+
+        job.uploads.close()
+
+        if job.sql_upload is not None:
+            try:
+                job.sql_upload.abort()
+            except Exception as e:
+                self.__log_issue(job, f'{job.tag}Failed to abort upload of {job.s3_out_path}: {e}', level=logging.ERROR)
+
+    def __get_record_content_key(self, job: IDMSToMySQLMigrationJob, schema_key: str) -> str:
+        """
+        :param job: Migration job.
+        :param schema_key: IDMS schema key in S3.
+        :return: Content key of an IDMS record, derived from the ETags of its schema and data and the output options.
+        """
+
+        content = [
+            job.object_etags.get(schema_key),
+            job.object_etags.get(self.__get_data_key(job, schema_key)),
+            job.get_output_options(),
+        ]
+
+        return sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+    def __get_cached_record(self, job: IDMSToMySQLMigrationJob, schema_key: str) -> Optional[dict]:
+        """
+        :param job: Migration job.
+        :param schema_key: IDMS schema key in S3.
+        :return: Cached output of the IDMS record if the job is incremental and the record is unchanged, otherwise None.
+        """
+
+        if job.record_cache is None:
+            return None
+
+        return job.record_cache.get(schema_key, self.__get_record_content_key(job, schema_key))
+
+    def __restore_cached_record(
+            self,
+            job: IDMSToMySQLMigrationJob,
+            schema_key: str
+    ) -> Tuple[MySQLTable, List[str], int]:
+        """
+        Restore the cached output of an unchanged IDMS record, instead of migrating it again.
+
+        :param job: Migration job.
+        :param schema_key: IDMS schema key in S3.
+        :return: Tuple of:
+            - MySQL table object.
+            - COBOL copybook output file paths.
+            - Number of rows written.
+        """
+
+        log('%sReusing cached output for unchanged %s...', job.tag, schema_key, level=logging.DEBUG)
+        restore_start = perf_counter()
+        mysql_table, cobol_out_file_paths, rows_written = job.record_cache.restore(
+            schema_key,
+            self.__get_record_content_key(job, schema_key),
+            job.mysql_out_file,
+            job.temp_out_dir
+        )
+
+        job.add_mysql_table(mysql_table)
+        job.cobol_out_file_paths.extend(cobol_out_file_paths)
+        job.status.rows_written += rows_written
+        job.metrics.add_time('restore', perf_counter() - restore_start, mysql_table.name)
+        job.metrics.count('tables_restored', table=mysql_table.name)
+        job.metrics.count('rows_written', rows_written, mysql_table.name)
+
+        return mysql_table, cobol_out_file_paths, rows_written
+
+    def __restore_checkpoint(
+            self,
+            job: IDMSToMySQLMigrationJob,
+            schema_keys: List[str],
+            set_keys: List[str]
+    ) -> Tuple[int, int]:
+        """
+        Restore the progress of a resumed job from its checkpoint, up to the first record or set that wasn't completed
+        or whose inputs have changed since.
+
+        :param job: Migration job.
+        :param schema_keys: IDMS schema keys in S3.
+        :param set_keys: IDMS set keys in S3.
+        :return: Tuple of:
+            - Number of completed records.
+            - Number of completed sets.
+        """
+
+        if job.checkpoint is None:
+            return 0, 0
+
+        records_done = 0
+        for i, schema_key in enumerate(schema_keys):
+            record = job.checkpoint.get_record(i, schema_key, self.__get_record_content_key(job, schema_key))
+
+            if record is None:
+                break
+
+            mysql_table = job.checkpoint.load_table(i)
+            job.add_mysql_table(mysql_table)
+            cobol_out_file_paths = [path.join(job.temp_out_dir, f) for f in record['copybooks']]
+            job.cobol_out_file_paths.extend(cobol_out_file_paths)
+            job.status.rows_written += record['rows_written']
+            job.metrics.count('tables_restored', table=mysql_table.name)
+            job.metrics.count('rows_written', record['rows_written'], mysql_table.name)
+            self.__record_done(job, schema_key, mysql_table, cobol_out_file_paths)
+            records_done += 1
+
+        sets_done = 0
+        if records_done == len(schema_keys):
+            for i, set_key in enumerate(set_keys):
+                if job.checkpoint.get_set(i, set_key, job.object_etags.get(set_key)) is None:
+                    break
+
+                job.status.bytes_processed += job.object_sizes.get(set_key, 0)
+                job.metrics.count('sets')
+                job.metrics.count('bytes_read', job.object_sizes.get(set_key, 0))
+                sets_done += 1
+
+        job.checkpoint.truncate(records_done, sets_done)
+        job.checkpoint.save()
+
+        if records_done or sets_done:
+            log(
+                f'{job.tag}Resuming job "{job.resume_job_id}" after {records_done}/{len(schema_keys)} records and '
+                f'{sets_done}/{len(set_keys)} sets...'
+            )
+
+        return records_done, sets_done
+
+    def __checkpoint_record(
+            self,
+            job: IDMSToMySQLMigrationJob,
+            schema_key: str,
+            mysql_table: MySQLTable,
+            rows_written: int,
+            cobol_out_file_paths: List[str]
+    ):
+        """
+        Record a completed IDMS record in the job's checkpoint, once its output is on disk.
+
+        :param job: Migration job.
+        :param schema_key: IDMS schema key in S3.
+        :param mysql_table: MySQL table object.
+        :param rows_written: Number of rows written for the record.
+        :param cobol_out_file_paths: COBOL copybook output file paths of the record.
+        """
+
+        if job.checkpoint is None:
+            return
+
+        with job.metrics.time('checkpoint', mysql_table.name):
+            job.checkpoint.add_record(
+                schema_key,
+                self.__get_record_content_key(job, schema_key),
+                mysql_table,
+                rows_written,
+                self.__sync_mysql_out_file(job),
+                cobol_out_file_paths
+            )
+
+    def __cache_record(
+            self,
+            job: IDMSToMySQLMigrationJob,
+            schema_key: str,
+            mysql_table: MySQLTable,
+            rows_written: int,
+            sql_start: int,
+            cobol_out_file_paths: List[str]
+    ):
+        """
+        Cache the output of a migrated IDMS record for later incremental jobs, if the job is incremental.
+
+        :param job: Migration job.
+        :param schema_key: IDMS schema key in S3.
+        :param mysql_table: MySQL table object.
+        :param rows_written: Number of rows written for the record.
+        :param sql_start: Size of the MySQL output file before the record was written to it.
+        :param cobol_out_file_paths: COBOL copybook output file paths of the record.
+        """
+
+        if job.record_cache is None:
+            return
+
+        data_paths = list()
+
+        if job.sink in ('tsv', 'parquet'):
+            data_path = job.get_data_out_file_path(mysql_table.name)
+
+            if path.exists(data_path):
+                data_paths.append(data_path)
+
+        with job.metrics.time('cache', mysql_table.name):
+            job.record_cache.put(
+                schema_key,
+                self.__get_record_content_key(job, schema_key),
+                mysql_table,
+                rows_written,
+                job.mysql_out_file_path,
+                sql_start,
+                self.__get_mysql_out_file_size(job),
+                cobol_out_file_paths,
+                data_paths
+            )
+
+    def __get_mysql_out_file_size(self, job: IDMSToMySQLMigrationJob) -> int:
+        """
+        :param job: Migration job.
+        :return: Size of the MySQL output file, including pending writes.
+        """
+
+        job.mysql_out_file.flush()
+        return path.getsize(job.mysql_out_file_path)
+
+    def __sync_mysql_out_file(self, job: IDMSToMySQLMigrationJob) -> int:
+        """
+        Write pending writes of the MySQL output file through to disk.
+
+        :param job: Migration job.
+        :return: Size of the MySQL output file.
+        """
+
+        size = self.__get_mysql_out_file_size(job)
+        fsync(job.mysql_out_file.fileno())
+
+        return size
+
+    def __get_fragments_dir(self, job: IDMSToMySQLMigrationJob) -> str:
+        """
+        :param job: Migration job.
+        :return: Local directory for MySQL output fragments of the job.
+        """
+
+        fragments_dir = path.join(job.temp_out_dir, FRAGMENTS_DIRNAME)
+        makedirs(fragments_dir, exist_ok=True)
+
+        return fragments_dir
+
+    def __merge_fragment(self, job: IDMSToMySQLMigrationJob, fragment_path: str, out_file: Optional[TextIO] = None):
+        """
+        Append an output fragment to the MySQL output file.
+
+        :param job: Migration job.
+        :param fragment_path: Fragment file path.
+        :param out_file: File to append to instead of the MySQL output file, if any.
+        """
+
+        with open(fragment_path) as fragment_file:
+            copyfileobj(fragment_file, job.mysql_out_file if out_file is None else out_file)
+
+    def __should_chunk_data(self, job: IDMSToMySQLMigrationJob, data_path: str) -> bool:
+        """
+        :param job: Migration job.
+        :param data_path: Local IDMS data file path.
+        :return: Whether the data file is large enough to be split into chunks migrated in parallel.
+        """
+
+        # Compressed files can only be read from the start, and sorted files are sorted as a whole
+        if get_compression(data_path) is not None or job.should_sort_data:
+            return False
+
+        # Chunks are cut at line breaks found in bytes, unless records are binary, which have a fixed length
+        if job.get_binary_code_page() is None and not is_ascii_compatible(job.encoding):
+            return False
+
+        return job.data_chunk_size > 0 and path.getsize(data_path) > job.data_chunk_size
+
+    def __get_record_length(self, job: IDMSToMySQLMigrationJob, mysql_table: MySQLTable) -> int:
+        """
+        :param job: Migration job.
+        :param mysql_table: MySQL table object.
+        :return: Length in bytes of the binary records of the table's data file, or 0 if data files are text. Unless
+            given, it's the length of the table's fields.
+        """
+
+        code_page = job.get_binary_code_page()
+
+        if code_page is None:
+            return 0
+
+        fields_length = mysql_table.get_row_decoder(RowDecoder, code_page).row_length
+
+        if job.record_length == 0:
+            return fields_length
+
+        if job.record_length < fields_length:
+            raise Exception(
+                f'Record length {job.record_length} is shorter than the {fields_length} bytes of the fields of table '
+                f'"{mysql_table.name}".'
+            )
+
+        return job.record_length
+
+    def __submit_data_chunks(
+            self,
+            job: IDMSToMySQLMigrationJob,
+            data_path: str,
+            mysql_table: MySQLTable
+    ) -> List[Tuple[Future, str]]:
+        """
+        Split an IDMS data file into chunks at line (or record) boundaries and submit them to the pool of worker
+        processes.
+
+        :param job: Migration job.
+        :param data_path: Local IDMS data file path.
+        :param mysql_table: MySQL table object.
+        :return: List of (future, fragment path) for each chunk, in file order.
+        """
+
+        fragments_dir = self.__get_fragments_dir(job)
+        record_length = self.__get_record_length(job, mysql_table)
+        chunk_ranges = get_chunk_ranges(data_path, job.data_chunk_size, record_length)
+        data_chunks = list()
+
+        log('%sMigrating %s in %s chunks...', job.tag, data_path, len(chunk_ranges), level=logging.DEBUG)
+
+        for i, (start, end) in enumerate(chunk_ranges):
+            fragment_ext = job.sink if job.sink in ('tsv', 'parquet') else 'sql'
+            fragment_path = path.join(fragments_dir, f'{mysql_table.name}_DATA_{i:05d}.{fragment_ext}')
+            future = job.process_pool.submit(
+                migrate_data_chunk,
+                data_path,
+                start,
+                end,
+                job.encoding,
+                mysql_table,
+                fragment_path,
+                job.insert_batch_rows,
+                job.insert_batch_bytes,
+                job.sink,
+                job.decode_block_rows,
+                job.get_binary_code_page(),
+                record_length
+            )
+            data_chunks.append((future, fragment_path))
+
+        return data_chunks
+
+    def __merge_data_chunks(
+            self,
+            job: IDMSToMySQLMigrationJob,
+            data_chunks: List[Tuple[Future, str]],
+            data_path: str,
+            mysql_table: MySQLTable
+    ):
+        """
+        Wait for data chunks to be migrated and merge them into the MySQL output file (or the table's data file) in
+        order.
+
+        :param job: Migration job.
+        :param data_chunks: List of (future, fragment path) for each chunk, in file order.
+        :param data_path: Local IDMS data file path, deleted once all chunks are merged.
+        :param mysql_table: MySQL table object.
+        """
+
+        tsv_out_file = open(job.get_data_out_file_path(mysql_table.name), 'w') if job.sink == 'tsv' else None
+        parquet_writer = None
+
+        if job.sink == 'parquet':
+            parquet_writer = ParquetTableWriter(job.get_data_out_file_path(mysql_table.name), mysql_table)
+
+        try:
+            for future, fragment_path in data_chunks:
+                rows_written, metrics = future.result()
+                job.status.rows_written += rows_written
+                job.metrics.merge(metrics)
+
+                with job.metrics.time('merge', mysql_table.name):
+                    if parquet_writer is not None:
+                        parquet_writer.write_file(fragment_path)
+                    else:
+                        self.__merge_fragment(job, fragment_path, tsv_out_file)
+
+                remove(fragment_path)
+        finally:
+            if parquet_writer is not None:
+                parquet_writer.close()
+
+            if tsv_out_file is not None:
+                tsv_out_file.close()
+
+        if tsv_out_file is not None:
+            job.mysql_out_file.write(TSVWriter.get_load_data_stmt(mysql_table, path.basename(tsv_out_file.name)))
+
+        remove(data_path)
+
+    def __migrate_record(
+            self,
+            job: IDMSToMySQLMigrationJob,
+            schema_key: str,
+            should_defer_chunks: bool = False
+    ) -> Tuple[MySQLTable, Optional[str]]:
+        """
+        Migrate a single IDMS record (schema and data) to a new MySQL table.
+
+        :param job: Migration job.
+        :param schema_key: IDMS schema key in S3.
+        :param should_defer_chunks: Whether to leave data files large enough to be split into chunks to the caller,
+            rather than migrating them here.
+        :return: Tuple of:
+            - MySQL table object.
+            - Local path of the IDMS data file if it was left to the caller to split into chunks, otherwise None.
+        """
+
+        # Download IDMS schema from S3
+        log('%sDownloading %s...', job.tag, schema_key, level=logging.DEBUG)
+        download_start = perf_counter()
+        local_schema_path = job.downloads.get(schema_key)
+        schema_download_secs = perf_counter() - download_start
+
+        # Create COBOL copybook output file
+        schema_name = self.__get_schema_name(job, schema_key)
+        cobol_out_filename = f'{schema_name}.txt'
+        cobol_out_file_path = path.join(job.temp_out_dir, cobol_out_filename)
+        job.cobol_out_file_paths.append(cobol_out_file_path)
+        job.cobol_out_file = open(cobol_out_file_path, 'w')
+
+        # Write main group item to copybook file
+        job.cobol_out_file.write(f'{" " * 7}01 {schema_name}.\n')
+
+        # Migrate IDMS schema file to a new MySQL table
+        log('%sMigrating schema from %s...', job.tag, schema_key, level=logging.DEBUG)
+        schema_parse_start = perf_counter()
+        mysql_table = self.__migrate_schema(job, local_schema_path)
+        job.metrics.add_time('schema_parse', perf_counter() - schema_parse_start, mysql_table.name)
+        job.metrics.add_time('download', schema_download_secs, mysql_table.name)
+
+        # Close COBOL copybook output file
+        job.cobol_out_file.close()
+
+        # Delete local downloaded schema file
+        remove(local_schema_path)
+
+        # Stream or download IDMS data from S3
+        data_key = self.__get_data_key(job, schema_key)
+        local_data_path = None
+        data_file = None
+        try:
+            if job.should_stream_data:
+                log('%sStreaming %s...', job.tag, data_key, level=logging.DEBUG)
+
+                data_file = open_decompressed(
+                    open_s3_binary(self.bucket, data_key),
+                    get_compression(data_key),
+                    'r' if job.get_binary_code_page() is None else 'rb',
+                    job.encoding
+                )
+            else:
+                log('%sDownloading %s...', job.tag, data_key, level=logging.DEBUG)
+                with job.metrics.time('download', mysql_table.name):
+                    local_data_path = job.downloads.get(data_key)
+
+                # Local text files are read as bytes, unless they're compressed or the encoding doesn't allow finding
+                # lines in bytes
+                if job.get_binary_code_page() is not None:
+                    data_file = open_input(local_data_path, 'rb')
+                elif get_compression(data_key) is None and is_ascii_compatible(job.encoding):
+                    data_file = open(local_data_path, 'rb')
+                else:
+                    data_file = open_input(local_data_path, encoding=job.encoding)
+        except:
+            self.__log_issue(job, f'No data found for IDMS schema "{schema_key}".', level=logging.WARNING)
+
+        if data_file is None:
+            return mysql_table, None
+
+        if local_data_path is not None and self.__should_chunk_data(job, local_data_path):
+            data_file.close()
+
+            # Migrate IDMS data file in chunks across the pool of worker processes
+            if should_defer_chunks:
+                return mysql_table, local_data_path
+
+            data_chunks = self.__submit_data_chunks(job, local_data_path, mysql_table)
+            self.__merge_data_chunks(job, data_chunks, local_data_path, mysql_table)
+            return mysql_table, None
+
+        # Migrate IDMS data file to rows for the newly-created MySQL table
+        log('%sMigrating data from %s...', job.tag, data_key, level=logging.DEBUG)
+        with data_file:
+            self.__migrate_data(job, data_file, mysql_table)
+
+        # Delete local downloaded data file
+        if local_data_path is not None:
+            remove(local_data_path)
+
+        return mysql_table, None
+
+    def __log_issue(self, job: IDMSToMySQLMigrationJob, message: str, level: int = logging.WARNING):
+        """
+        Log a warning or error of a migration job, and count it in the job's metrics.
+
+        :param job: Migration job.
+        :param message: Message.
+        :param level: Log level, either "logging.WARNING" or "logging.ERROR".
+        """
+
+        # Report the caller as the place the message was logged from, so warnings are rate limited per caller
+        log(message, level=level, stacklevel=2)
+        job.metrics.count('errors' if level == logging.ERROR else 'warnings')
+
+    def __get_schema_name(self, job: IDMSToMySQLMigrationJob, schema_key: str) -> str:
+        """
+        :param job: Migration job.
+        :param schema_key: IDMS schema key in S3.
+        :return: Name of the IDMS schema, without its suffix and compression suffix.
+        """
+
+        return strip_compression_suffix(path.basename(schema_key)).replace(job.schemas_suffix, '')
+
+    def __get_data_key(self, job: IDMSToMySQLMigrationJob, schema_key: str) -> str:
+        """
+        :param job: Migration job.
+        :param schema_key: IDMS schema key in S3.
+        :return: Key of the matching IDMS data file in S3. Data files may be compressed whether or not their schema is,
+            so the listed data file with or without a compression suffix is used.
+        """
+
+        schema_filename = strip_compression_suffix(path.basename(schema_key))
+        data_filename = schema_filename.replace(job.schemas_suffix, job.data_suffix, 1)
+        data_key = f'{job.s3_data_path}/{data_filename}'
+
+        for compression in (None, 'gzip', 'zstd'):
+            if add_compression_suffix(data_key, compression) in job.object_sizes:
+                return add_compression_suffix(data_key, compression)
+
+        return data_key
+
+    def __migrate_schema(self, job: IDMSToMySQLMigrationJob, file_path: str) -> MySQLTable:
         """
         Migrate IDMS schema file to a new MySQL table.
 
+        :param job: Migration job.
         :param file_path: IDMS schema file path.
         :return: MySQL table object.
         """
 
-        file_contents = open(file_path).read()
+        with open_input(file_path) as file:
+            file_contents = file.read()
 
         # Create MySQL table object
-        idms_record_name_match = re.search(IDMS_RECORD_NAME_REGEX, file_contents)
+        idms_record_name_match = IDMS_RECORD_NAME_REGEX.search(file_contents)
 
         if idms_record_name_match is None:
             raise Exception('Failed to find IDMS record name within schema file.')
@@ -202,43 +1121,43 @@ class IDMSToMySQLMigrationService(BaseMigrationService):
                       "\tid CHAR(9) NOT NULL DEFAULT '',\n"
         mysql_table = MySQLTable(mysql_table_name, columns=[MYSQL_ID_COLUMN])
 
-        # Migrate schema to MySQL columns
+        # Migrate schema to MySQL columns and create COBOL copybook from IDMS schema, in a single pass
+        col_defs = list()
         for line in file_contents.splitlines():
-            match = re.match(IDMS_ELEM_ITEM_REGEX, line.strip())
+            line = line.strip()
 
-            if match is None:
+            # Skip lines that can't be items, which always start with a 2-digit level
+            if not line[:2].isdigit():
                 continue
 
-            # Skip conditions (level 88 items)
-            if match.group('lvl') == '88':
-                continue
+            match = IDMS_ELEM_ITEM_REGEX.match(line)
 
-            # Create row from each match
-            mysql_col_def, cobol_pic = self.__migrate_schema_item(match)
+            # Skip conditions (level 88 items)
+            if match is not None and match.group('lvl') != '88':
+                # Create row from each match
+                mysql_col_def, cobol_pic = self.__migrate_schema_item(match)
 
-            if mysql_col_def is not None:
-                create_stmt += f'\t{mysql_col_def},\n'
-                mysql_table.add_column(cobol_pic)
+                if mysql_col_def is not None:
+                    col_defs.append(f'\t{mysql_col_def},\n')
+                    mysql_table.add_column(cobol_pic)
 
-        # Create COBOL copybook from IDMS schema
-        # TODO: Add support for condition items (88 level)
-        for line in file_contents.splitlines():
-            match = re.match(IDMS_ITEM_REGEX, line.strip())
+            # TODO: Add support for condition items (88 level)
+            match = IDMS_ITEM_REGEX.match(line)
 
-            if match is None:
-                continue
+            if match is not None:
+                self.__create_cobol_pic_item(job, match)
 
-            self.__create_cobol_pic_item(match)
+        create_stmt += ''.join(col_defs)
 
         # Save MySQL table object
-        self.mysql_tables.append(mysql_table)
+        job.add_mysql_table(mysql_table)
 
         # Add primary key definition and closing bracket for "CREATE TABLE" statement
         create_stmt += '\tPRIMARY KEY (id)\n' + \
                        ');\n'
 
-        # Write to output file
-        self.mysql_out_file.write(create_stmt)
+        # Write to output file, and create the table in the target database right away
+        self.__write_sql(job, create_stmt)
 
         return mysql_table
 
@@ -261,43 +1180,7 @@ class IDMSToMySQLMigrationService(BaseMigrationService):
         name = IDMSUtils.name_to_snake_case(name)
 
         # Get type
-        idms_pic = match.group('type')
-        std_pic_w_len_match = re.match(IDMS_STD_PIC_W_LEN_REGEX, idms_pic)
-        signed_int_w_len_match = re.match(IDMS_SIGNED_INT_PIC_W_LEN_REGEX, idms_pic)
-        decimal_pic_w_len_match = re.match(IDMS_DECIMAL_PIC_W_LEN_REGEX, idms_pic)
-        decimal_pic_w_first_len_match = re.match(IDMS_DECIMAL_PIC_W_FIRST_LEN_REGEX, idms_pic)
-        len_1: Optional[int] = None
-        len_2: Optional[int] = None
-
-        if std_pic_w_len_match is not None:
-            # PIC in format "X(1)"
-            var_type = IDMS_TO_MYSQL_TYPE_MAP[std_pic_w_len_match.group('type')]
-            var_len = int(std_pic_w_len_match.group("len"))
-            var_len_str = '' if var_type == 'NUMERIC' else f'({var_len})'
-        elif signed_int_w_len_match is not None:
-            # PIC in format "S9(1)"
-            var_type = 'BIGINT'
-            var_len = int(signed_int_w_len_match.group('len').lstrip('0'))
-            var_len_str = f'({var_len})'
-        elif decimal_pic_w_len_match is not None:
-            # PIC in format "S9(1)V9(1)"
-            var_type = 'DECIMAL'
-            len_1 = int(decimal_pic_w_len_match.group('len_1').lstrip('0'))
-            len_2 = int(decimal_pic_w_len_match.group('len_2').lstrip('0'))
-            var_len = len_1 + len_2
-            var_len_str = f'({len_1},{len_2})'
-        elif decimal_pic_w_first_len_match is not None:
-            # PIC in format "S9(1)V99"
-            var_type = 'DECIMAL'
-            len_1 = int(decimal_pic_w_first_len_match.group('len_1').lstrip('0'))
-            len_2 = len(decimal_pic_w_first_len_match.group('len_2'))
-            var_len = len_1 + len_2
-            var_len_str = f'({len_1},{len_2})'
-        else:
-            # PIC in format "XX"
-            var_type = IDMS_TO_MYSQL_TYPE_MAP[idms_pic[0]]
-            var_len = len(idms_pic)
-            var_len_str = '' if var_type == 'NUMERIC' else f'({var_len})'
+        var_type, var_len, var_len_str, len_1, len_2 = parse_idms_pic(match.group('type'))
 
         # Get default value
         default_val = match.group('def_val')
@@ -321,15 +1204,18 @@ class IDMSToMySQLMigrationService(BaseMigrationService):
             length=var_len,
             length_1=len_1,
             length_2=len_2,
-            default_value=default_val
+            default_value=default_val,
+            usage=match.group('usage'),
+            is_signed=match.group('type').startswith('S')
         )
 
         return f'{name} {var_type}{var_len_str} {default_val}', column
 
-    def __create_cobol_pic_item(self, match):
+    def __create_cobol_pic_item(self, job: IDMSToMySQLMigrationJob, match):
         """
         Create COBOL PIC item from IDMS schema item.
 
+        :param job: Migration job.
         :param match: Regex match.
         """
 
@@ -343,46 +1229,104 @@ class IDMSToMySQLMigrationService(BaseMigrationService):
         pic_type = '' if match.group(pic_type_group_name) is None else f' PIC {match.group(pic_type_group_name)}'
 
         pic = f'{indent}{level} {name}{pic_type}{default_val}.\n'
-        self.cobol_out_file.write(pic)
-
-    def __migrate_data(self, file_path: str, mysql_table: MySQLTable):
+        job.cobol_out_file.write(pic)
+
+    def __migrate_data(
+            self,
+            job: IDMSToMySQLMigrationJob,
+            data_file: Union[TextIO, BinaryIO],
+            mysql_table: MySQLTable
+    ):
         """
         Migrate IDMS data file to rows for an existing MySQL table.
 
-        :param file_path: IDMS data file path.
+        :param job: Migration job.
+        :param data_file: IDMS data file, opened as text, or as binary for binary records and local text files.
         :param mysql_table: MySQL table object.
         """
 
-        # Get joined columns list
-        column_names = mysql_table.get_column_names()
-        joined_columns = ',\n'.join(list(map(lambda c: f'\t{c}', column_names)))
+        code_page = job.get_binary_code_page()
+        encoding = None
 
-        res = f'\nINSERT INTO {mysql_table.name}(\n{joined_columns}\n) VALUES\n'
-        rows = list()
-        last_primary_key = None
+        if code_page is not None:
+            lines = read_records(data_file, self.__get_record_length(job, mysql_table))
+        elif isinstance(data_file, TextIOBase):
+            lines = data_file
+        else:
+            # Lines of local files are read as bytes through a memory map, and only decoded where needed
+            lines = read_mapped_lines(data_file)
+            encoding = job.encoding
+
+        tsv_out_file = None
+
+        if job.mysql_loader is not None:
+            # Load rows directly into the target database, in the background
+            insert_writer = job.mysql_loader.start_table(mysql_table)
+        elif job.sink == 'tsv':
+            # Write rows to the table's own data file, loaded by a "LOAD DATA" statement in the MySQL output file
+            tsv_out_file = open(job.get_data_out_file_path(mysql_table.name), 'w')
+            insert_writer = TSVWriter(tsv_out_file)
+        elif job.sink == 'parquet':
+            # Write rows to the table's own Parquet file, in typed record batches
+            insert_writer = ParquetTableWriter(
+                job.get_data_out_file_path(mysql_table.name),
+                mysql_table,
+                batch_rows=job.insert_batch_rows
+            )
+        else:
+            insert_writer = InsertWriter(
+                job.mysql_out_file,
+                mysql_table,
+                max_rows=job.insert_batch_rows,
+                max_bytes=job.insert_batch_bytes
+            )
 
-        for line in open(file_path, encoding=self.encoding):
-            # Skip "UNLOAD" line
-            if line.startswith('UNLOAD '):
-                continue
+        try:
+            with job.metrics.time('data_convert', mysql_table.name):
+                migrate_data_lines(
+                    lines,
+                    mysql_table,
+                    insert_writer,
+                    decode_block_rows=job.decode_block_rows,
+                    metrics=job.metrics,
+                    code_page=code_page,
+                    encoding=encoding,
+                    sort_dir=job.get_sort_dir(),
+                    sort_buffer_size=job.sort_buffer_size
+                )
 
-            primary_key = line[:9]
+                # End last "INSERT" statement
+                with job.metrics.time('output_write', mysql_table.name):
+                    insert_writer.close()
+        finally:
+            if tsv_out_file is not None:
+                tsv_out_file.close()
 
-            # Skip if primary key already exists
-            if primary_key == last_primary_key:
-                log(f'Duplicate primary key "{primary_key}" for table "{mysql_table.name}".', level=logging.WARNING)
-                continue
+        job.status.rows_written += insert_writer.rows_written
+        job.metrics.count('rows_written', insert_writer.rows_written, mysql_table.name)
 
-            last_primary_key = primary_key
+        if tsv_out_file is not None:
+            job.mysql_out_file.write(TSVWriter.get_load_data_stmt(mysql_table, path.basename(tsv_out_file.name)))
 
-            # Parse row
-            rows.append(mysql_table.parse_idms_row(line))
+    def __write_sql(self, job: IDMSToMySQLMigrationJob, sql: str, should_defer: bool = False):
+        """
+        Write a schema statement to the MySQL output file and, for the "mysql" sink, execute it in the target database.
 
-        # Add rows and closing parentheses into "INSERT" statement
-        res += ',\n'.join(rows) + ';\n'
+        :param job: Migration job.
+        :param sql: SQL statement.
+        :param should_defer: Whether the statement depends on loaded data and should only be executed once all data has
+            been loaded.
+        """
 
-        # Write to output file
-        self.mysql_out_file.write(res)
+        job.mysql_out_file.write(sql)
+
+        if job.mysql_loader is None:
+            return
+
+        if should_defer:
+            job.mysql_loader.defer(sql)
+        else:
+            job.mysql_loader.execute(sql)
 
     def __to_mysql_column_name(self, idms_name: str) -> str:
         """
@@ -394,20 +1338,21 @@ class IDMSToMySQLMigrationService(BaseMigrationService):
 
         return IDMSUtils.name_to_snake_case(idms_name)
 
-    def __migrate_set(self, file_path: str):
+    def __migrate_set(self, job: IDMSToMySQLMigrationJob, file_path: str):
         """
         Migrate IDMS set to MySQL foreign key constraints or a view.
 
+        :param job: Migration job.
         :param file_path: IDMS set file path.
         """
 
-        file = open(file_path)
-        file_contents = file.read()
+        with open_input(file_path) as file:
+            file_contents = file.read()
 
         # Get header from set file to determine whether to migrate to foreign keys or view
         header_match = re.search(IDMS_SET_HEADER_REGEX, file_contents)
         if header_match is None:
-            log(f'No header found for IDMS set "{file_path}".', level=logging.ERROR)
+            self.__log_issue(job, f'No header found for IDMS set "{file_path}".', level=logging.ERROR)
             return
 
         set_name = header_match.group('name')
@@ -415,39 +1360,39 @@ class IDMSToMySQLMigrationService(BaseMigrationService):
 
         if mode == 'chain':
             # Migrate chain set to MySQL foreign key constraints
-            self.__migrate_chain_set(set_name, file_contents)
+            self.__migrate_chain_set(job, set_name, file_contents)
         elif mode == 'index':
             # Migrate index set to MySQL view
-            self.__migrate_index_set(set_name, file_contents)
+            self.__migrate_index_set(job, set_name, file_contents)
         else:
-            log(f'Unknown mode "{mode}" encountered in IDMS set "{file_path}".', level=logging.ERROR)
+            self.__log_issue(job, f'Unknown mode "{mode}" encountered in IDMS set "{file_path}".', level=logging.ERROR)
             return
 
-    def __migrate_chain_set(self, set_name: str, file_contents: str):
+    def __migrate_chain_set(self, job: IDMSToMySQLMigrationJob, set_name: str, file_contents: str):
         """
         Migrate IDMS set of mode "CHAIN" to MySQL foreign key constraints.
 
+        :param job: Migration job.
         :param set_name: IDMS set name.
         :param file_contents: IDMS set file contents.
         """
 
         # Skip if shouldn't migrate foreign keys
-        if not self.should_migrate_fks:
-            log(f'Skipped foreign key creation from IDMS chain set.', level=logging.DEBUG)
+        if not job.should_migrate_fks:
+            log('Skipped foreign key creation from IDMS chain set.', level=logging.DEBUG)
             return
 
         # Get owner
         owner_match = re.search(IDMS_SET_OWNER_REGEX, file_contents)
         if owner_match is None:
-            log(f'No owner found for IDMS set with name "{set_name}".', level=logging.ERROR)
+            self.__log_issue(job, f'No owner found for IDMS set with name "{set_name}".', level=logging.ERROR)
             return
 
         owner_name = owner_match.group('name')
         owner_name = IDMSUtils.name_to_snake_case(owner_name)
-        tables_filtered = list(filter(lambda t: t.name == owner_name, self.mysql_tables))
-
-        if len(tables_filtered) == 0:
-            log(
+        if owner_name not in job.mysql_tables:
+            self.__log_issue(
+                job,
                 f'Foreign key referencing "{owner_name}" skipped since no matching MySQL table was found.',
                 level=logging.WARNING
             )
@@ -457,10 +1402,9 @@ class IDMSToMySQLMigrationService(BaseMigrationService):
         for match in re.finditer(IDMS_SET_MEMBER_REGEX, file_contents):
             table_name = match.group('table')
             table_name = IDMSUtils.name_to_snake_case(table_name)
-            tables_filtered = list(filter(lambda t: t.name == table_name, self.mysql_tables))
-
-            if len(tables_filtered) == 0:
-                log(
+            if table_name not in job.mysql_tables:
+                self.__log_issue(
+                    job,
                     f'Foreign key referencing "{table_name}" skipped since no matching MySQL table was found.',
                     level=logging.WARNING
                 )
@@ -472,12 +1416,13 @@ class IDMSToMySQLMigrationService(BaseMigrationService):
             # Form and write SQL statement to output file
             referenced_key = key.replace(key[:4], owner_name[:4].lower(), 1)
             sql = f'\nALTER TABLE {table_name} ADD FOREIGN KEY ({key}) REFERENCES {owner_name}({referenced_key});\n'
-            self.mysql_out_file.write(sql)
+            self.__write_sql(job, sql, should_defer=True)
 
-    def __migrate_index_set(self, set_name: str, file_contents: str):
+    def __migrate_index_set(self, job: IDMSToMySQLMigrationJob, set_name: str, file_contents: str):
         """
         Migrate IDMS set of mode "INDEX" to a new MySQL view.
 
+        :param job: Migration job.
         :param set_name: IDMS set name.
         :param file_contents: IDMS set file contents.
         """
@@ -496,14 +1441,12 @@ class IDMSToMySQLMigrationService(BaseMigrationService):
             from_tables.append(f'\t{table_name}')
 
             # Get MySQL table
-            tables_filtered = list(filter(lambda s: s.name == table_name, self.mysql_tables))
+            table = job.mysql_tables.get(table_name)
 
-            if len(tables_filtered) == 0:
-                log(f'Migrated MySQL table "{table_name}" not found.', level=logging.ERROR)
+            if table is None:
+                self.__log_issue(job, f'Migrated MySQL table "{table_name}" not found.', level=logging.ERROR)
                 continue
 
-            table = tables_filtered[0]
-
             # Get initial key
             key = mem_match.group('key')
             key = self.__to_mysql_column_name(key)
@@ -513,7 +1456,8 @@ class IDMSToMySQLMigrationService(BaseMigrationService):
                 order = mem_match.group('order')
                 keys[key] = f'\t{key} {order}'
             else:
-                log(
+                self.__log_issue(
+                    job,
                     f'Column "{key}" not found in "{table_name}" table while building view from IDMS set "{set_name}".',
                     level=logging.WARNING
                 )
@@ -532,7 +1476,8 @@ class IDMSToMySQLMigrationService(BaseMigrationService):
                     order = key_match.group('order')
                     keys[key] = f'{key} {order}'
                 else:
-                    log(
+                    self.__log_issue(
+                        job,
                         f'Column "{key}" not found in "{table_name}" table while building view from IDMS set "{set_name}".',
                         level=logging.WARNING
                     )
@@ -544,4 +1489,4 @@ class IDMSToMySQLMigrationService(BaseMigrationService):
         sql = f'\nCREATE VIEW {view_name} AS\nSELECT\n{joined_keys}\nFROM\n{joined_tables}\nORDER BY\n{joined_order};\n'
 
         # Write to output file
-        self.mysql_out_file.write(sql)
+        self.__write_sql(job, sql, should_defer=True)
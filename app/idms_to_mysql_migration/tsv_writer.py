@@ -0,0 +1,52 @@
+from typing import TextIO
+
+from app.idms_to_mysql_migration.mysql_table import MySQLTable
+from app.idms_to_mysql_migration.row_decoder import TSVRowDecoder
+
+
+class TSVWriter:
+    """
+    Streaming writer for tab-separated data files, one per MySQL table, loaded with MySQL "LOAD DATA" statements.
+    Has the same interface as "InsertWriter", so it can be used in its place.
+    """
+
+    row_decoder_class = TSVRowDecoder
+
+    def __init__(self, out_file: TextIO):
+        """
+        :param out_file: Output data file.
+        """
+
+        self.out_file = out_file
+        self.rows_written = 0
+
+    def write_row(self, values: str):
+        """
+        Write a single row.
+
+        :param values: Data file line, as returned by "TSVRowDecoder.decode".
+        """
+
+        self.out_file.write(values)
+        self.rows_written += 1
+
+    def close(self):
+        """Nothing to end, since rows are written as complete lines."""
+
+    @staticmethod
+    def get_load_data_stmt(mysql_table: MySQLTable, file_name: str) -> str:
+        """
+        Get the MySQL "LOAD DATA" statement for a data file written by this writer.
+
+        :param mysql_table: MySQL table the rows belong to.
+        :param file_name: Data file name, relative to the directory the statement is run from.
+        :return: MySQL statement.
+        """
+
+        joined_columns = ',\n'.join(map(lambda c: f'\t{c}', mysql_table.get_column_names()))
+
+        return f"\nLOAD DATA LOCAL INFILE '{file_name}'\n" + \
+               f'INTO TABLE {mysql_table.name}\n' + \
+               "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'\n" + \
+               "LINES TERMINATED BY '\\n'\n" + \
+               f'(\n{joined_columns}\n);\n'
@@ -0,0 +1,129 @@
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Lock
+from typing import Callable, List, Optional
+from uuid import uuid4
+
+from app.cli import log
+from app.metrics import JobMetrics
+
+
+class MigrationJobStatus:
+    """Status and progress of a migration job."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.state = 'queued'
+        self.phase = 'queued'
+        self.tables_done = 0
+        self.tables_total = 0
+        self.rows_written = 0
+        self.bytes_processed = 0
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.metrics = JobMetrics()
+
+    def is_finished(self) -> bool:
+        """
+        :return: Whether the job has succeeded or failed.
+        """
+
+        return self.state in ('succeeded', 'failed')
+
+    def to_dict(self) -> dict:
+        """
+        :return: Job status as a JSON-serializable dictionary.
+        """
+
+        return {
+            'job_id': self.job_id,
+            'state': self.state,
+            'phase': self.phase,
+            'tables_done': self.tables_done,
+            'tables_total': self.tables_total,
+            'rows_written': self.rows_written,
+            'bytes_processed': self.bytes_processed,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': None if self.started_at is None else self.started_at.isoformat(),
+            'finished_at': None if self.finished_at is None else self.finished_at.isoformat(),
+        }
+
+
+class JobQueue:
+    """Queue of migration jobs, executed by a bounded pool of worker threads."""
+
+    def __init__(self, max_workers: int = 1, max_history: int = 1000):
+        """
+        :param max_workers: Maximum number of jobs running at once.
+        :param max_history: Maximum number of finished jobs to keep the status of.
+        """
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='migration-job')
+        self.max_history = max_history
+        self.jobs: 'OrderedDict[str, MigrationJobStatus]' = OrderedDict()
+        self.lock = Lock()
+
+    def submit(self, migrate: Callable[[dict, MigrationJobStatus], dict], data: dict) -> MigrationJobStatus:
+        """
+        Enqueue a migration job.
+
+        :param migrate: Migration function, called with the request data and the job status.
+        :param data: Request data.
+        :return: Job status.
+        """
+
+        status = MigrationJobStatus(str(uuid4()))
+
+        with self.lock:
+            self.jobs[status.job_id] = status
+            self.__prune()
+
+        self.executor.submit(self.__run, migrate, data, status)
+
+        return status
+
+    def get(self, job_id: str) -> Optional[MigrationJobStatus]:
+        """
+        :param job_id: Job ID.
+        :return: Job status, or None if no job with the given ID is known.
+        """
+
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self) -> List[MigrationJobStatus]:
+        """
+        :return: Statuses of all known jobs, oldest first.
+        """
+
+        with self.lock:
+            return list(self.jobs.values())
+
+    def __run(self, migrate: Callable[[dict, MigrationJobStatus], dict], data: dict, status: MigrationJobStatus):
+        status.state = 'running'
+        status.started_at = datetime.now()
+
+        try:
+            status.result = migrate(data, status)
+            status.state = 'succeeded'
+        except Exception as e:
+            log(f'[{status.job_id}] Migration job failed: {e}', level=logging.ERROR)
+            status.error = str(e)
+            status.state = 'failed'
+        finally:
+            status.finished_at = datetime.now()
+
+    def __prune(self):
+        """Forget the oldest finished jobs beyond the history limit."""
+
+        finished_ids = [job_id for job_id, status in self.jobs.items() if status.is_finished()]
+
+        for job_id in finished_ids[:max(0, len(finished_ids) - self.max_history)]:
+            del self.jobs[job_id]
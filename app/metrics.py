@@ -0,0 +1,209 @@
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class JobMetrics:
+    """
+    Timers and counters of a migration job, in total and per MySQL table.
+
+    Timers add up the seconds spent in each part of the job (e.g. "download" or "row_decode"), and counters add up
+    events (e.g. "rows_written" or "duplicates_skipped"). Metrics of work done in worker processes are collected in
+    their own instance and merged into the job's. Safe to update from multiple threads.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.timers: Dict[str, float] = dict()
+        self.counters: Dict[str, int] = dict()
+        self.table_timers: Dict[str, Dict[str, float]] = dict()
+        self.table_counters: Dict[str, Dict[str, int]] = dict()
+
+    def __getstate__(self):
+        # Locks can't be pickled, so a new one is created when metrics are sent between processes
+        state = self.__dict__.copy()
+        del state['lock']
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = Lock()
+
+    @contextmanager
+    def time(self, timer: str, table: Optional[str] = None) -> Iterator[None]:
+        """
+        Time a block of code.
+
+        :param timer: Timer name.
+        :param table: MySQL table name to also attribute the time to, if any.
+        """
+
+        start = perf_counter()
+
+        try:
+            yield
+        finally:
+            self.add_time(timer, perf_counter() - start, table)
+
+    def add_time(self, timer: str, secs: float, table: Optional[str] = None):
+        """
+        :param timer: Timer name.
+        :param secs: Seconds to add.
+        :param table: MySQL table name to also attribute the time to, if any.
+        """
+
+        with self.lock:
+            self.timers[timer] = self.timers.get(timer, 0.0) + secs
+
+            if table is not None:
+                table_timers = self.table_timers.setdefault(table, dict())
+                table_timers[timer] = table_timers.get(timer, 0.0) + secs
+
+    def count(self, counter: str, value: int = 1, table: Optional[str] = None):
+        """
+        :param counter: Counter name.
+        :param value: Value to add.
+        :param table: MySQL table name to also attribute the value to, if any.
+        """
+
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+            if table is not None:
+                table_counters = self.table_counters.setdefault(table, dict())
+                table_counters[counter] = table_counters.get(counter, 0) + value
+
+    def merge(self, other: 'JobMetrics'):
+        """
+        Add the timers and counters of another instance, such as one collected in a worker process.
+
+        :param other: Metrics to add.
+        """
+
+        for timer, secs in other.timers.items():
+            self.add_time(timer, secs)
+
+        for counter, value in other.counters.items():
+            self.count(counter, value)
+
+        with self.lock:
+            for table, timers in other.table_timers.items():
+                table_timers = self.table_timers.setdefault(table, dict())
+
+                for timer, secs in timers.items():
+                    table_timers[timer] = table_timers.get(timer, 0.0) + secs
+
+            for table, counters in other.table_counters.items():
+                table_counters = self.table_counters.setdefault(table, dict())
+
+                for counter, value in counters.items():
+                    table_counters[counter] = table_counters.get(counter, 0) + value
+
+    def to_dict(self) -> dict:
+        """
+        :return: Metrics as a JSON-serializable dictionary, with seconds rounded to microseconds.
+        """
+
+        with self.lock:
+            tables = dict()
+
+            for table in sorted(set(self.table_timers.keys()) | set(self.table_counters.keys())):
+                tables[table] = {
+                    'timers': {k: round(v, 6) for k, v in self.table_timers.get(table, dict()).items()},
+                    'counters': dict(self.table_counters.get(table, dict())),
+                }
+
+            return {
+                'timers': {k: round(v, 6) for k, v in self.timers.items()},
+                'counters': dict(self.counters),
+                'tables': tables,
+            }
+
+
+def escape_label_value(value: str) -> str:
+    """
+    :param value: Label value.
+    :return: Label value escaped for the Prometheus text format.
+    """
+
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def format_sample(name: str, labels: Dict[str, str], value: float) -> str:
+    """
+    :param name: Metric name.
+    :param labels: Label names and values.
+    :param value: Sample value.
+    :return: Sample line in the Prometheus text format.
+    """
+
+    joined_labels = ','.join(f'{k}="{escape_label_value(str(v))}"' for k, v in labels.items())
+    return f'{name}{{{joined_labels}}} {value}\n'
+
+
+def format_prometheus(statuses: Iterable) -> str:
+    """
+    Format the metrics of migration jobs in the Prometheus text exposition format.
+
+    :param statuses: Statuses of the migration jobs, as kept by the job queue.
+    :return: Metrics text.
+    """
+
+    statuses = list(statuses)
+    job_counts: Dict[str, int] = dict()
+    families: Dict[str, List[str]] = {
+        'eve_job_seconds_total': list(),
+        'eve_job_events_total': list(),
+        'eve_job_table_seconds_total': list(),
+        'eve_job_table_events_total': list(),
+    }
+
+    for status in statuses:
+        job_counts[status.state] = job_counts.get(status.state, 0) + 1
+        metrics = status.metrics.to_dict()
+
+        for timer, secs in metrics['timers'].items():
+            families['eve_job_seconds_total'].append(
+                format_sample('eve_job_seconds_total', {'job_id': status.job_id, 'timer': timer}, secs)
+            )
+
+        for counter, value in metrics['counters'].items():
+            families['eve_job_events_total'].append(
+                format_sample('eve_job_events_total', {'job_id': status.job_id, 'counter': counter}, value)
+            )
+
+        for table, table_metrics in metrics['tables'].items():
+            for timer, secs in table_metrics['timers'].items():
+                labels = {'job_id': status.job_id, 'table': table, 'timer': timer}
+                families['eve_job_table_seconds_total'].append(
+                    format_sample('eve_job_table_seconds_total', labels, secs)
+                )
+
+            for counter, value in table_metrics['counters'].items():
+                labels = {'job_id': status.job_id, 'table': table, 'counter': counter}
+                families['eve_job_table_events_total'].append(
+                    format_sample('eve_job_table_events_total', labels, value)
+                )
+
+    helps = {
+        'eve_jobs': ('gauge', 'Migration jobs known to the job queue, by state.'),
+        'eve_job_seconds_total': ('counter', 'Seconds spent by migration jobs in each part of the migration.'),
+        'eve_job_events_total': ('counter', 'Events counted by migration jobs, such as rows written.'),
+        'eve_job_table_seconds_total': ('counter', 'Seconds spent by migration jobs on each MySQL table.'),
+        'eve_job_table_events_total': ('counter', 'Events counted by migration jobs for each MySQL table.'),
+    }
+    families = {'eve_jobs': [format_sample('eve_jobs', {'state': s}, n) for s, n in job_counts.items()], **families}
+    lines = list()
+
+    for name, samples in families.items():
+        metric_type, help_text = helps[name]
+        lines.append(f'# HELP {name} {help_text}\n')
+        lines.append(f'# TYPE {name} {metric_type}\n')
+        lines.extend(samples)
+
+    return ''.join(lines)
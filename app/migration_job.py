@@ -0,0 +1,25 @@
+from os import path
+from typing import Optional
+from uuid import uuid4
+
+from app.job_queue import MigrationJobStatus
+
+
+class MigrationJob:
+    """State of a single migration job."""
+
+    def __init__(self, status: Optional[MigrationJobStatus] = None):
+        """
+        :param status: Status of the queued job, if any. Otherwise, a new job ID is generated.
+        """
+
+        self.status = status if status is not None else MigrationJobStatus(str(uuid4()))
+        self.job_id = self.status.job_id
+        self.tag = f'[{self.job_id}] '
+
+        # Timers and counters of the job, reported with its status
+        self.metrics = self.status.metrics
+
+        # Temp directories for downloaded and migrated files
+        self.temp_inp_dir = path.join('temp', 'inputs', self.job_id)
+        self.temp_out_dir = path.join('temp', 'outputs', self.job_id)
@@ -1,10 +1,27 @@
-from flask import Blueprint
+from flask import Blueprint, Response, request
 
 from app.container import container
+from app.metrics import PROMETHEUS_CONTENT_TYPE, format_prometheus
 
 migrations_bp = Blueprint('migrations', __name__)
 
 
 @migrations_bp.post('/migrate/idms/mysql')
 def migrate_idms_to_mysql():
-    return container.idms_to_mysql_migration_service.migrate()
+    status = container.job_queue.submit(container.idms_to_mysql_migration_service.migrate, request.json)
+    return {'job_id': status.job_id}, 202
+
+
+@migrations_bp.get('/migrate/jobs/<job_id>')
+def get_migration_job(job_id: str):
+    status = container.job_queue.get(job_id)
+
+    if status is None:
+        return {'error': f'Migration job "{job_id}" not found.'}, 404
+
+    return status.to_dict()
+
+
+@migrations_bp.get('/metrics')
+def get_metrics():
+    return Response(format_prometheus(container.job_queue.list()), content_type=PROMETHEUS_CONTENT_TYPE)
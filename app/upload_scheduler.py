@@ -0,0 +1,323 @@
+from concurrent.futures import ThreadPoolExecutor, Future
+from os import path
+from threading import Lock
+from time import perf_counter
+from typing import Dict, List, Optional
+
+from boto3.s3.transfer import TransferConfig
+
+from app.utils.compression import get_compressor, compress_file
+
+# Minimum size of all but the last part of an S3 multipart upload
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+# Default size of the parts of multipart uploads
+DEFAULT_PART_SIZE = 64 * 1024 * 1024
+
+
+class UploadScheduler:
+    """
+    Concurrent S3 uploader.
+
+    Files are uploaded in the background on a bounded thread pool as soon as they're scheduled, so outputs are
+    uploaded while the rest of the job is still running. Large files are uploaded in parts, with the given multipart
+    transfer settings. Files can be compressed as they're uploaded, with their compression as their "Content-Encoding".
+    "wait" waits for all uploads to complete.
+    """
+
+    def __init__(self, client, max_in_flight: int = 8, part_size: int = DEFAULT_PART_SIZE, part_concurrency: int = 4):
+        """
+        :param client: S3 client to upload with.
+        :param max_in_flight: Maximum number of concurrent uploads of files or parts.
+        :param part_size: Size of the parts of multipart uploads in bytes. Files up to this size are uploaded whole.
+        :param part_concurrency: Maximum number of concurrent part uploads of each file uploaded with "upload_file".
+        """
+
+        self.client = client
+        self.part_size = max(MIN_PART_SIZE, part_size)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=self.part_size,
+            multipart_chunksize=self.part_size,
+            max_concurrency=max(1, part_concurrency)
+        )
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_in_flight), thread_name_prefix='s3-upload')
+        self.futures: List[Future] = list()
+        self.futures_by_key: Dict[str, Future] = dict()
+
+        # Stats
+        self.lock = Lock()
+        self.files_uploaded = 0
+        self.bytes_uploaded = 0
+        self.start_time: Optional[float] = None
+        self.end_time: Optional[float] = None
+
+    def upload_file(self, local_path: str, bucket_name: str, key: str, compression: Optional[str] = None):
+        """
+        Schedule a complete local file to be uploaded. If the same key was already scheduled, the new upload waits for
+        the previous one, so the last scheduled upload wins.
+
+        :param local_path: Local file path.
+        :param bucket_name: S3 bucket name.
+        :param key: Object key in S3.
+        :param compression: Compression to upload the file with, either "gzip" or "zstd", or None to upload it as is.
+            Compressed files are compressed whole in memory, so this is meant for small files.
+        """
+
+        previous_future = self.futures_by_key.get(f'{bucket_name}/{key}')
+        future = self.submit(self.__upload_file, local_path, bucket_name, key, compression, previous_future)
+        self.futures_by_key[f'{bucket_name}/{key}'] = future
+
+    def submit(self, fn, *args) -> Future:
+        """
+        Run an upload on the thread pool.
+
+        :param fn: Upload function.
+        :param args: Arguments of the upload function.
+        :return: Future of the upload.
+        """
+
+        if self.start_time is None:
+            self.start_time = perf_counter()
+
+        future = self.executor.submit(fn, *args)
+        self.futures.append(future)
+
+        return future
+
+    def add_stats(self, files: int, size: int):
+        """
+        Count uploaded files and bytes.
+
+        :param files: Number of files completed.
+        :param size: Number of bytes uploaded.
+        """
+
+        with self.lock:
+            self.files_uploaded += files
+            self.bytes_uploaded += size
+            self.end_time = perf_counter()
+
+    def get_bytes_per_sec(self) -> float:
+        """
+        :return: Upload throughput in bytes per second, measured from the first scheduled upload to the last completed
+            one.
+        """
+
+        if self.start_time is None or self.end_time is None or self.end_time <= self.start_time:
+            return 0.0
+
+        return self.bytes_uploaded / (self.end_time - self.start_time)
+
+    def wait(self):
+        """Wait for all scheduled uploads to complete. Raises the first upload's exception, if any failed."""
+
+        for future in self.futures:
+            future.result()
+
+    def close(self):
+        """Cancel pending uploads and wait for in-flight ones to complete."""
+
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def __upload_file(
+            self,
+            local_path: str,
+            bucket_name: str,
+            key: str,
+            compression: Optional[str],
+            previous_future: Optional[Future]
+    ):
+        if previous_future is not None:
+            previous_future.result()
+
+        if compression is None:
+            self.client.upload_file(local_path, bucket_name, key, Config=self.transfer_config)
+            self.add_stats(1, path.getsize(local_path))
+            return
+
+        body = compress_file(local_path, compression)
+        self.client.put_object(Bucket=bucket_name, Key=key, Body=body, ContentEncoding=compression)
+        self.add_stats(1, len(body))
+
+
+class GrowingFileUpload:
+    """
+    Multipart S3 upload of a local file that's still being written, such as the MySQL output file.
+
+    Whenever "upload_parts" is called, every complete part written since the last call is uploaded in the background,
+    so most of the file is uploaded by the time it's done. "finish" uploads the rest and completes the upload. Files
+    that never fill a part are uploaded whole instead.
+
+    Compressed uploads compress what's been written as a single stream, in order, in the background. Parts are cut from
+    the compressed stream rather than the file.
+    """
+
+    def __init__(
+            self,
+            uploads: UploadScheduler,
+            local_path: str,
+            bucket_name: str,
+            key: str,
+            compression: Optional[str] = None
+    ):
+        """
+        :param uploads: Upload scheduler to upload parts with.
+        :param local_path: Local file path.
+        :param bucket_name: S3 bucket name.
+        :param key: Object key in S3.
+        :param compression: Compression to upload the file with, either "gzip" or "zstd", or None to upload it as is.
+        """
+
+        self.uploads = uploads
+        self.local_path = local_path
+        self.bucket_name = bucket_name
+        self.key = key
+        self.compression = compression
+        self.upload_id: Optional[str] = None
+        self.part_futures: List[Future] = list()
+        self.offset = 0
+
+        # Compressed data not uploaded yet, and the last scheduled compression of the file
+        self.compressor = None if compression is None else get_compressor(compression)
+        self.compressed = bytearray()
+        self.compress_future: Optional[Future] = None
+
+    def upload_parts(self):
+        """Schedule uploads of the complete parts written since the last call. Pending writes must be flushed first."""
+
+        size = path.getsize(self.local_path)
+
+        if self.compressor is not None:
+            # Compressed in order, after everything written before
+            if size > self.offset:
+                self.compress_future = self.uploads.submit(self.__compress, self.offset, size, self.compress_future)
+                self.offset = size
+
+            return
+
+        part_size = self.uploads.part_size
+
+        while size - self.offset >= part_size:
+            self.__start()
+            self.__submit_part(self.offset, part_size)
+            self.offset += part_size
+
+    def finish(self):
+        """Upload the rest of the file, and wait for the upload to complete. The file must be complete."""
+
+        size = path.getsize(self.local_path)
+        body = None
+
+        if self.compressor is not None:
+            self.__compress(self.offset, size, self.compress_future)
+            self.offset = size
+            self.compressed += self.compressor.flush()
+            body = bytes(self.compressed)
+            self.compressed.clear()
+
+        if self.upload_id is None:
+            # Never filled a part, so upload the whole file at once
+            if body is None:
+                self.uploads.upload_file(self.local_path, self.bucket_name, self.key)
+            else:
+                self.uploads.submit(self.__put, body)
+
+            self.uploads.wait()
+            return
+
+        if body is not None:
+            if body:
+                self.__submit_part(0, len(body), body)
+        elif size > self.offset:
+            self.__submit_part(self.offset, size - self.offset)
+            self.offset = size
+
+        parts = [future.result() for future in self.part_futures]
+        self.uploads.client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={'Parts': parts}
+        )
+        self.uploads.add_stats(1, 0)
+
+    def abort(self):
+        """
+        Abort the multipart upload, if started, so its parts aren't kept in S3. Scheduled compressions and uploads must
+        be cancelled or completed first, e.g. by closing the upload scheduler.
+        """
+
+        if self.upload_id is None:
+            return
+
+        for future in self.part_futures:
+            future.cancel()
+
+        self.uploads.client.abort_multipart_upload(Bucket=self.bucket_name, Key=self.key, UploadId=self.upload_id)
+        self.upload_id = None
+
+    def __start(self):
+        """Start the multipart upload, if not already started."""
+
+        if self.upload_id is not None:
+            return
+
+        extra_args = dict() if self.compression is None else {'ContentEncoding': self.compression}
+        self.upload_id = self.uploads.client.create_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=self.key,
+            **extra_args
+        )['UploadId']
+
+    def __submit_part(self, offset: int, size: int, body: Optional[bytes] = None):
+        part_number = len(self.part_futures) + 1
+        self.part_futures.append(self.uploads.submit(self.__upload_part, part_number, offset, size, body))
+
+    def __compress(self, start: int, end: int, previous_future: Optional[Future]):
+        if previous_future is not None:
+            previous_future.result()
+
+        part_size = self.uploads.part_size
+
+        with open(self.local_path, 'rb') as file:
+            file.seek(start)
+
+            while start < end:
+                block = file.read(min(part_size, end - start))
+
+                if not block:
+                    break
+
+                start += len(block)
+                self.compressed += self.compressor.compress(block)
+
+                while len(self.compressed) >= part_size:
+                    self.__start()
+                    self.__submit_part(0, part_size, bytes(self.compressed[:part_size]))
+                    del self.compressed[:part_size]
+
+    def __put(self, body: bytes):
+        self.uploads.client.put_object(
+            Bucket=self.bucket_name,
+            Key=self.key,
+            Body=body,
+            ContentEncoding=self.compression
+        )
+        self.uploads.add_stats(1, len(body))
+
+    def __upload_part(self, part_number: int, offset: int, size: int, body: Optional[bytes]) -> dict:
+        if body is None:
+            with open(self.local_path, 'rb') as file:
+                file.seek(offset)
+                body = file.read(size)
+
+        response = self.uploads.client.upload_part(
+            Bucket=self.bucket_name,
+            Key=self.key,
+            PartNumber=part_number,
+            UploadId=self.upload_id,
+            Body=body
+        )
+        self.uploads.add_stats(0, size)
+
+        return {'ETag': response['ETag'], 'PartNumber': part_number}
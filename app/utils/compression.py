@@ -0,0 +1,153 @@
+import gzip
+import io
+import zlib
+from typing import BinaryIO, Optional, Union, TextIO
+
+import zstandard
+
+# File suffix of each supported compression, which is also its HTTP "Content-Encoding"
+COMPRESSION_SUFFIXES = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+# Compression levels of compressed outputs, favoring speed since outputs are compressed while the job is running
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def get_compression(file_path: str) -> Optional[str]:
+    """
+    :param file_path: File path or object key.
+    :return: Compression of the file by its suffix, either "gzip" or "zstd", or None if it isn't compressed.
+    """
+
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if file_path.endswith(suffix):
+            return compression
+
+    return None
+
+
+def strip_compression_suffix(file_path: str) -> str:
+    """
+    :param file_path: File path or object key.
+    :return: File path or object key without its compression suffix, if any.
+    """
+
+    compression = get_compression(file_path)
+
+    if compression is None:
+        return file_path
+
+    return file_path[:-len(COMPRESSION_SUFFIXES[compression])]
+
+
+def add_compression_suffix(file_path: str, compression: Optional[str]) -> str:
+    """
+    :param file_path: File path or object key.
+    :param compression: Compression, either "gzip" or "zstd", or None if it isn't compressed.
+    :return: File path or object key with the compression's suffix, if any.
+    """
+
+    if compression is None:
+        return file_path
+
+    return file_path + COMPRESSION_SUFFIXES[compression]
+
+
+class DecompressedReader(io.RawIOBase):
+    """Raw binary reader of the decompressed contents of a compressed binary stream."""
+
+    def __init__(self, file: BinaryIO, compression: str):
+        """
+        :param file: Compressed binary stream, closed along with this reader.
+        :param compression: Compression, either "gzip" or "zstd".
+        """
+
+        self.file = file
+
+        if compression == 'gzip':
+            self.stream = gzip.GzipFile(fileobj=file, mode='rb')
+        else:
+            self.stream = zstandard.ZstdDecompressor().stream_reader(file, read_across_frames=True, closefd=False)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        return self.stream.readinto(b)
+
+    def close(self):
+        if not self.closed:
+            self.stream.close()
+            self.file.close()
+
+        super().close()
+
+
+def open_decompressed(
+        file: BinaryIO,
+        compression: Optional[str],
+        mode: str = 'rb',
+        encoding: Optional[str] = None,
+        buffer_size: int = 1024 * 1024
+) -> Union[BinaryIO, TextIO]:
+    """
+    Open the contents of a binary stream as a buffered stream, decompressed as it's read.
+
+    :param file: Binary stream, closed along with the returned stream.
+    :param compression: Compression of the stream, either "gzip" or "zstd", or None if it isn't compressed.
+    :param mode: Either "rb" to read the contents as binary, or "r" to read them as text.
+    :param encoding: Text encoding, or None for the default encoding of "open".
+    :param buffer_size: Read buffer size in bytes.
+    :return: Binary or text stream.
+    """
+
+    if compression is not None:
+        file = io.BufferedReader(DecompressedReader(file, compression), buffer_size)
+
+    if 'b' in mode:
+        return file
+
+    return io.TextIOWrapper(file, encoding=encoding)
+
+
+def open_input(file_path: str, mode: str = 'r', encoding: Optional[str] = None) -> Union[BinaryIO, TextIO]:
+    """
+    Open a local input file like "open", decompressed as it's read if its suffix is that of a compression.
+
+    :param file_path: File path.
+    :param mode: Either "r" to read the file as text, or "rb" to read it as binary.
+    :param encoding: Text encoding, or None for the default encoding of "open".
+    :return: Text or binary stream.
+    """
+
+    return open_decompressed(open(file_path, 'rb'), get_compression(file_path), mode, encoding)
+
+
+def get_compressor(compression: str):
+    """
+    :param compression: Compression, either "gzip" or "zstd".
+    :return: Streaming compressor, with "compress" and "flush" methods. Output of "compress" may be buffered until
+        "flush", which ends the compressed stream.
+    """
+
+    if compression == 'gzip':
+        # Window bits above 16 write a gzip header and trailer
+        return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+
+def compress_file(file_path: str, compression: str) -> bytes:
+    """
+    :param file_path: Local file path.
+    :param compression: Compression, either "gzip" or "zstd".
+    :return: Compressed contents of the file.
+    """
+
+    compressor = get_compressor(compression)
+
+    with open(file_path, 'rb') as file:
+        return compressor.compress(file.read()) + compressor.flush()
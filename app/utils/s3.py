@@ -0,0 +1,125 @@
+import io
+from threading import Lock, local
+from typing import BinaryIO
+
+from app.config import S3_ENDPOINT_URL, S3_MAX_POOL_CONNECTIONS, S3_MAX_ATTEMPTS
+
+# S3 client of this process, created on first use
+__s3_client = None
+__s3_lock = Lock()
+
+# S3 resources and buckets of each thread, since resources aren't thread-safe
+__s3_local = local()
+
+
+def get_s3_client():
+    """
+    Get the S3 client of this process, creating it on first use. Clients are thread-safe, so it's shared by every job
+    and thread, with a connection pool of "S3_MAX_POOL_CONNECTIONS" and up to "S3_MAX_ATTEMPTS" attempts per request.
+
+    :return: S3 client.
+    """
+
+    global __s3_client
+
+    if __s3_client is not None:
+        return __s3_client
+
+    with __s3_lock:
+        if __s3_client is None:
+            # Imported on first use, since loading boto3 and resolving credentials is slow
+            import boto3
+            from botocore.config import Config
+
+            config = Config(
+                max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                retries={'total_max_attempts': S3_MAX_ATTEMPTS, 'mode': 'standard'}
+            )
+            __s3_client = boto3.client('s3', endpoint_url=S3_ENDPOINT_URL, config=config)
+
+    return __s3_client
+
+
+def get_s3_resource():
+    """
+    Get the S3 resource of the calling thread, creating it on first use. Resources aren't thread-safe, so each thread
+    has its own, but they all make requests through the process's S3 client.
+
+    :return: S3 resource.
+    """
+
+    s3 = getattr(__s3_local, 's3', None)
+
+    if s3 is not None:
+        return s3
+
+    client = get_s3_client()
+
+    # The default boto3 session isn't thread-safe either
+    with __s3_lock:
+        import boto3
+
+        s3 = boto3.resource('s3', endpoint_url=S3_ENDPOINT_URL)
+
+    s3.meta.client = client
+    __s3_local.s3 = s3
+    __s3_local.buckets = dict()
+
+    return s3
+
+
+def get_s3_bucket(name: str):
+    """
+    :param name: S3 bucket name.
+    :return: S3 bucket of the calling thread's S3 resource.
+    """
+
+    s3 = get_s3_resource()
+    bucket = __s3_local.buckets.get(name)
+
+    if bucket is None:
+        bucket = s3.Bucket(name)
+        __s3_local.buckets[name] = bucket
+
+    return bucket
+
+
+class S3BodyReader(io.RawIOBase):
+    """Raw binary reader over the streaming body of an S3 object."""
+
+    def __init__(self, body):
+        """
+        :param body: Streaming body returned by S3 "get_object".
+        """
+
+        self.body = body
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        data = self.body.read(len(b))
+        size = len(data)
+        b[:size] = data
+
+        return size
+
+    def close(self):
+        if not self.closed:
+            self.body.close()
+
+        super().close()
+
+
+def open_s3_binary(bucket, key: str, buffer_size: int = 1024 * 1024) -> BinaryIO:
+    """
+    Open an S3 object as a buffered binary stream, without downloading it to a local file first.
+
+    :param bucket: S3 bucket.
+    :param key: Object key.
+    :param buffer_size: Read buffer size in bytes.
+    :return: Binary stream.
+    """
+
+    body = bucket.meta.client.get_object(Bucket=bucket.name, Key=key)['Body']
+    return io.BufferedReader(S3BodyReader(body), buffer_size)
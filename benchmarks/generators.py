@@ -0,0 +1,226 @@
+"""
+Synthetic IDMS input generators for benchmarks.
+
+Generates schema reports, fixed-width data unloads and set reports in the formats matched by the IDMS regexes in
+"app.constants.idms", laid out in S3 as the migration service expects them.
+"""
+
+import random
+from os import path, makedirs
+from typing import List, Tuple
+
+from app.idms_to_mysql_migration.pic_parser import parse_idms_pic
+
+# PICs weighted by how often they appear in real schemas
+PICS = [
+    'X(1)', 'X(2)', 'X(8)', 'X(10)', 'X(20)', 'X(30)', 'X(40)', 'XX', 'XXX',
+    '9(2)', '9(4)', '9(8)', '999',
+    'S9(4)', 'S9(9)', 'S9(15)',
+    'S9(7)V99', 'S9(11)V99', '9(5)V9(2)', 'S9(3)V9(4)',
+]
+PIC_WEIGHTS = [
+    4, 3, 3, 4, 3, 2, 1, 2, 1,
+    2, 3, 2, 1,
+    3, 2, 1,
+    3, 2, 1, 1,
+]
+
+CHARS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 -.'
+
+
+class SchemaItem:
+    """Elementary item of a synthetic IDMS schema."""
+
+    def __init__(self, name: str, pic: str):
+        """
+        :param name: Item name.
+        :param pic: IDMS PIC.
+        """
+
+        var_type, var_len, _, _, _ = parse_idms_pic(pic)
+        self.name = name
+        self.pic = pic
+        self.is_char = var_type == 'CHAR'
+        self.length = var_len
+
+
+def get_record_name(i: int) -> str:
+    """
+    :param i: Record index.
+    :return: IDMS record name.
+    """
+
+    return f'REC-{i:04d}'
+
+
+def generate_schema(rand: random.Random, record_name: str, num_items: int) -> Tuple[str, List[SchemaItem]]:
+    """
+    Generate an IDMS schema report for a record, with elementary items nested in group items and a few conditions.
+
+    :param rand: Random number generator.
+    :param record_name: IDMS record name.
+    :param num_items: Number of elementary items.
+    :return: Tuple of:
+        - Schema report.
+        - Elementary items, in data order.
+    """
+
+    prefix = record_name.replace('REC-', 'R')
+    lines = [
+        f'RECORD NAME........ {record_name}',
+        f'RECORD VERSION..... 0001',
+        '',
+        '  LEVEL  ITEM NAME                   USAGE      VALUE      PICTURE       START  LENGTH',
+        '',
+    ]
+    items = list()
+    offset = 1
+
+    for i in range(num_items):
+        # Start a new group item every so often
+        if i % 10 == 0:
+            group_length = 0
+            lines.append(f'    02 {prefix}-GRP-{i // 10:03d}            DISPLAY                          {offset} 0')
+
+        pic = rand.choices(PICS, PIC_WEIGHTS)[0]
+        item = SchemaItem(f'{prefix}-FLD-{i:04d}', pic)
+        items.append(item)
+
+        default_val = ''
+        if rand.random() < 0.2:
+            default_val = 'SPACES' if item.is_char else 'ZERO'
+
+        lines.append(f'      03 {item.name:<24} DISPLAY  {default_val:<10} {pic:<13} {offset} {item.length}')
+
+        # Conditions of single character items
+        if item.is_char and item.length == 1 and rand.random() < 0.5:
+            lines.append(f"         88 {item.name}-YES  DISPLAY  'Y'  X  {offset} 1")
+
+        offset += item.length
+
+    lines.append('')
+
+    return '\n'.join(lines), items
+
+
+def generate_row(rand: random.Random, primary_key: int, items: List[SchemaItem]) -> str:
+    """
+    Generate a fixed-width data row, with some blank and zero-padded values.
+
+    :param rand: Random number generator.
+    :param primary_key: Primary key of the row.
+    :param items: Elementary items of the record.
+    :return: Data row, without a line break.
+    """
+
+    fields = [f'{primary_key:09d}']
+
+    for item in items:
+        roll = rand.random()
+
+        if roll < 0.1:
+            fields.append(' ' * item.length)
+        elif item.is_char:
+            value = ''.join(rand.choices(CHARS, k=rand.randint(0, item.length)))
+
+            # Quotes need escaping, so include a few
+            if roll < 0.12 and value:
+                value = "'" + value[1:]
+
+            fields.append(value.ljust(item.length))
+        else:
+            fields.append(str(rand.randrange(10 ** rand.randint(1, item.length))).zfill(item.length))
+
+    return ''.join(fields)
+
+
+def generate_set(rand: random.Random, set_name: str, records: List[Tuple[str, List[SchemaItem]]]) -> str:
+    """
+    Generate an IDMS set report, of either mode, owned by one record with up to 3 member records.
+
+    :param rand: Random number generator.
+    :param set_name: IDMS set name.
+    :param records: (record name, elementary items) of each record.
+    :return: Set report.
+    """
+
+    mode = rand.choice(['CHAIN', 'INDEX'])
+    owner_name, _ = rand.choice(records)
+    lines = [
+        f'SET........ {set_name}  MODE {mode}',
+        f'OWNER...... {owner_name}  NEXT PRIOR',
+    ]
+
+    for member_name, member_items in rand.sample(records, min(len(records), rand.randint(1, 3))):
+        keys = rand.sample(member_items, min(len(member_items), rand.randint(1, 3)))
+        lines.append(f'MEMBER..... {member_name}  NEXT PRIOR OWNER MANDATORY AUTOMATIC')
+        lines.append(f'    SORT KEY {keys[0].name} {rand.choice(["ASC", "DESC"])}')
+
+        for key in keys[1:]:
+            lines.append(f'             {key.name} {rand.choice(["ASC", "DESC"])}')
+
+    lines.append('')
+
+    return '\n'.join(lines)
+
+
+def generate_inputs(
+        inputs_dir: str,
+        seed: int = 0,
+        num_records: int = 10,
+        num_items: int = 40,
+        num_rows: int = 1000,
+        num_sets: int = 0
+) -> dict:
+    """
+    Generate synthetic IDMS schemas, data and sets into the "schemas", "data" and "sets" directories of the migration
+    job's inputs. Every record gets a data file, with only the "UNLOAD" line if there are no rows.
+
+    :param inputs_dir: Local directory mirroring "inputs/<base path>" in S3.
+    :param seed: Random seed, so inputs are reproducible.
+    :param num_records: Number of records.
+    :param num_items: Number of elementary items per record.
+    :param num_rows: Number of data rows per record.
+    :param num_sets: Number of sets.
+    :return: Counts and sizes in bytes of the generated schemas, data and sets.
+    """
+
+    rand = random.Random(seed)
+    stats = {'schema_items': 0, 'schema_bytes': 0, 'data_rows': 0, 'data_bytes': 0, 'sets': 0, 'set_bytes': 0}
+    records = list()
+
+    for dir_name in ('schemas', 'data', 'sets'):
+        makedirs(path.join(inputs_dir, dir_name), exist_ok=True)
+
+    for i in range(num_records):
+        record_name = get_record_name(i)
+        schema, items = generate_schema(rand, record_name, num_items)
+        records.append((record_name, items))
+
+        schema_path = path.join(inputs_dir, 'schemas', f'{record_name}_SCHEMA.txt')
+        with open(schema_path, 'w') as schema_file:
+            schema_file.write(schema)
+
+        stats['schema_items'] += len(items)
+        stats['schema_bytes'] += path.getsize(schema_path)
+
+        # Data rows are written as they're generated, so large unloads don't use much memory
+        data_path = path.join(inputs_dir, 'data', f'{record_name}_DATA.txt')
+        with open(data_path, 'w') as data_file:
+            data_file.write(f'UNLOAD FILE {record_name}\n')
+
+            for primary_key in range(num_rows):
+                data_file.write(generate_row(rand, primary_key, items) + '\n')
+
+        stats['data_rows'] += num_rows
+        stats['data_bytes'] += path.getsize(data_path)
+
+    for i in range(num_sets):
+        set_path = path.join(inputs_dir, 'sets', f'SET-{i:04d}.txt')
+        with open(set_path, 'w') as set_file:
+            set_file.write(generate_set(rand, f'IX-SET-{i:04d}', records))
+
+        stats['sets'] += 1
+        stats['set_bytes'] += path.getsize(set_path)
+
+    return stats
@@ -0,0 +1,160 @@
+"""
+Local stand-in for the S3 resources used by the migration service, so benchmarks run offline.
+
+Buckets are directories under a root directory, and object keys are paths relative to their bucket's directory.
+"""
+
+import shutil
+from os import path, makedirs, stat, walk
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from app.idms_to_mysql_migration.service import IDMSToMySQLMigrationService
+
+
+class LocalObject:
+    """Object summary, as listed by "Bucket.objects.filter"."""
+
+    def __init__(self, bucket_name: str, key: str, file_path: str):
+        file_stat = stat(file_path)
+        self.bucket_name = bucket_name
+        self.key = key
+        self.size = file_stat.st_size
+        self.e_tag = f'"{file_stat.st_size:x}-{file_stat.st_mtime_ns:x}"'
+
+
+class LocalClient:
+    """S3 client with the calls used by downloads, streaming and uploads, including multipart uploads."""
+
+    def __init__(self, root_dir: str):
+        """
+        :param root_dir: Directory holding a directory per bucket.
+        """
+
+        self.root_dir = root_dir
+
+        # Uploaded parts of multipart uploads in progress, by upload ID and part number
+        self.parts: Dict[str, Dict[int, bytes]] = dict()
+
+    def get_path(self, bucket_name: str, key: str) -> str:
+        """
+        :param bucket_name: Bucket name.
+        :param key: Object key.
+        :return: Local path of the object.
+        """
+
+        return path.join(self.root_dir, bucket_name, key)
+
+    def download_file(self, Bucket: str, Key: str, Filename: str):
+        shutil.copyfile(self.get_path(Bucket, Key), Filename)
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str, Config=None):
+        file_path = self.get_path(Bucket, Key)
+        makedirs(path.dirname(file_path), exist_ok=True)
+        shutil.copyfile(Filename, file_path)
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, ContentEncoding: Optional[str] = None):
+        file_path = self.get_path(Bucket, Key)
+        makedirs(path.dirname(file_path), exist_ok=True)
+
+        with open(file_path, 'wb') as file:
+            file.write(Body)
+
+    def create_multipart_upload(self, Bucket: str, Key: str, ContentEncoding: Optional[str] = None) -> dict:
+        upload_id = uuid4().hex
+        self.parts[upload_id] = dict()
+
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket: str, Key: str, PartNumber: int, UploadId: str, Body: bytes) -> dict:
+        self.parts[UploadId][PartNumber] = Body
+
+        return {'ETag': f'"{PartNumber:x}-{len(Body):x}"'}
+
+    def complete_multipart_upload(self, Bucket: str, Key: str, UploadId: str, MultipartUpload: dict):
+        parts = self.parts.pop(UploadId)
+        file_path = self.get_path(Bucket, Key)
+        makedirs(path.dirname(file_path), exist_ok=True)
+
+        with open(file_path, 'wb') as file:
+            for part in MultipartUpload['Parts']:
+                file.write(parts[part['PartNumber']])
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str):
+        self.parts.pop(UploadId, None)
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        return {'Body': open(self.get_path(Bucket, Key), 'rb')}
+
+
+class LocalObjects:
+    """Object collection of a local bucket."""
+
+    def __init__(self, bucket: 'LocalBucket'):
+        self.bucket = bucket
+
+    def filter(self, Prefix: str = '') -> List[LocalObject]:
+        bucket_dir = self.bucket.meta.client.get_path(self.bucket.name, '')
+        objects = list()
+
+        for dir_path, _, filenames in walk(bucket_dir):
+            for filename in filenames:
+                file_path = path.join(dir_path, filename)
+                key = path.relpath(file_path, bucket_dir).replace(path.sep, '/')
+
+                if key.startswith(Prefix):
+                    objects.append(LocalObject(self.bucket.name, key, file_path))
+
+        return sorted(objects, key=lambda o: o.key)
+
+
+class LocalMeta:
+    def __init__(self, client: LocalClient):
+        self.client = client
+
+
+class LocalBucket:
+    """S3 bucket backed by a local directory."""
+
+    def __init__(self, client: LocalClient, name: str):
+        self.name = name
+        self.meta = LocalMeta(client)
+        self.objects = LocalObjects(self)
+
+    def download_file(self, Key: str, Filename: str):
+        self.meta.client.download_file(self.name, Key, Filename)
+
+    def upload_file(self, Filename: str, Key: str):
+        self.meta.client.upload_file(Filename, self.name, Key)
+
+
+class LocalS3:
+    """S3 resource backed by a local directory."""
+
+    def __init__(self, root_dir: str):
+        self.meta = LocalMeta(LocalClient(root_dir))
+
+    def Bucket(self, name: str) -> LocalBucket:
+        return LocalBucket(self.meta.client, name)
+
+
+class LocalMigrationService(IDMSToMySQLMigrationService):
+    """IDMS to MySQL migration service reading from and writing to local buckets, including in worker processes."""
+
+    def __init__(self, root_dir: str, bucket_name: str = 'eve'):
+        """
+        :param root_dir: Directory holding a directory per bucket.
+        :param bucket_name: Name of the bucket with the migration inputs.
+        """
+
+        self.root_dir = root_dir
+        self.bucket_name = bucket_name
+        self.local_s3 = LocalS3(root_dir)
+
+    @property
+    def s3(self) -> LocalS3:
+        return self.local_s3
+
+    @property
+    def bucket(self) -> LocalBucket:
+        return self.local_s3.Bucket(self.bucket_name)
@@ -0,0 +1,173 @@
+"""
+End-to-end benchmark of IDMS to MySQL migrations on synthetic inputs, run offline against local S3 buckets.
+
+Schema parsing, data conversion and set processing are measured separately, each on inputs sized to make it dominate:
+many wide schemas without data, a few records with many rows, and many sets over small records. Each is migrated in
+a fresh process, and reports the time spent in its migration phase, throughput in units and MB of input per second,
+and the process's peak RSS (including any worker processes).
+
+Usage: python -m benchmarks.migration [--phases schema,data,sets] [--options '{"sink": "tsv"}'] [sizes...]
+"""
+
+import argparse
+import json
+import resource
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from os import path, chdir
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Dict, Optional
+from uuid import uuid4
+
+from app.job_queue import MigrationJobStatus
+from benchmarks.generators import generate_inputs
+from benchmarks.local_s3 import LocalMigrationService
+
+BUCKET_NAME = 'eve'
+BASE_PATH = 'bench'
+
+# Migration phase, unit name, and generated unit count and input size keys of each benchmarked phase
+PHASES = {
+    'schema': ('migrating_records', 'items', 'schema_items', 'schema_bytes'),
+    'data': ('migrating_records', 'rows', 'data_rows', 'data_bytes'),
+    'sets': ('migrating_sets', 'sets', 'sets', 'set_bytes'),
+}
+
+
+class TimedJobStatus(MigrationJobStatus):
+    """Job status that times how long the job spends in each phase."""
+
+    def __init__(self, job_id: str):
+        self.phase_secs: Dict[str, float] = dict()
+        self.__phase: Optional[str] = None
+        self.__phase_start = perf_counter()
+        super().__init__(job_id)
+
+    @property
+    def phase(self) -> str:
+        return self.__phase
+
+    @phase.setter
+    def phase(self, phase: str):
+        now = perf_counter()
+
+        if self.__phase is not None:
+            self.phase_secs[self.__phase] = self.phase_secs.get(self.__phase, 0.0) + now - self.__phase_start
+
+        self.__phase = phase
+        self.__phase_start = now
+
+
+def get_peak_rss() -> int:
+    """
+    :return: Peak RSS in bytes of this process or any of its child processes, whichever is larger.
+    """
+
+    peak_rss = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+
+    # Reported in bytes on macOS, and in kilobytes elsewhere
+    return peak_rss if sys.platform == 'darwin' else peak_rss * 1024
+
+
+def run_migration(work_dir: str, options: dict) -> dict:
+    """
+    Run a migration of the generated inputs. Intended to be run in a fresh process, so its peak RSS is its own.
+
+    :param work_dir: Working directory, holding the local S3 buckets.
+    :param options: Request options.
+    :return: Time spent in each phase, total time and peak RSS.
+    """
+
+    chdir(work_dir)
+    service = LocalMigrationService(path.join(work_dir, 's3'), BUCKET_NAME)
+    status = TimedJobStatus(str(uuid4()))
+    data = {
+        'base_path': BASE_PATH,
+        'cobol_copybook_out_path': BASE_PATH,
+        'upload_to_s3': False,
+        'migrate_fks': True,
+        **options,
+    }
+
+    start = perf_counter()
+    service.migrate(data, status)
+    total_secs = perf_counter() - start
+
+    return {'phase_secs': status.phase_secs, 'total_secs': total_secs, 'peak_rss': get_peak_rss()}
+
+
+def benchmark_phase(name: str, sizes: dict, options: dict) -> dict:
+    """
+    Generate inputs for a phase and migrate them in a fresh process.
+
+    :param name: Phase name, one of "PHASES".
+    :param sizes: Keyword arguments for "generate_inputs".
+    :param options: Request options.
+    :return: Results of the phase.
+    """
+
+    phase, unit, units_key, bytes_key = PHASES[name]
+
+    with TemporaryDirectory(prefix='eve-bench-') as work_dir:
+        stats = generate_inputs(path.join(work_dir, 's3', BUCKET_NAME, 'inputs', BASE_PATH), **sizes)
+
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+            result = executor.submit(run_migration, work_dir, options).result()
+
+    secs = result['phase_secs'].get(phase, 0.0)
+
+    return {
+        'phase': name,
+        'unit': unit,
+        'units': stats[units_key],
+        'mb': stats[bytes_key] / 1e6,
+        'secs': secs,
+        'total_secs': result['total_secs'],
+        'peak_rss_mb': result['peak_rss'] / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--phases', default='schema,data,sets', help='Comma-separated phases to benchmark.')
+    parser.add_argument('--options', default='{}', help='Request options as JSON, e.g. \'{"parallel": true}\'.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the generated inputs.')
+    parser.add_argument('--schema-records', type=int, default=200, help='Records in the schema phase.')
+    parser.add_argument('--schema-items', type=int, default=200, help='Items per record in the schema phase.')
+    parser.add_argument('--data-records', type=int, default=4, help='Records in the data phase.')
+    parser.add_argument('--data-items', type=int, default=40, help='Items per record in the data phase.')
+    parser.add_argument('--data-rows', type=int, default=50_000, help='Rows per record in the data phase.')
+    parser.add_argument('--set-records', type=int, default=50, help='Records in the sets phase.')
+    parser.add_argument('--sets', type=int, default=1000, help='Sets in the sets phase.')
+    args = parser.parse_args()
+
+    options = json.loads(args.options)
+    sizes = {
+        'schema': {'num_records': args.schema_records, 'num_items': args.schema_items, 'num_rows': 0},
+        'data': {'num_records': args.data_records, 'num_items': args.data_items, 'num_rows': args.data_rows},
+        'sets': {'num_records': args.set_records, 'num_items': 20, 'num_rows': 0, 'num_sets': args.sets},
+    }
+
+    results = list()
+    for name in args.phases.split(','):
+        results.append(benchmark_phase(name, {'seed': args.seed, **sizes[name]}, options))
+
+    print()
+    print(f'{"Phase":<8} {"Units":>16} {"MB":>9} {"Time":>9} {"Units/sec":>18} {"MB/sec":>9} {"Peak RSS":>10}')
+
+    for r in results:
+        units_per_sec = r['units'] / r['secs'] if r['secs'] > 0 else 0.0
+        mb_per_sec = r['mb'] / r['secs'] if r['secs'] > 0 else 0.0
+        print(
+            f'{r["phase"]:<8} {r["units"]:>10,} {r["unit"]:<5} {r["mb"]:>9.2f} {r["secs"]:>8.2f}s '
+            f'{units_per_sec:>12,.0f} {r["unit"]:<5} {mb_per_sec:>9.2f} {r["peak_rss_mb"]:>7.1f} MB'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Startup benchmark of the Eve API, from import to ready.
+
+Each run starts a fresh Python process, which times importing the app, serving its first request, creating the IDMS to
+MySQL migration service on first use and connecting it to S3. Times of each step are reported as the median and
+minimum across runs. S3 isn't contacted, since creating the S3 resource doesn't send any requests.
+
+Usage: python -m benchmarks.startup [--runs 10]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from os import environ, path
+from statistics import median
+from time import perf_counter
+from typing import Dict
+
+ROOT_DIR = path.dirname(path.dirname(path.abspath(__file__)))
+
+# Steps timed in each run, in order
+STEPS = ('import', 'first_request', 'service', 's3')
+
+
+def measure_startup() -> Dict[str, float]:
+    """
+    Time the startup steps of the app. Intended to be run in a fresh process, before anything else is imported.
+
+    :return: Seconds spent in each step.
+    """
+
+    secs = dict()
+
+    start = perf_counter()
+    from app import app
+    from app.container import container
+    secs['import'] = perf_counter() - start
+
+    start = perf_counter()
+    response = app.test_client().get('/metrics')
+    secs['first_request'] = perf_counter() - start
+
+    if response.status_code != 200:
+        raise Exception(f'First request failed with status {response.status_code}.')
+
+    start = perf_counter()
+    service = container.idms_to_mysql_migration_service
+    secs['service'] = perf_counter() - start
+
+    start = perf_counter()
+    service.bucket
+    secs['s3'] = perf_counter() - start
+
+    return secs
+
+
+def run_startup() -> Dict[str, float]:
+    """
+    Time the startup steps of the app in a fresh process.
+
+    :return: Seconds spent in each step.
+    """
+
+    # The S3 bucket only has to be named, since nothing is sent to S3
+    env = {'S3_EVE_BUCKET': 'eve', **environ}
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.startup', '--child'],
+        cwd=ROOT_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout
+
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help='Number of fresh processes to time.')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_startup()))
+        return
+
+    results = [run_startup() for _ in range(args.runs)]
+    totals = [sum(r[step] for step in STEPS) for r in results]
+
+    print()
+    print(f'{"Step":<14} {"Median":>10} {"Min":>10}')
+
+    for step in STEPS:
+        times = [r[step] for r in results]
+        print(f'{step:<14} {median(times) * 1000:>8.1f}ms {min(times) * 1000:>8.1f}ms')
+
+    print(f'{"total":<14} {median(totals) * 1000:>8.1f}ms {min(totals) * 1000:>8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+from os import path
+
+import pytest
+
+from app.idms_to_mysql_migration.mysql_loader import MySQLLoader
+from benchmarks.local_s3 import LocalMigrationService
+from tests.utils import BUCKET_NAME, FakeMySQLServer
+
+
+@pytest.fixture
+def work_dir(tmp_path, monkeypatch) -> str:
+    """Working directory of migrations, holding the local S3 buckets and the service's temporary files."""
+
+    monkeypatch.chdir(tmp_path)
+    return str(tmp_path)
+
+
+@pytest.fixture
+def service(work_dir) -> LocalMigrationService:
+    """Migration service reading from and writing to local buckets."""
+
+    return LocalMigrationService(path.join(work_dir, 's3'), BUCKET_NAME)
+
+
+@pytest.fixture
+def mysql_server(monkeypatch) -> FakeMySQLServer:
+    """In-memory target database of the "mysql" sink."""
+
+    server = FakeMySQLServer()
+    monkeypatch.setattr(MySQLLoader, 'connection_pool_class', staticmethod(server.create_pool))
+
+    return server
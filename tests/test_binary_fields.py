@@ -0,0 +1,102 @@
+from decimal import Decimal
+
+import pytest
+
+from app.constants.idms import IDMS_ELEM_ITEM_REGEX
+from app.idms_to_mysql_migration.mysql_column import MySQLColumn
+from app.idms_to_mysql_migration.pic_parser import parse_idms_pic
+from app.idms_to_mysql_migration.row_decoder import ArrowRowDecoder, RowDecoder
+
+CODE_PAGE = 'cp037'
+
+
+def get_column(pic: str, usage: str = 'DISPLAY') -> MySQLColumn:
+    """
+    :param pic: IDMS PIC.
+    :param usage: IDMS usage.
+    :return: MySQL column, as created from a schema item.
+    """
+
+    var_type, var_len, _, len_1, len_2 = parse_idms_pic(pic)
+    return MySQLColumn('col', var_type, var_len, len_1, len_2, usage=usage, is_signed=pic.startswith('S'))
+
+
+def decode(pic: str, usage: str, val: bytes) -> str:
+    """
+    :param pic: IDMS PIC.
+    :param usage: IDMS usage.
+    :param val: Raw field bytes of a binary record.
+    :return: MySQL value.
+    """
+
+    return RowDecoder([get_column(pic, usage)], CODE_PAGE).decode(val)[1:-1]
+
+
+@pytest.mark.parametrize('pic, val, expected', [
+    ('S9(5)', bytes.fromhex('12345D'), '-12345'),
+    ('S9(5)', bytes.fromhex('12345C'), '12345'),
+    ('9(5)', bytes.fromhex('12345F'), '12345'),
+    ('S9(4)V99', bytes.fromhex('0012345C'), '123.45'),
+    ('S9(4)V99', bytes.fromhex('0012345D'), '-123.45'),
+    ('S9(5)', bytes.fromhex('00000D'), '0'),
+    ('S9(5)', bytes.fromhex('000000'), 'NULL'),
+    ('S9(5)', bytes.fromhex('404040'), 'NULL'),
+])
+def test_packed_fields(pic, val, expected):
+    assert decode(pic, 'COMP-3', val) == expected
+
+
+@pytest.mark.parametrize('pic, val, expected', [
+    ('S9(4)', bytes.fromhex('04D2'), '1234'),
+    ('S9(4)', bytes.fromhex('FB2E'), '-1234'),
+    ('9(4)', bytes.fromhex('260F'), '9743'),
+    ('S9(9)', bytes.fromhex('075BCD15'), '123456789'),
+    ('S9(9)', bytes.fromhex('F8A432EB'), '-123456789'),
+    ('S9(15)', bytes.fromhex('FFFFFFFFFFFFFF85'), '-123'),
+])
+def test_binary_fields(pic, val, expected):
+    assert decode(pic, 'COMP', val) == expected
+
+
+def test_binary_field_over_pic_digits_raises():
+    with pytest.raises(ValueError):
+        decode('S9(4)', 'COMP', bytes.fromhex('7FFF'))
+
+
+@pytest.mark.parametrize('pic, val, expected', [
+    ('S9(3)', '12}'.encode(CODE_PAGE), '-120'),
+    ('S9(3)', '12J'.encode(CODE_PAGE), '-121'),
+    ('S9(3)', '12{'.encode(CODE_PAGE), '120'),
+    ('S9(3)', '12A'.encode(CODE_PAGE), '121'),
+    ('9(3)', '123'.encode(CODE_PAGE), '123'),
+    ('S9(2)V9(2)', '123R'.encode(CODE_PAGE), '-12.39'),
+    ('S9(3)', '   '.encode(CODE_PAGE), 'NULL'),
+    ('S9(3)', bytes(3), 'NULL'),
+])
+def test_zoned_fields(pic, val, expected):
+    assert decode(pic, 'DISPLAY', val) == expected
+
+
+def test_record_fields_are_laid_out_by_storage_length():
+    columns = [
+        get_column('X(4)'),
+        get_column('S9(4)V99', 'COMP-3'),
+        get_column('S9(4)', 'COMP'),
+        get_column('S9(3)'),
+    ]
+    record = 'AB\'C'.encode(CODE_PAGE) + bytes.fromhex('0012345D') + bytes.fromhex('FFFE') + '12J'.encode(CODE_PAGE)
+
+    assert RowDecoder(columns, CODE_PAGE).decode(record) == "('AB\\'C', -123.45, -2, -121)"
+    assert ArrowRowDecoder(columns, CODE_PAGE).decode(record)[1:] == (Decimal('-123.45'), -2, -121)
+
+
+@pytest.mark.parametrize('line, usage, pic', [
+    ('03 R-AMOUNT                 COMP-3              S9(7)V99      1 5', 'COMP-3', 'S9(7)V99'),
+    ('03 R-COUNT                  COMP     ZERO       S9(4)         6 2', 'COMP', 'S9(4)'),
+    ('03 R-NAME                   DISPLAY  SPACES     X(10)         8 10', 'DISPLAY', 'X(10)'),
+])
+def test_schema_item_usage(line, usage, pic):
+    match = IDMS_ELEM_ITEM_REGEX.match(line)
+
+    assert match.group('usage') == usage
+    assert match.group('type') == pic
@@ -0,0 +1,101 @@
+import random
+from typing import List
+
+import pytest
+
+from app.idms_to_mysql_migration.block_decoder import BlockRowDecoder
+from app.idms_to_mysql_migration.constants import MYSQL_ID_COLUMN
+from app.idms_to_mysql_migration.mysql_column import MySQLColumn
+from app.idms_to_mysql_migration.row_decoder import RowDecoder
+
+COLUMNS = [
+    MYSQL_ID_COLUMN,
+    MySQLColumn('name', 'CHAR', 6),
+    MySQLColumn('count', 'NUMERIC', 4),
+    MySQLColumn('total', 'BIGINT', 5),
+    MySQLColumn('amount', 'DECIMAL', 5, length_1=3, length_2=2),
+    MySQLColumn('code', 'CHAR', 1),
+]
+ROW_LENGTH = sum(col.length for col in COLUMNS)
+
+# Characters of generated rows, including quotes, backslashes and control characters, whitespace or not
+CHARS = "0123456789 AZaz'\\\t\x0b\x0c\x1c\x1f\x01\x7f"
+
+
+def decode_rows(rows: List[str]) -> List[str]:
+    """
+    :param rows: IDMS data rows.
+    :return: MySQL values of each row, decoded row by row.
+    """
+
+    decoder = RowDecoder(COLUMNS)
+    return [decoder.decode(row) for row in rows]
+
+
+def generate_rows(seed: int, num_rows: int) -> List[str]:
+    """
+    :param seed: Random seed.
+    :param num_rows: Number of rows.
+    :return: Rows of random characters and lengths around the row length, with blank and zero-filled fields.
+    """
+
+    rand = random.Random(seed)
+    rows = list()
+
+    for _ in range(num_rows):
+        fields = list()
+
+        for col in COLUMNS:
+            roll = rand.random()
+
+            if roll < 0.2:
+                fields.append(' ' * col.length)
+            elif roll < 0.3:
+                fields.append('0' * col.length)
+            elif roll < 0.5 and col.var_type != 'CHAR':
+                fields.append(''.join(rand.choices('0123456789 ', k=col.length)))
+            else:
+                fields.append(''.join(rand.choices(CHARS, k=col.length)))
+
+        row = ''.join(fields)
+        row = row[:rand.randint(0, ROW_LENGTH + 5)] + rand.choice(['', '\n', '\r\n'])
+        rows.append(row)
+
+    return rows
+
+
+@pytest.mark.parametrize('rows', [
+    ['000000001Ann   0012000120100Y\n', '000000002      0000     00000 '],
+    ["000000003O'Neil00000000000000\\\n", '000000004a\\b\\c\t\x0b\x0c\x1c   \n'],
+    ['000000005', '', '00000000', '000000006Bob', '000000007Bob   00'],
+    ['000000008Carol 000100001123456Nextra columns\n', '000000009Dave  0001000011234'],
+    ['000000010\t\t\t\t\t\t\t\t\t\t\t\t\t\t\t\t\t\t\t\t\n', '000000011\x01     \x1f   \x7f    \x0b\x0b\x0b\x0b\x0b '],
+], ids=['regular', 'escaped', 'short', 'long', 'control'])
+def test_block_matches_row_decoder(rows):
+    decoder = BlockRowDecoder(COLUMNS)
+
+    assert decoder.decode_block(rows) == decode_rows(rows)
+    assert decoder.decode_byte_block([row.encode() for row in rows], 'utf-8') == decode_rows(rows)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_generated_block_matches_row_decoder(seed):
+    decoder = BlockRowDecoder(COLUMNS)
+    rows = generate_rows(seed, 500)
+
+    assert decoder.decode_block(rows) == decode_rows(rows)
+    assert decoder.decode_byte_block([row.encode() for row in rows], 'utf-8') == decode_rows(rows)
+
+
+@pytest.mark.parametrize('encoding', ['utf-8', 'cp1252'])
+def test_non_ascii_block_falls_back(encoding):
+    decoder = BlockRowDecoder(COLUMNS)
+    rows = generate_rows(0, 50) + ['000000012Zoë   0001000010001é\n', '000000013\0\0    0001\0\0\0']
+
+    assert decoder.decode_block(rows) == decode_rows(rows)
+    assert decoder.decode_byte_block([row.encode(encoding) for row in rows], encoding) == decode_rows(rows)
+
+
+def test_empty_block():
+    assert BlockRowDecoder(COLUMNS).decode_block([]) == list()
+    assert BlockRowDecoder(COLUMNS).decode_byte_block([], 'utf-8') == list()
@@ -0,0 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.idms_to_mysql_migration.job import MYSQL_OUT_FILENAME
+from tests.utils import add_inputs, run_job
+
+NUM_JOBS = 4
+
+
+@pytest.mark.parametrize('options', [{}, {'sink': 'tsv'}, {'parallel': True, 'workers': 2, 'data_chunk_size': 20000}])
+def test_concurrent_jobs_match_single_jobs(work_dir, service, options):
+    base_paths = [f'job-{i}' for i in range(NUM_JOBS)]
+
+    for i, base_path in enumerate(base_paths):
+        add_inputs(work_dir, base_path, seed=i, num_records=3, num_items=12, num_rows=400 + 100 * i, num_sets=2)
+
+    expected_outputs = [run_job(service, base_path, **options) for base_path in base_paths]
+
+    # All jobs share the service, as queued jobs do
+    with ThreadPoolExecutor(max_workers=NUM_JOBS) as executor:
+        outputs = list(executor.map(lambda base_path: run_job(service, base_path, **options), base_paths))
+
+    for job_outputs, job_expected_outputs in zip(outputs, expected_outputs):
+        assert job_outputs.keys() == job_expected_outputs.keys()
+        assert job_outputs == job_expected_outputs
+
+    # Each job's outputs are its own
+    assert len({outputs[i][MYSQL_OUT_FILENAME] for i in range(NUM_JOBS)}) == NUM_JOBS
@@ -0,0 +1,26 @@
+from os import path, listdir
+
+from tests.utils import add_inputs, run_job
+
+
+def test_utf16_data_is_not_chunked(work_dir, service):
+    # Line breaks can't be found in the bytes of UTF-16 text, so the data files must be migrated whole
+    inputs_dir = add_inputs(work_dir, 'utf16', num_records=2, num_items=10, num_rows=500)
+    data_dir = path.join(inputs_dir, 'data')
+
+    for filename in listdir(data_dir):
+        data_path = path.join(data_dir, filename)
+
+        with open(data_path, encoding='utf-8') as data_file:
+            text = data_file.read()
+
+        with open(data_path, 'w', encoding='utf-16') as data_file:
+            data_file.write(text)
+
+    outputs = run_job(service, 'utf16', encoding='utf-16', data_chunk_size=4096)
+
+    add_inputs(work_dir, 'utf8', num_records=2, num_items=10, num_rows=500)
+    expected_outputs = run_job(service, 'utf8')
+
+    assert outputs.keys() == expected_outputs.keys()
+    assert outputs == expected_outputs
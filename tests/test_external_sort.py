@@ -0,0 +1,67 @@
+import gc
+import random
+import warnings
+
+import pytest
+
+from app.idms_to_mysql_migration import external_sort
+from app.idms_to_mysql_migration.external_sort import ExternalSorter
+
+
+def get_key(line: str) -> str:
+    return line.split()[0]
+
+
+def generate_lines(num_lines: int, seed: int = 0) -> list:
+    rand = random.Random(seed)
+    return [f'{rand.randrange(num_lines):08d} {i}' for i in range(num_lines)]
+
+
+@pytest.fixture
+def small_fan_in(monkeypatch):
+    # Merge runs two at a time, so inputs take several merge passes
+    monkeypatch.setattr(external_sort, 'MERGE_FAN_IN', 2)
+
+
+def test_sorts_and_keeps_first_duplicate(tmp_path, small_fan_in):
+    lines = generate_lines(2000)
+    sorter = ExternalSorter(str(tmp_path), get_key, buffer_size=500)
+
+    sorted_lines = list(sorter.sort(lines))
+
+    expected_lines = list()
+    for line in sorted(lines, key=get_key):
+        if not expected_lines or get_key(expected_lines[-1]) != get_key(line):
+            expected_lines.append(line)
+
+    assert sorted_lines == expected_lines
+    assert sorter.runs_spilled > 2
+    assert sorter.duplicate_count == len(lines) - len(expected_lines)
+
+
+def test_failed_merge_closes_run_files(tmp_path, small_fan_in):
+    lines = generate_lines(2000)
+    calls = 0
+
+    def get_failing_key(line: str) -> str:
+        # Fail partway through the first merge pass, once some runs were merged
+        nonlocal calls
+        calls += 1
+
+        if calls > 3 * len(lines):
+            raise Exception('Failed to get key.')
+
+        return get_key(line)
+
+    sorter = ExternalSorter(str(tmp_path), get_failing_key, buffer_size=500)
+
+    # Run files left open are only closed once they're garbage collected, with a warning
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter('always', ResourceWarning)
+
+        with pytest.raises(Exception, match='Failed to get key'):
+            list(sorter.sort(lines))
+
+        gc.collect()
+
+    assert not [w for w in caught_warnings if issubclass(w.category, ResourceWarning)]
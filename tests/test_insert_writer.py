@@ -0,0 +1,56 @@
+import random
+from io import StringIO
+
+import pytest
+
+from app.idms_to_mysql_migration.constants import MYSQL_ID_COLUMN
+from app.idms_to_mysql_migration.insert_writer import InsertWriter
+from app.idms_to_mysql_migration.mysql_column import MySQLColumn
+from app.idms_to_mysql_migration.mysql_table import MySQLTable
+
+MAX_BYTES = 400
+
+
+def write_rows(rows: list, max_bytes: int) -> list:
+    """
+    :param rows: MySQL values of each row.
+    :param max_bytes: Maximum size of each statement in bytes.
+    :return: Statements written.
+    """
+
+    out_file = StringIO()
+    insert_writer = InsertWriter(out_file, MySQLTable('t', [MYSQL_ID_COLUMN, MySQLColumn('name', 'CHAR', 20)]),
+                                 max_bytes=max_bytes)
+
+    for values in rows:
+        insert_writer.write_row(values)
+
+    insert_writer.close()
+
+    statements = [s + ';\n' for s in out_file.getvalue().split(';\n')[:-1]]
+    assert len(statements) == insert_writer.statements_written
+
+    return statements
+
+
+@pytest.mark.parametrize('chars', ['abc', 'äöü', '日本語', '😀', 'aé日😀'])
+def test_statements_stay_within_max_bytes(chars):
+    rand = random.Random(0)
+    rows = [f"('{i:09d}', '{''.join(rand.choices(chars, k=rand.randint(0, 20)))}')" for i in range(200)]
+
+    statements = write_rows(rows, MAX_BYTES)
+
+    assert all(len(s.encode('utf-8')) <= MAX_BYTES for s in statements)
+    assert sum(s.count('\n(') for s in statements) == len(rows)
+
+    # Statements are filled up to the limit, rather than cut short
+    assert all(len(s.encode('utf-8')) > MAX_BYTES - 100 for s in statements[:-1])
+
+
+def test_row_over_max_bytes_gets_own_statement():
+    rows = ["('000000001', 'a')", f"('000000002', '{'日' * 200}')", "('000000003', 'b')"]
+
+    statements = write_rows(rows, MAX_BYTES)
+
+    assert len(statements) == 3
+    assert rows[1] in statements[1]
@@ -0,0 +1,24 @@
+from os import path
+
+import pytest
+
+from app.idms_to_mysql_migration.job import IDMSToMySQLMigrationJob
+
+
+@pytest.mark.parametrize('base_path', ['job', 'team/job', '../../etc', '/abs/path', '..'])
+def test_cache_dir_stays_under_cache_root(base_path):
+    job = IDMSToMySQLMigrationJob({'base_path': base_path, 'cobol_copybook_out_path': base_path})
+
+    assert path.dirname(job.cache_dir) == path.join('temp', 'cache')
+
+
+def test_cache_dir_differs_per_base_path():
+    jobs = [IDMSToMySQLMigrationJob({'base_path': p, 'cobol_copybook_out_path': p}) for p in ('a/b', 'a_b', 'a')]
+
+    assert len({job.cache_dir for job in jobs}) == len(jobs)
+
+
+@pytest.mark.parametrize('job_id', ['', '.', '..', '../job', 'a/b'])
+def test_invalid_resume_job_id_is_rejected(job_id):
+    with pytest.raises(Exception, match='Invalid job ID'):
+        IDMSToMySQLMigrationJob({'base_path': 'job', 'cobol_copybook_out_path': 'job', 'resume': job_id})
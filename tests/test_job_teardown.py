@@ -0,0 +1,31 @@
+import multiprocessing
+from os import path
+from uuid import uuid4
+
+import pytest
+
+from app.job_queue import MigrationJobStatus
+from tests.utils import add_inputs
+
+
+@pytest.mark.parametrize('options', [{}, {'parallel': True, 'workers': 2}])
+def test_failed_job_is_torn_down(work_dir, service, options):
+    add_inputs(work_dir, 'teardown', num_records=3, num_items=10, num_rows=100)
+    status = MigrationJobStatus(str(uuid4()))
+
+    # Records are shorter than their fields, so migrating data fails
+    with pytest.raises(Exception, match='Record length'):
+        service.migrate(
+            {
+                'base_path': 'teardown',
+                'cobol_copybook_out_path': 'teardown',
+                'upload_to_s3': False,
+                'record_format': 'binary',
+                'record_length': 1,
+                **options,
+            },
+            status
+        )
+
+    assert not path.exists(path.join('temp', 'inputs', status.job_id))
+    assert not multiprocessing.active_children()
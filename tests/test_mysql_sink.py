@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+
+from tests.utils import add_inputs, run_job
+
+
+def get_loader_threads() -> list:
+    return [t for t in threading.enumerate() if t.name.startswith('mysql-loader')]
+
+
+def test_rows_are_loaded(work_dir, service, mysql_server):
+    add_inputs(work_dir, 'mysql', num_records=3, num_items=10, num_rows=250)
+
+    run_job(service, 'mysql', sink='mysql', insert_batch_rows=100)
+
+    assert {name: len(rows) for name, rows in mysql_server.rows.items()} == {
+        'rec_0000': 250,
+        'rec_0001': 250,
+        'rec_0002': 250,
+    }
+    assert any(sql.startswith('CREATE TABLE') for sql in mysql_server.statements)
+
+    [pool] = mysql_server.pools
+    assert pool.is_closed
+    assert pool.connections_in_use == 0
+    assert not get_loader_threads()
+
+
+def test_failed_load_stops_loaders(work_dir, service, mysql_server):
+    add_inputs(work_dir, 'mysql', num_records=3, num_items=10, num_rows=500)
+    mysql_server.failing_tables.add('rec_0000')
+
+    with pytest.raises(Exception):
+        run_job(service, 'mysql', sink='mysql', insert_batch_rows=10)
+
+    [pool] = mysql_server.pools
+    assert pool.is_closed
+    assert pool.connections_in_use == 0
+    assert not get_loader_threads()
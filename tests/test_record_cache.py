@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+from os import listdir, path
+
+from app.idms_to_mysql_migration.job import IDMSToMySQLMigrationJob
+from app.idms_to_mysql_migration.mysql_table import MySQLTable
+from app.idms_to_mysql_migration.record_cache import RecordCache
+from tests.utils import add_inputs, run_job
+
+NUM_JOBS = 4
+
+
+def test_concurrent_puts_keep_every_record(work_dir):
+    cache_dir = path.join(work_dir, 'cache')
+    sql_path = path.join(work_dir, 'out.sql')
+
+    with open(sql_path, 'w') as sql_file:
+        sql_file.write('INSERT INTO t VALUES (1);\n')
+
+    def put(i: int):
+        # Each job has its own view of the cache, as separate jobs do
+        cache = RecordCache(cache_dir)
+
+        for j in range(20):
+            cache.put(f'schemas/REC-{i}-{j}', f'{i}-{j}', MySQLTable(f'rec_{i}_{j}'), j, sql_path, 0, 26, [], [])
+
+    with ThreadPoolExecutor(max_workers=NUM_JOBS) as executor:
+        list(executor.map(put, range(NUM_JOBS)))
+
+    cache = RecordCache(cache_dir)
+
+    for i in range(NUM_JOBS):
+        for j in range(20):
+            assert cache.get(f'schemas/REC-{i}-{j}', f'{i}-{j}')['rows_written'] == j
+
+    assert not [f for f in listdir(cache_dir) if f.endswith('.tmp')]
+
+
+def test_concurrent_incremental_jobs_match_single_job(work_dir, service):
+    add_inputs(work_dir, 'incremental', num_records=6, num_items=10, num_rows=300, num_sets=2)
+    expected_outputs = run_job(service, 'incremental')
+
+    # All jobs share the record cache of the base path, and some restore records while others cache them
+    with ThreadPoolExecutor(max_workers=NUM_JOBS) as executor:
+        outputs = list(executor.map(lambda _: run_job(service, 'incremental', incremental=True), range(NUM_JOBS * 2)))
+
+    for job_outputs in outputs:
+        assert job_outputs == expected_outputs
+
+    job = IDMSToMySQLMigrationJob({'base_path': 'incremental', 'cobol_copybook_out_path': 'incremental'})
+    assert len(RecordCache(job.cache_dir).records) == 6
+    assert run_job(service, 'incremental', incremental=True) == expected_outputs
@@ -0,0 +1,73 @@
+from os import path
+from uuid import uuid4
+
+import pytest
+
+from app.idms_to_mysql_migration import service as service_module
+from app.job_queue import MigrationJobStatus
+from app.utils import compression
+from tests.utils import add_inputs, read_outputs, run_job
+
+NUM_RECORDS = 6
+
+# Record whose schema is broken in the first run
+FAILED_RECORD = 3
+
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'sink': 'tsv'},
+    {'parallel': True, 'workers': 2},
+    {'parallel': True, 'workers': 2, 'data_chunk_size': 20000},
+])
+def test_resumed_job_matches_uninterrupted_job(work_dir, service, caplog, options):
+    inputs_dir = add_inputs(work_dir, 'resume', num_records=NUM_RECORDS, num_items=10, num_rows=300, num_sets=3)
+    expected_outputs = run_job(service, 'resume', **options)
+
+    schema_path = path.join(inputs_dir, 'schemas', f'REC-{FAILED_RECORD:04d}_SCHEMA.txt')
+    with open(schema_path) as schema_file:
+        schema = schema_file.read()
+
+    with open(schema_path, 'w') as schema_file:
+        schema_file.write('Not an IDMS schema\n')
+
+    status = MigrationJobStatus(str(uuid4()))
+
+    with pytest.raises(Exception):
+        service.migrate(
+            {'base_path': 'resume', 'cobol_copybook_out_path': 'resume', 'upload_to_s3': False, **options},
+            status
+        )
+
+    with open(schema_path, 'w') as schema_file:
+        schema_file.write(schema)
+
+    caplog.clear()
+    run_job(service, 'resume', resume=status.job_id, **options)
+
+    # Records before the failed one were merged and checkpointed, so they aren't migrated again
+    assert f'after {FAILED_RECORD}/{NUM_RECORDS} records' in caplog.text
+    assert read_outputs(path.join('temp', 'outputs', status.job_id)) == expected_outputs
+
+
+def test_job_resumed_after_sets_matches_uninterrupted_job(work_dir, service, caplog, monkeypatch):
+    add_inputs(work_dir, 'resume', num_records=NUM_RECORDS, num_items=10, num_rows=100, num_sets=3)
+    expected_outputs = run_job(service, 'resume')
+
+    def open_input(file_path: str, *args, **kwargs):
+        if path.basename(file_path) == 'SET-0001.txt':
+            raise Exception('Failed to read set.')
+
+        return compression.open_input(file_path, *args, **kwargs)
+
+    status = MigrationJobStatus(str(uuid4()))
+
+    with monkeypatch.context() as patch, pytest.raises(Exception, match='Failed to read set'):
+        patch.setattr(service_module, 'open_input', open_input)
+        service.migrate({'base_path': 'resume', 'cobol_copybook_out_path': 'resume', 'upload_to_s3': False}, status)
+
+    caplog.clear()
+    run_job(service, 'resume', resume=status.job_id)
+
+    assert f'after {NUM_RECORDS}/{NUM_RECORDS} records and 1/3 sets' in caplog.text
+    assert read_outputs(path.join('temp', 'outputs', status.job_id)) == expected_outputs
@@ -0,0 +1,20 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.s3 import get_s3_bucket, get_s3_client, get_s3_resource
+
+
+def test_threads_get_own_buckets_over_shared_client(monkeypatch):
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        buckets = list(executor.map(lambda _: (get_s3_bucket('eve'), get_s3_bucket('eve')), range(4)))
+
+    # Each thread reuses its own bucket
+    assert all(first is second for first, second in buckets)
+
+    # Threads don't share resources or buckets, but share the pooled client
+    main_bucket = get_s3_bucket('eve')
+    assert all(bucket is not main_bucket for bucket, _ in buckets)
+    assert all(bucket.meta.client is get_s3_client() for bucket, _ in buckets)
+    assert get_s3_resource().meta.client is get_s3_client()
+    assert get_s3_client().meta.config.max_pool_connections > 1
@@ -0,0 +1,156 @@
+from os import path, walk
+from threading import Lock
+from typing import Dict, List, Set
+from uuid import uuid4
+
+from app.idms_to_mysql_migration.checkpoint import CHECKPOINT_FILENAME, CHECKPOINT_TABLES_DIRNAME
+from app.job_queue import MigrationJobStatus
+from benchmarks.generators import generate_inputs
+from benchmarks.local_s3 import LocalMigrationService
+
+BUCKET_NAME = 'eve'
+
+
+def add_inputs(work_dir: str, base_path: str, **sizes) -> str:
+    """
+    Generate synthetic IDMS inputs under "inputs/<base path>" in the local bucket.
+
+    :param work_dir: Working directory of migrations.
+    :param base_path: Base path of the inputs.
+    :param sizes: Keyword arguments for "generate_inputs".
+    :return: Local directory of the inputs.
+    """
+
+    inputs_dir = path.join(work_dir, 's3', BUCKET_NAME, 'inputs', base_path)
+    generate_inputs(inputs_dir, **sizes)
+    return inputs_dir
+
+
+def run_job(service: LocalMigrationService, base_path: str, **options) -> Dict[str, bytes]:
+    """
+    Run a migration job without uploading its outputs.
+
+    :param service: Migration service.
+    :param base_path: Base path of the inputs.
+    :param options: Request options.
+    :return: Contents of the job's outputs, by path relative to its output directory.
+    """
+
+    status = MigrationJobStatus(str(uuid4()))
+    service.migrate({'base_path': base_path, 'cobol_copybook_out_path': base_path, 'upload_to_s3': False, **options},
+                    status)
+
+    return read_outputs(path.join('temp', 'outputs', status.job_id))
+
+
+def read_outputs(out_dir: str) -> Dict[str, bytes]:
+    """
+    :param out_dir: Local output directory of a job.
+    :return: Contents of the output files, by path relative to the output directory, without the job's checkpoint.
+    """
+
+    outputs = dict()
+
+    for dir_path, dir_names, filenames in walk(out_dir):
+        if dir_path == out_dir:
+            dir_names[:] = [d for d in dir_names if d != CHECKPOINT_TABLES_DIRNAME]
+            filenames = [f for f in filenames if f != CHECKPOINT_FILENAME]
+
+        for filename in filenames:
+            file_path = path.join(dir_path, filename)
+
+            with open(file_path, 'rb') as file:
+                outputs[path.relpath(file_path, out_dir)] = file.read()
+
+    return outputs
+
+
+class FakeMySQLServer:
+    """In-memory stand-in for the target MySQL database, so the "mysql" sink runs offline."""
+
+    def __init__(self, failing_tables: Set[str] = frozenset()):
+        """
+        :param failing_tables: Names of the tables that inserts fail for.
+        """
+
+        self.failing_tables = set(failing_tables)
+        self.lock = Lock()
+        self.statements: List[str] = list()
+        self.rows: Dict[str, List[tuple]] = dict()
+        self.pools: List[FakeConnectionPool] = list()
+
+    def create_pool(self, pool_size: int, **kwargs) -> 'FakeConnectionPool':
+        """
+        Stand-in for "MySQLConnectionPool", taking the same arguments.
+
+        :param pool_size: Maximum number of connections.
+        :return: Connection pool.
+        """
+
+        pool = FakeConnectionPool(self, pool_size)
+        self.pools.append(pool)
+
+        return pool
+
+
+class FakeConnectionPool:
+    """Pool of fake MySQL connections."""
+
+    def __init__(self, server: FakeMySQLServer, pool_size: int):
+        self.server = server
+        self.pool_size = pool_size
+        self.connections_in_use = 0
+        self.is_closed = False
+
+    def get_connection(self) -> 'FakeConnection':
+        with self.server.lock:
+            if self.is_closed or self.connections_in_use >= self.pool_size:
+                raise Exception('No connection available.')
+
+            self.connections_in_use += 1
+
+        return FakeConnection(self)
+
+    def _remove_connections(self):
+        self.is_closed = True
+
+
+class FakeConnection:
+    """Pooled fake MySQL connection."""
+
+    def __init__(self, pool: FakeConnectionPool):
+        self.pool = pool
+
+    def cursor(self) -> 'FakeCursor':
+        return FakeCursor(self.pool.server)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        with self.pool.server.lock:
+            self.pool.connections_in_use -= 1
+
+
+class FakeCursor:
+    """Cursor of a fake MySQL connection, recording the statements it executes."""
+
+    def __init__(self, server: FakeMySQLServer):
+        self.server = server
+
+    def execute(self, sql: str):
+        with self.server.lock:
+            self.server.statements.append(sql)
+
+    def executemany(self, sql: str, rows: List[tuple]):
+        # Statements are "INSERT INTO <table> ..."
+        table_name = sql.split()[2]
+
+        if table_name in self.server.failing_tables:
+            raise Exception(f'Failed to insert into table "{table_name}".')
+
+        with self.server.lock:
+            self.server.rows.setdefault(table_name, list()).extend(rows)
+
+    def close(self):
+        pass